@@ -0,0 +1,181 @@
+"""Synthetic Polarsteps payloads shaped like real API responses."""
+
+import random
+from typing import Any, Optional
+
+COUNTRIES = [
+    ("NL", "Netherlands"),
+    ("FR", "France"),
+    ("PT", "Portugal"),
+    ("JP", "Japan"),
+    ("PE", "Peru"),
+    ("NZ", "New Zealand"),
+]
+START = 1_640_995_200  # 2022-01-01 00:00:00 UTC
+DAY = 86_400
+
+
+def make_media_data(rng: random.Random, media_id: int, step_id: int) -> dict:
+    return {
+        "id": media_id,
+        "uuid": f"media-{media_id}",
+        "type": rng.choice([0, 1]),
+        "path": f"https://cdn.example.com/media/{media_id}.jpg",
+        "cdn_path": f"https://cdn.example.com/media/{media_id}.jpg",
+        "small_thumbnail_path": f"https://cdn.example.com/media/{media_id}_s.jpg",
+        "large_thumbnail_path": f"https://cdn.example.com/media/{media_id}_l.jpg",
+        "full_res_width": 4032.0,
+        "full_res_height": 3024.0,
+        "aspect_ratio": 1.333,
+        "lat": rng.uniform(-60, 60),
+        "lon": rng.uniform(-180, 180),
+        "order": media_id % 10,
+        "step_id": step_id,
+        "is_deleted": False,
+    }
+
+
+def make_step_data(
+    rng: random.Random, step_id: int, trip_id: int, start: int, media_per_step: int
+) -> dict:
+    code, country = rng.choice(COUNTRIES)
+    return {
+        "id": step_id,
+        "uuid": f"step-{step_id}",
+        "trip_id": trip_id,
+        "location": {
+            "id": step_id,
+            "uuid": f"location-{step_id}",
+            "name": f"Place {step_id}",
+            "lat": rng.uniform(-60, 60),
+            "lon": rng.uniform(-180, 180),
+            "country": country,
+            "country_code": code,
+            "detail": country,
+            "full_detail": f"Place {step_id}, {country}",
+            "locality": f"Place {step_id}",
+            "precision": 10.0,
+        },
+        "start_time": start,
+        "end_time": start + 3_600,
+        "name": f"Step {step_id}",
+        "display_name": f"Step {step_id}",
+        "slug": f"step-{step_id}",
+        "description": "Lorem ipsum dolor sit amet " * rng.randint(1, 20),
+        "creation_time": start,
+        "timezone_id": "Europe/Amsterdam",
+        "weather_condition": rng.choice(["clear-day", "rain", "cloudy"]),
+        "weather_temperature": rng.uniform(-5, 35),
+        "views": rng.randint(0, 1_000),
+        "comment_count": rng.randint(0, 20),
+        "media": [
+            make_media_data(rng, step_id * 100 + i, step_id)
+            for i in range(media_per_step)
+        ],
+        "user_likes": [{"user_id": i} for i in range(rng.randint(0, 5))],
+    }
+
+
+def make_trip_data(
+    trip_id: int = 1,
+    step_count: int = 50,
+    media_per_step: int = 3,
+    seed: Optional[int] = 0,
+) -> dict[str, Any]:
+    """Build a full `/trips/{id}` payload"""
+    rng = random.Random(None if seed is None else seed + trip_id)
+    start = START + trip_id * 30 * DAY
+    steps = [
+        make_step_data(
+            rng, trip_id * 10_000 + i, trip_id, start + i * DAY, media_per_step
+        )
+        for i in range(step_count)
+    ]
+    return {
+        "id": trip_id,
+        "uuid": f"trip-{trip_id}",
+        "name": f"Trip {trip_id}",
+        "display_name": f"Trip {trip_id}",
+        "slug": f"trip-{trip_id}",
+        "summary": "A synthetic journey",
+        "start_date": start,
+        "end_date": start + max(step_count, 1) * DAY,
+        "creation_time": start,
+        "last_modified": start + step_count * DAY,
+        "total_km": rng.uniform(100, 20_000),
+        "step_count": step_count,
+        "views": rng.randint(0, 10_000),
+        "visibility": 0,
+        "timezone_id": "Europe/Amsterdam",
+        "cover_photo_path": f"https://cdn.example.com/covers/{trip_id}.jpg",
+        "user_id": 1,
+        "all_steps": steps,
+        "like_count": rng.randint(0, 500),
+        "route_segments": [],
+        "trip_buddies": [],
+    }
+
+
+def make_user_data(
+    user_id: int = 1,
+    trip_count: int = 10,
+    follower_count: int = 100,
+    steps_per_trip: int = 0,
+    media_per_step: int = 0,
+    seed: Optional[int] = 0,
+) -> dict[str, Any]:
+    """Build a `/users/byusername/{username}` payload"""
+    rng = random.Random(None if seed is None else seed + user_id)
+
+    def make_follower(follower_id: int) -> dict:
+        return {
+            "id": follower_id,
+            "uuid": f"user-{follower_id}",
+            "username": f"follower{follower_id}",
+            "first_name": "Follower",
+            "last_name": str(follower_id),
+            "profile_image_path": f"https://cdn.example.com/u/{follower_id}.jpg",
+        }
+
+    return {
+        "id": user_id,
+        "uuid": f"user-{user_id}",
+        "username": f"user{user_id}",
+        "first_name": "Synthetic",
+        "last_name": "Traveller",
+        "description": "Generated for benchmarks",
+        "living_location": {
+            "id": 1,
+            "uuid": "location-home",
+            "name": "Amsterdam",
+            "country_code": "NL",
+        },
+        "creation_date": START,
+        "country_count": len(COUNTRIES),
+        "stats": {
+            "continents": ["Europe", "Asia"],
+            "country_codes": [code for code, _ in COUNTRIES],
+            "country_count": len(COUNTRIES),
+            "furthest_place_from_home_country": "NZ",
+            "furthest_place_from_home_km": 18_000,
+            "furthest_place_from_home_location": "Wellington",
+            "km_count": rng.uniform(1_000, 100_000),
+            "last_trip_end_date": START,
+            "like_count": rng.randint(0, 1_000),
+            "step_count": trip_count * steps_per_trip,
+            "time_traveled_in_seconds": trip_count * 14 * DAY,
+            "trip_count": trip_count,
+            "world_percentage": 0.05,
+        },
+        "followers": [make_follower(1_000 + i) for i in range(follower_count)],
+        "followees": [make_follower(5_000 + i) for i in range(follower_count // 2)],
+        "alltrips": [
+            make_trip_data(
+                trip_id=user_id * 1_000 + i,
+                step_count=steps_per_trip,
+                media_per_step=media_per_step,
+                seed=seed,
+            )
+            for i in range(trip_count)
+        ],
+    }
@@ -0,0 +1,67 @@
+"""Cold-start budget checks, each measured in a fresh interpreter.
+
+    python -m benchmarks.imports
+    python -m benchmarks.imports --runs 10 --scale 2.0
+
+Exits with status 1 when the median of any scenario exceeds its budget.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from typing import Optional
+
+TIMER = """
+import time
+started = time.perf_counter()
+{code}
+print(time.perf_counter() - started)
+"""
+
+# Scenario -> (code, budget in milliseconds)
+SCENARIOS: dict[str, tuple[str, float]] = {
+    "import_package": ("import polarsteps_api", 25.0),
+    "import_models": ("from polarsteps_api.models import Trip, User", 400.0),
+    "client_startup": (
+        "from polarsteps_api import PolarstepsClient\n"
+        "PolarstepsClient(remember_token='benchmark')",
+        600.0,
+    ),
+}
+
+
+def measure(code: str, runs: int = 5) -> float:
+    """Median wall time in milliseconds of `code` in fresh interpreters"""
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", TIMER.format(code=code)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        samples.append(float(output.strip().splitlines()[-1]) * 1e3)
+    return statistics.median(samples)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="polarsteps-api import budgets")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="Multiply budgets (slow machines)"
+    )
+    args = parser.parse_args(argv)
+
+    over_budget = False
+    for name, (code, budget) in SCENARIOS.items():
+        elapsed = measure(code, runs=args.runs)
+        limit = budget * args.scale
+        status = "ok" if elapsed <= limit else "OVER BUDGET"
+        over_budget |= elapsed > limit
+        print(f"{name:<24} {elapsed:>10.1f} ms  (budget {limit:.0f} ms)  {status}")
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+"""Run the benchmark suite and compare against a saved baseline.
+
+    python -m benchmarks.run --save baseline.json
+    python -m benchmarks.run --baseline baseline.json --threshold 0.25
+
+Exits with status 1 when any benchmark is slower than the baseline by more
+than the threshold.
+"""
+
+import argparse
+import json
+import sys
+import timeit
+from typing import Any, Callable, NamedTuple, Optional
+
+from benchmarks.generators import make_trip_data, make_user_data
+from polarsteps_api.client import PolarstepsClient
+from polarsteps_api.models.response import TripResponse
+from polarsteps_api.models.trip import Trip
+from polarsteps_api.models.user import User
+from polarsteps_api.transport import ReplayTransport
+
+
+class Sizes(NamedTuple):
+    steps: int = 100
+    media: int = 3
+    trips: int = 20
+    followers: int = 500
+
+
+DEFAULT_SIZES = Sizes()
+
+Setup = Callable[[Sizes], Callable[[], Any]]
+BENCHMARKS: dict[str, Setup] = {}
+
+
+def benchmark(name: str) -> Callable[[Setup], Setup]:
+    def register(setup: Setup) -> Setup:
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+def replay_client(path: str, payload: dict, **options: Any) -> PolarstepsClient:
+    transport = ReplayTransport(
+        [
+            {
+                "request": {
+                    "method": "GET",
+                    "url": f"{PolarstepsClient.base_url}{path}",
+                },
+                "response": {
+                    "status_code": 200,
+                    "headers": {"Content-Type": "application/json"},
+                    "body": json.dumps(payload),
+                },
+            }
+        ]
+    )
+    return PolarstepsClient(remember_token="benchmark", transport=transport, **options)
+
+
+@benchmark("trip_parse")
+def trip_parse(sizes: Sizes) -> Callable[[], Any]:
+    data = make_trip_data(step_count=sizes.steps, media_per_step=sizes.media)
+    return lambda: Trip(**data)
+
+
+@benchmark("user_parse")
+def user_parse(sizes: Sizes) -> Callable[[], Any]:
+    data = make_user_data(trip_count=sizes.trips, follower_count=sizes.followers)
+    return lambda: User(**data)
+
+
+@benchmark("trip_response")
+def trip_response(sizes: Sizes) -> Callable[[], Any]:
+    data = make_trip_data(step_count=sizes.steps, media_per_step=sizes.media)
+    return lambda: TripResponse(data=data, status_code=200, headers={})
+
+
+@benchmark("client_cache_hit")
+def client_cache_hit(sizes: Sizes) -> Callable[[], Any]:
+    client = replay_client("/trips/1", make_trip_data(step_count=sizes.steps))
+    client.get_trip("1")
+    return lambda: client.get_trip("1")
+
+
+@benchmark("client_cache_miss")
+def client_cache_miss(sizes: Sizes) -> Callable[[], Any]:
+    # Without reuse every miss validates the body again
+    client = replay_client(
+        "/trips/1", make_trip_data(step_count=sizes.steps), reuse_unchanged=False
+    )
+
+    def miss() -> Any:
+        client._cache.clear()
+        return client.get_trip("1")
+
+    return miss
+
+
+@benchmark("client_unchanged_refetch")
+def client_unchanged_refetch(sizes: Sizes) -> Callable[[], Any]:
+    client = replay_client("/trips/1", make_trip_data(step_count=sizes.steps))
+    client.get_trip("1")
+
+    def refetch() -> Any:
+        client._cache.clear()
+        return client.get_trip("1")
+
+    return refetch
+
+
+@benchmark("trip_detailed_summary")
+def trip_detailed_summary(sizes: Sizes) -> Callable[[], Any]:
+    trip = Trip(**make_trip_data(step_count=sizes.steps, media_per_step=sizes.media))
+    return lambda: trip.to_detailed_summary()
+
+
+@benchmark("user_trips_summary")
+def user_trips_summary(sizes: Sizes) -> Callable[[], Any]:
+    user = User(**make_user_data(trip_count=sizes.trips * 10, follower_count=0))
+    return lambda: user.to_trips_summary()
+
+
+@benchmark("trip_dump_json")
+def trip_dump_json(sizes: Sizes) -> Callable[[], Any]:
+    trip = Trip(**make_trip_data(step_count=sizes.steps, media_per_step=sizes.media))
+    return lambda: trip.model_dump_json()
+
+
+def measure(fn: Callable[[], Any], repeat: int = 5) -> float:
+    """Best seconds-per-call over `repeat` auto-ranged rounds"""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def run(
+    names: Optional[list[str]] = None,
+    sizes: Sizes = DEFAULT_SIZES,
+    repeat: int = 5,
+) -> dict[str, float]:
+    results = {}
+    for name in names or list(BENCHMARKS):
+        results[name] = measure(BENCHMARKS[name](sizes), repeat=repeat)
+    return results
+
+
+def find_regressions(
+    results: dict[str, float], baseline: dict[str, float], threshold: float
+) -> dict[str, float]:
+    """Benchmarks slower than baseline by more than `threshold`, as ratios"""
+    regressions = {}
+    for name, seconds in results.items():
+        previous = baseline.get(name)
+        if previous and seconds > previous * (1 + threshold):
+            regressions[name] = seconds / previous
+    return regressions
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="polarsteps-api benchmarks")
+    parser.add_argument("names", nargs="*", help=f"Subset of {', '.join(BENCHMARKS)}")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument("--save", help="Write results to this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--steps", type=int, default=DEFAULT_SIZES.steps)
+    parser.add_argument("--media", type=int, default=DEFAULT_SIZES.media)
+    parser.add_argument("--trips", type=int, default=DEFAULT_SIZES.trips)
+    parser.add_argument("--followers", type=int, default=DEFAULT_SIZES.followers)
+    args = parser.parse_args(argv)
+    unknown = set(args.names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    sizes = Sizes(args.steps, args.media, args.trips, args.followers)
+    results = run(args.names, sizes=sizes, repeat=args.repeat)
+
+    baseline: dict[str, float] = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    regressions = find_regressions(results, baseline, args.threshold)
+
+    for name, seconds in results.items():
+        line = f"{name:<24} {seconds * 1e6:>12,.1f} us"
+        if name in baseline:
+            line += f"  ({seconds / baseline[name]:.2f}x baseline)"
+        if name in regressions:
+            line += "  REGRESSION"
+        print(line)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=4)
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
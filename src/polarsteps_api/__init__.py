@@ -1,10 +1,19 @@
 """Polarsteps API client library."""
 
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
 __version__ = "0.1.0"
 
-# Import main client class
-from . import models
-from .client import PolarstepsClient
+if TYPE_CHECKING:
+    from . import models
+    from .client import PolarstepsClient
+
+# Imported on first access so `import polarsteps_api` stays cheap
+_LAZY_IMPORTS = {
+    "PolarstepsClient": ".client",
+    "models": ".models",
+}
 
 __all__ = [
     # Client
@@ -14,3 +23,17 @@ __all__ = [
     # Version
     "__version__",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    imported = import_module(module, __name__)
+    value = imported if name == "models" else getattr(imported, name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
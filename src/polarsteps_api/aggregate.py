@@ -0,0 +1,170 @@
+import functools
+import threading
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone, tzinfo
+from typing import Any, NamedTuple, Optional
+from zoneinfo import ZoneInfo
+
+from polarsteps_api.geo import haversine_km
+from polarsteps_api.models.trip import Trip
+
+UNKNOWN_COUNTRY = "unknown"
+
+
+@functools.lru_cache(maxsize=512)
+def _zone(name: Optional[str]) -> tzinfo:
+    if not name:
+        return timezone.utc
+    try:
+        return ZoneInfo(name)
+    except (KeyError, ValueError):
+        return timezone.utc
+
+
+class _StepRecord(NamedTuple):
+    country: str
+    day: date
+    km: float
+    media: int
+
+
+@dataclass
+class Bucket:
+    steps: int = 0
+    km: float = 0.0
+    media: int = 0
+    # Steps per calendar day, so removing a trip can drop emptied days
+    day_counts: Counter = field(default_factory=Counter)
+
+    @property
+    def days(self) -> int:
+        return len(self.day_counts)
+
+    def add(self, record: _StepRecord, sign: int = 1) -> None:
+        self.steps += sign
+        self.km += sign * record.km
+        self.media += sign * record.media
+        self.day_counts[record.day] += sign
+        if self.day_counts[record.day] <= 0:
+            del self.day_counts[record.day]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "steps": self.steps,
+            "km": round(self.km, 3),
+            "media": self.media,
+            "days": self.days,
+        }
+
+
+class TripAggregator:
+    """Step, km, media and day totals by country, local calendar day and year.
+
+    Trips are folded in one at a time; each trip's per-step records are kept
+    so that adding a newer version of a trip only reverses and re-applies
+    that trip. Distance is the great-circle distance between consecutive
+    steps, credited to the step arrived at. Days are calendar days in the
+    step's own timezone.
+    """
+
+    def __init__(self) -> None:
+        self.by_country: dict[str, Bucket] = {}
+        self.by_day: dict[date, Bucket] = {}
+        self.by_year: dict[int, Bucket] = {}
+        self.total = Bucket()
+        self._trips: dict[int, list[_StepRecord]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._trips)
+
+    def __contains__(self, trip_id: int) -> bool:
+        return trip_id in self._trips
+
+    @staticmethod
+    def _records(trip: Trip) -> list[_StepRecord]:
+        steps = sorted(
+            (
+                step
+                for step in trip.all_steps or []
+                if not step.is_deleted and step.start_time is not None
+            ),
+            key=lambda step: (step.start_time, step.id),
+        )
+        records = []
+        previous = None
+        for step in steps:
+            location = step.location
+            point = (
+                (location.lat, location.lon)
+                if location and location.lat is not None and location.lon is not None
+                else None
+            )
+            km = haversine_km(*previous, *point) if previous and point else 0.0
+            previous = point or previous
+            local = datetime.fromtimestamp(
+                step.start_time,  # type: ignore[arg-type]
+                _zone(step.timezone_id or trip.timezone_id),
+            )
+            country = (location.country_code or "").upper() if location else ""
+            records.append(
+                _StepRecord(
+                    country=country or UNKNOWN_COUNTRY,
+                    day=local.date(),
+                    km=km,
+                    media=sum(1 for item in step.media or [] if not item.is_deleted),
+                )
+            )
+        return records
+
+    def _apply(self, records: list[_StepRecord], sign: int) -> None:
+        for record in records:
+            for groups, key in (
+                (self.by_country, record.country),
+                (self.by_day, record.day),
+                (self.by_year, record.day.year),
+            ):
+                bucket = groups.get(key)
+                if bucket is None:
+                    bucket = groups[key] = Bucket()
+                bucket.add(record, sign)
+                if bucket.steps == 0:
+                    del groups[key]
+            self.total.add(record, sign)
+
+    def add_trip(self, trip: Trip) -> None:
+        """Fold in a trip, replacing any earlier version of it"""
+        if "all_steps" not in trip.model_fields_set:
+            # Embedded trips carry no steps; keep what we have
+            return
+        records = self._records(trip)
+        with self._lock:
+            previous = self._trips.pop(trip.id, None)
+            if previous:
+                self._apply(previous, -1)
+            self._apply(records, 1)
+            self._trips[trip.id] = records
+
+    def add_trips(self, trips: Iterable[Trip]) -> None:
+        for trip in trips:
+            self.add_trip(trip)
+
+    def remove_trip(self, trip_id: int) -> None:
+        with self._lock:
+            records = self._trips.pop(trip_id, None)
+            if records:
+                self._apply(records, -1)
+
+    def countries(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            return {k: b.to_dict() for k, b in sorted(self.by_country.items())}
+
+    def days(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            return {k.isoformat(): b.to_dict() for k, b in sorted(self.by_day.items())}
+
+    def years(self) -> dict[int, dict[str, Any]]:
+        with self._lock:
+            return {k: b.to_dict() for k, b in sorted(self.by_year.items())}
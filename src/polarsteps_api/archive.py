@@ -0,0 +1,193 @@
+import json
+import os
+from collections.abc import Iterable, Iterator
+from typing import IO, Any, Generic, Optional, TypeVar
+
+from pydantic import BaseModel
+
+from polarsteps_api.serialization import dumps
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+INDEX_SUFFIX = ".idx"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+COMPRESSIONS = (None, "zstd")
+
+
+def _zstd() -> Any:
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError(
+            "zstd compressed archives require the 'zstandard' package: "
+            "pip install polarsteps-api[zstd]"
+        ) from e
+    return zstandard
+
+
+def index_path(path: str) -> str:
+    return f"{path}{INDEX_SUFFIX}"
+
+
+class ArchiveWriter:
+    """Append-only NDJSON archive of models with a `<path>.idx` side index.
+
+    Records are written one JSON document per line, optionally grouped into
+    independently compressed zstd frames of `chunk_size` records. The index
+    maps each record ID to the byte range holding it.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        compression: Optional[str] = None,
+        chunk_size: int = 256,
+        compression_level: int = 3,
+    ):
+        if compression not in COMPRESSIONS:
+            raise ValueError(
+                f"Unsupported compression '{compression}', expected one of {COMPRESSIONS}"
+            )
+        self.path = path
+        self.compression = compression
+        self.chunk_size = max(1, chunk_size)
+        self._compressor = (
+            _zstd().ZstdCompressor(level=compression_level) if compression else None
+        )
+        self._data: IO[bytes] = open(path, "ab")  # noqa: SIM115
+        self._index: IO[str] = open(index_path(path), "a", encoding="utf-8")  # noqa: SIM115
+        self._pending: list[tuple[str, bytes]] = []
+        self.records_written = 0
+
+    def __enter__(self) -> "ArchiveWriter":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def write(self, model: BaseModel, record_id: Optional[Any] = None) -> None:
+        """Append a model, indexed under `record_id` (defaults to `model.id`)"""
+        key = str(record_id if record_id is not None else model.id)  # type: ignore[attr-defined]
+        line = dumps(model) + b"\n"
+        if self._compressor is None:
+            offset = self._data.tell()
+            self._data.write(line)
+            self._write_index({"id": key, "offset": offset, "length": len(line)})
+        else:
+            self._pending.append((key, line))
+            if len(self._pending) >= self.chunk_size:
+                self._flush_chunk()
+        self.records_written += 1
+
+    def write_many(self, models: Iterable[BaseModel]) -> int:
+        count = 0
+        for model in models:
+            self.write(model)
+            count += 1
+        return count
+
+    def _write_index(self, entry: dict[str, Any]) -> None:
+        self._index.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    def _flush_chunk(self) -> None:
+        if not self._pending or self._compressor is None:
+            return
+        frame = self._compressor.compress(b"".join(line for _, line in self._pending))
+        offset = self._data.tell()
+        self._data.write(frame)
+        # Data goes to disk before the index entries pointing into it
+        self._data.flush()
+        for position, (key, _) in enumerate(self._pending):
+            self._write_index(
+                {"id": key, "offset": offset, "length": len(frame), "line": position}
+            )
+        self._pending = []
+
+    def flush(self) -> None:
+        self._flush_chunk()
+        self._data.flush()
+        self._index.flush()
+
+    def close(self) -> None:
+        if self._data.closed:
+            return
+        self.flush()
+        self._data.close()
+        self._index.close()
+
+
+class ArchiveReader(Generic[ModelT]):
+    def __init__(self, path: str, model: type[ModelT]):
+        self.path = path
+        self.model = model
+        self._index: Optional[dict[str, dict[str, Any]]] = None
+        with open(path, "rb") as f:
+            self.compressed = f.read(len(ZSTD_MAGIC)) == ZSTD_MAGIC
+
+    @property
+    def index(self) -> dict[str, dict[str, Any]]:
+        """Record ID -> byte range, loaded on first use; later writes win"""
+        if self._index is None:
+            self._index = {}
+            if os.path.exists(index_path(self.path)):
+                with open(index_path(self.path), encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            entry = json.loads(line)
+                            self._index[entry["id"]] = entry
+        return self._index
+
+    def __contains__(self, record_id: Any) -> bool:
+        return str(record_id) in self.index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def get_raw(self, record_id: Any) -> Optional[bytes]:
+        entry = self.index.get(str(record_id))
+        if entry is None:
+            return None
+        with open(self.path, "rb") as f:
+            f.seek(entry["offset"])
+            block = f.read(entry["length"])
+        if not self.compressed:
+            return block
+        lines = _zstd().ZstdDecompressor().decompress(block).splitlines()
+        return lines[entry["line"]]
+
+    def get(self, record_id: Any) -> Optional[ModelT]:
+        """Seek directly to a single record and parse it"""
+        raw = self.get_raw(record_id)
+        return self.model.model_validate_json(raw) if raw is not None else None
+
+    def iter_raw(self) -> Iterator[bytes]:
+        with open(self.path, "rb") as f:
+            if self.compressed:
+                reader = (
+                    _zstd().ZstdDecompressor().stream_reader(f, read_across_frames=True)
+                )
+                stream: Iterable[bytes] = _iter_lines(reader)
+            else:
+                stream = f
+            for line in stream:
+                if line.strip():
+                    yield line
+
+    def __iter__(self) -> Iterator[ModelT]:
+        """Stream every record back as a model, in write order"""
+        validate = self.model.model_validate_json
+        for line in self.iter_raw():
+            yield validate(line)
+
+
+def _iter_lines(reader: Any, block_size: int = 1 << 20) -> Iterator[bytes]:
+    buffer = b""
+    while True:
+        block = reader.read(block_size)
+        if not block:
+            break
+        buffer += block
+        *lines, buffer = buffer.split(b"\n")
+        yield from lines
+    if buffer:
+        yield buffer
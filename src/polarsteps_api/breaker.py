@@ -0,0 +1,72 @@
+import threading
+import time
+from typing import Callable
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Fails fast after `failure_threshold` consecutive connection failures.
+
+    Once open, requests are refused for `reset_timeout` seconds; then a single
+    probe is let through, closing the circuit if it succeeds and re-opening it
+    otherwise.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if failure_threshold < 1:
+            raise ValueError("Failure threshold must be at least 1")
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._can_probe():
+                return HALF_OPEN
+            return self._state
+
+    def _can_probe(self) -> bool:
+        return self.clock() - self._opened_at >= self.reset_timeout
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now; claims the probe when half-open"""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._probing or not self._can_probe():
+                return False
+            self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._state = CLOSED
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._probing or self.failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = self.clock()
+            self._probing = False
+
+    def release(self) -> None:
+        """Give back a claimed probe without an outcome, e.g. when the call raised"""
+        with self._lock:
+            self._probing = False
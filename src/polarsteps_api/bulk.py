@@ -0,0 +1,125 @@
+import os
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import NamedTuple, Optional, Union
+
+from pydantic import BaseModel
+
+from polarsteps_api.archive import ArchiveReader
+from polarsteps_api.serialization import Preset, dumps
+
+Payload = Union[bytes, str]
+
+MODELS = ("trip", "user")
+
+
+class BulkResult(NamedTuple):
+    # Position of the payload in the input
+    index: int
+    # The re-serialised model, or None when parsing failed
+    data: Optional[bytes]
+    error: Optional[str] = None
+
+
+def _model_class(model: str) -> type[BaseModel]:
+    if model == "trip":
+        from polarsteps_api.models.trip import Trip
+
+        return Trip
+    if model == "user":
+        from polarsteps_api.models.user import User
+
+        return User
+    raise ValueError(f"Unknown model '{model}', expected one of {', '.join(MODELS)}")
+
+
+def _parse_chunk(
+    model: str,
+    start: int,
+    payloads: list[Payload],
+    preset: Union[str, Preset, None],
+) -> list[BulkResult]:
+    """Runs in a worker process: parse a chunk and send back JSON bytes only"""
+    cls = _model_class(model)
+    results = []
+    for offset, payload in enumerate(payloads):
+        try:
+            parsed = cls.model_validate_json(payload)
+            results.append(BulkResult(start + offset, dumps(parsed, preset=preset)))
+        except Exception as e:
+            results.append(BulkResult(start + offset, None, str(e)))
+    return results
+
+
+def _chunks(
+    payloads: Iterable[Payload], chunk_size: int
+) -> Iterator[tuple[int, list[Payload]]]:
+    iterator = iter(payloads)
+    start = 0
+    while chunk := list(islice(iterator, chunk_size)):
+        yield start, chunk
+        start += len(chunk)
+
+
+def reparse(
+    payloads: Iterable[Payload],
+    model: str = "trip",
+    workers: Optional[int] = None,
+    chunk_size: int = 64,
+    ordered: bool = True,
+    preset: Union[str, Preset, None] = None,
+) -> Iterator[BulkResult]:
+    """Parse raw JSON payloads into models across a process pool.
+
+    Payloads are sent to worker processes in chunks and each model comes back
+    re-serialised as compact JSON, since pickling pydantic object graphs would
+    cost more than the parse itself. Only a few chunks per worker are in
+    flight at once, so the input may be a lazy stream. With `ordered=False`
+    results are yielded as chunks complete. `workers=1` parses in-process.
+    """
+    _model_class(model)
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunks(payloads, max(1, chunk_size))
+    if workers == 1:
+        for start, chunk in chunks:
+            yield from _parse_chunk(model, start, chunk, preset)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: deque[Future[list[BulkResult]]] = deque()
+
+        def fill() -> None:
+            while len(pending) < workers * 2:
+                item = next(chunks, None)
+                if item is None:
+                    return
+                start, chunk = item
+                pending.append(
+                    executor.submit(_parse_chunk, model, start, chunk, preset)
+                )
+
+        fill()
+        while pending:
+            if ordered:
+                yield from pending.popleft().result()
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.remove(future)
+                    yield from future.result()
+            fill()
+
+
+def reparse_archive(
+    path: str,
+    model: str = "trip",
+    workers: Optional[int] = None,
+    chunk_size: int = 64,
+    ordered: bool = True,
+    preset: Union[str, Preset, None] = None,
+) -> Iterator[BulkResult]:
+    """`reparse` over every record of an archive written by ArchiveWriter"""
+    reader = ArchiveReader(path, _model_class(model))
+    return reparse(reader.iter_raw(), model, workers, chunk_size, ordered, preset)
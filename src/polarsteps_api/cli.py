@@ -0,0 +1,294 @@
+import argparse
+import os
+import sys
+import threading
+import time
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import IO, Any, Optional, TextIO, Union
+
+from pydantic import BaseModel
+
+from polarsteps_api.client import PolarstepsClient
+from polarsteps_api.serialization import dumps
+
+FORMATS = ("ndjson", "sqlite", "parquet")
+EXTENSIONS = {
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".sqlite": "sqlite",
+    ".sqlite3": "sqlite",
+    ".db": "sqlite",
+    ".parquet": "parquet",
+}
+
+
+def read_keys(values: Sequence[str], path: Optional[str]) -> list[str]:
+    """Keys given on the command line plus one per line of `path` ("-": stdin)"""
+    keys = list(values)
+    if path:
+        if path == "-":
+            keys.extend(line.strip() for line in sys.stdin)
+        else:
+            with open(path, encoding="utf-8") as fp:
+                keys.extend(line.strip() for line in fp)
+    # Drop blanks, comments and duplicates, keeping the input order
+    return list(dict.fromkeys(key for key in keys if key and not key.startswith("#")))
+
+
+class NDJSONSink:
+    """One `{"type": ..., "data": ...}` document per line"""
+
+    def __init__(self, path: Optional[str]):
+        self._fp: IO[bytes] = (
+            open(path, "wb")  # noqa: SIM115
+            if path and path != "-"
+            else sys.stdout.buffer
+        )
+        self._owned = self._fp is not sys.stdout.buffer
+
+    def write(self, kind: str, key: str, model: BaseModel) -> None:
+        self._fp.write(b'{"type":"' + kind.encode() + b'","data":')
+        self._fp.write(dumps(model))
+        self._fp.write(b"}\n")
+
+    def close(self) -> None:
+        self._fp.flush()
+        if self._owned:
+            self._fp.close()
+
+
+class SQLiteSink:
+    """Upserts into a TripStore database"""
+
+    def __init__(self, path: str):
+        from polarsteps_api.store import TripStore
+
+        self.store = TripStore(path)
+
+    def write(self, kind: str, key: str, model: Any) -> None:
+        if kind == "user":
+            self.store.upsert_user(model)
+        else:
+            self.store.upsert_trip(model)
+
+    def close(self) -> None:
+        self.store.close()
+
+
+class ParquetSink:
+    """Rows of (type, id, key, fetched_at, data JSON), written in batches"""
+
+    def __init__(self, path: str, batch_size: int = 1_000):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Parquet output requires the 'pyarrow' package") from e
+        self._pa = pa
+        self.schema = pa.schema(
+            [
+                ("type", pa.string()),
+                ("id", pa.int64()),
+                ("key", pa.string()),
+                ("fetched_at", pa.float64()),
+                ("data", pa.string()),
+            ]
+        )
+        self._writer = pq.ParquetWriter(path, self.schema)
+        self.batch_size = batch_size
+        self._rows: list[dict[str, Any]] = []
+
+    def write(self, kind: str, key: str, model: Any) -> None:
+        self._rows.append(
+            {
+                "type": kind,
+                "id": model.id,
+                "key": key,
+                "fetched_at": time.time(),
+                "data": dumps(model).decode(),
+            }
+        )
+        if len(self._rows) >= self.batch_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._rows:
+            table = self._pa.Table.from_pylist(self._rows, schema=self.schema)
+            self._writer.write_table(table)
+            self._rows = []
+
+    def close(self) -> None:
+        self._flush()
+        self._writer.close()
+
+
+Sink = Union[NDJSONSink, SQLiteSink, ParquetSink]
+
+
+def open_sink(output: Optional[str], fmt: Optional[str]) -> Sink:
+    if fmt is None:
+        extension = os.path.splitext(output or "")[1].lower()
+        fmt = EXTENSIONS.get(extension, "ndjson")
+    if fmt == "ndjson":
+        return NDJSONSink(output)
+    if not output or output == "-":
+        raise ValueError(f"{fmt} output needs a file path")
+    if fmt == "sqlite":
+        return SQLiteSink(output)
+    return ParquetSink(output)
+
+
+class Progress:
+    """Live throughput and error counts, redrawn on one stderr line"""
+
+    def __init__(self, total: int, stream: TextIO = sys.stderr, interval: float = 0.5):
+        self.total = total
+        self.stream = stream
+        self.interval = interval
+        self.done = 0
+        self.errors = 0
+        self.started = time.perf_counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "Progress":
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.stream.write("\r" + self.line())
+            self.stream.flush()
+
+    def line(self) -> str:
+        elapsed = time.perf_counter() - self.started
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        return (
+            f"{self.done}/{self.total} fetched, {self.errors} errors, "
+            f"{rate:.1f}/s, {elapsed:.1f}s"
+        )
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self.stream.write("\r" + self.line() + "\n")
+            self.stream.flush()
+
+
+def _jobs(usernames: list[str], trip_ids: list[str]) -> Iterator[tuple[str, str]]:
+    yield from (("user", username) for username in usernames)
+    yield from (("trip", trip_id) for trip_id in trip_ids)
+
+
+def fetch(args: argparse.Namespace) -> int:
+    usernames = read_keys(args.username, args.users_file)
+    trip_ids = read_keys(args.trip_id, args.trips_file)
+    if not usernames and not trip_ids:
+        print("Nothing to fetch: give usernames or trip IDs", file=sys.stderr)
+        return 2
+
+    # Usage problems are reported before anything is fetched
+    try:
+        sink = open_sink(args.output, args.format)
+    except (ValueError, ImportError, OSError) as e:
+        print(f"Cannot write output: {e}", file=sys.stderr)
+        return 2
+    try:
+        client = PolarstepsClient(
+            cache_ttl=args.cache_ttl,
+            cache_maxsize=max(1_000, len(usernames) + len(trip_ids)),
+            cache_embedded_trips=True,
+        )
+    except ValueError as e:
+        sink.close()
+        print(e, file=sys.stderr)
+        return 2
+    progress = Progress(len(usernames) + len(trip_ids))
+    if not args.quiet:
+        progress.start()
+
+    def run(kind: str, key: str) -> tuple[str, str, Any]:
+        if kind == "user":
+            return kind, key, client.get_user_by_username(key)
+        return kind, key, client.get_trip(key)
+
+    try:
+        with ThreadPoolExecutor(
+            max_workers=max(1, args.workers), thread_name_prefix="polarsteps-fetch"
+        ) as executor:
+            futures = [executor.submit(run, *job) for job in _jobs(usernames, trip_ids)]
+            # Only this thread writes to the sink
+            for future in as_completed(futures):
+                kind, key, response = future.result()
+                model = response.user if kind == "user" else response.trip
+                if response.is_error or model is None:
+                    progress.errors += 1
+                    print(
+                        f"Failed to fetch {kind} {key}: "
+                        f"{response.status_code} {response.data}",
+                        file=sys.stderr,
+                    )
+                else:
+                    sink.write(kind, key, model)
+                progress.done += 1
+    finally:
+        progress.stop()
+        sink.close()
+        client.close()
+    return 1 if progress.errors else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="polarsteps")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    fetch_parser = commands.add_parser(
+        "fetch", help="Fetch users and trips concurrently and export them"
+    )
+    fetch_parser.add_argument(
+        "-u", "--username", action="append", default=[], help="Username to fetch"
+    )
+    fetch_parser.add_argument(
+        "-t", "--trip-id", action="append", default=[], help="Trip ID to fetch"
+    )
+    fetch_parser.add_argument(
+        "--users-file", help="File with one username per line ('-' for stdin)"
+    )
+    fetch_parser.add_argument(
+        "--trips-file", help="File with one trip ID per line ('-' for stdin)"
+    )
+    fetch_parser.add_argument(
+        "-o", "--output", help="Output path (default: NDJSON on stdout)"
+    )
+    fetch_parser.add_argument(
+        "-f",
+        "--format",
+        choices=FORMATS,
+        help="Output format (default: from the output extension, else ndjson)",
+    )
+    fetch_parser.add_argument(
+        "-w", "--workers", type=int, default=8, help="Concurrent requests"
+    )
+    fetch_parser.add_argument(
+        "--cache-ttl", type=int, default=300, help="Response cache TTL in seconds"
+    )
+    fetch_parser.add_argument(
+        "-q", "--quiet", action="store_true", help="Hide live progress"
+    )
+    fetch_parser.set_defaults(handler=fetch)
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.users_file == "-" and args.trips_file == "-":
+        print("Only one of --users-file/--trips-file can read stdin", file=sys.stderr)
+        return 2
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
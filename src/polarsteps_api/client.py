@@ -1,13 +1,66 @@
+import copy
 import os
-from typing import Optional, Union
+import threading
+import time
+from collections.abc import Iterable, Iterator, Mapping, MutableMapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Any, Optional, TypeVar
+from urllib.parse import urlencode
 
 import requests
-from cachetools import TTLCache
-from dotenv import load_dotenv
+from cachetools import LRUCache, TLRUCache, TTLCache
 
+from polarsteps_api.breaker import CircuitBreaker
+from polarsteps_api.hashing import content_hash
+from polarsteps_api.hooks import (
+    CacheEvent,
+    ClientObserver,
+    ObservedTTLCache,
+    RequestEnd,
+    RequestStart,
+    notify,
+)
 from polarsteps_api.models.base import BaseRequest, BaseResponse
 from polarsteps_api.models.request import GetTripRequest, GetUserByUsernameRequest
 from polarsteps_api.models.response import TripResponse, UserResponse
+from polarsteps_api.models.trip import Trip
+from polarsteps_api.models.user import User
+from polarsteps_api.pipeline import Middleware, RequestPipeline, decode
+from polarsteps_api.prefetch import Prefetcher, PrefetchPolicy
+from polarsteps_api.profiling import validate_model
+from polarsteps_api.transport import Transport
+
+# Mostly trip and user responses, but send() caches any endpoint
+CachedResponse = BaseResponse
+ResponseT = TypeVar("ResponseT", bound=BaseResponse)
+ItemT = TypeVar("ItemT", Trip, User)
+
+# Cached under their bare key (trip id, username), as the client always did
+_BARE_KEYS = (GetTripRequest, GetUserByUsernameRequest)
+
+
+def _client_key(request: BaseRequest) -> Optional[str]:
+    """The request's cache key, qualified by its class outside `_BARE_KEYS`"""
+    key = request.cache_key()
+    if key is None or isinstance(request, _BARE_KEYS):
+        return key
+    return f"{type(request).__name__}:{key}"
+
+
+_dotenv_loaded = False
+
+
+def load_dotenv() -> None:
+    """Load `.env` into the environment once per process, importing dotenv lazily"""
+    global _dotenv_loaded
+    if _dotenv_loaded:
+        return
+    from dotenv import load_dotenv as _load_dotenv
+
+    # Searching for the file walks up the filesystem; do it only once
+    _load_dotenv()
+    _dotenv_loaded = True
 
 
 class HTTPClient:
@@ -15,10 +68,20 @@ class HTTPClient:
         self,
         base_url: str,
         remember_token: str,
+        transport: Optional[Transport] = None,
+        observers: Optional[list[ClientObserver]] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        hash_content: bool = False,
     ):
         self.base_url = base_url.rstrip("/")
         self.remember_token = remember_token
         self.session = requests.Session()
+        # Record/replay transports stand in for the session when provided
+        self.transport: Transport = transport if transport is not None else self.session
+        self.observers = observers if observers is not None else []
+        self.circuit_breaker = circuit_breaker
+        # Fingerprint bodies only for callers that compare them
+        self.hash_content = hash_content
 
         # Set default headers from config
         headers = {
@@ -32,32 +95,125 @@ class HTTPClient:
 
     def execute(self, request: BaseRequest) -> BaseResponse:
         url = f"{self.base_url}{request.get_endpoint()}"
+        params = request.get_params()
+        if params:
+            # In the URL itself, so recorded fixtures are keyed by the query too
+            url = f"{url}?{urlencode(params, doseq=True)}"
+        method = request.get_method()
+        observers = self.observers
+        name = type(request).__name__
+        breaker = self.circuit_breaker
+        if breaker is not None and not breaker.allow():
+            error = "Circuit breaker open: upstream connection failures"
+            if observers:
+                event = RequestEnd(
+                    request=name,
+                    method=method,
+                    url=url,
+                    status_code=0,
+                    total_seconds=0.0,
+                    error=error,
+                )
+                notify(observers, "on_request_end", event)
+            refused = BaseResponse(data={"error": error}, status_code=0, headers={})
+            # Retrying before the reset timeout would only be refused again
+            refused.retryable = False
+            return refused
+        if observers:
+            notify(observers, "on_request_start", RequestStart(name, method, url))
 
         # Merge request headers with session headers
         headers = {**self.session.headers, **request.headers}
 
+        started = time.perf_counter()
         try:
-            response = self.session.request(
-                method=request.get_method(),
+            response = self.transport.request(
+                method=method,
                 url=url,
                 headers=headers,
             )
+        except requests.RequestException as e:
+            if breaker is not None:
+                breaker.record_failure()
+            if observers:
+                event = RequestEnd(
+                    request=name,
+                    method=method,
+                    url=url,
+                    status_code=0,
+                    total_seconds=time.perf_counter() - started,
+                    error=str(e),
+                )
+                notify(observers, "on_request_end", event)
+            # Return error response
+            return BaseResponse(data={"error": str(e)}, status_code=0, headers={})
+        except BaseException:
+            # Not an upstream failure: free a claimed probe so the next call
+            # can try, instead of leaving the breaker refusing everything
+            if breaker is not None:
+                breaker.release()
+            raise
+        received = time.perf_counter()
+        if breaker is not None:
+            breaker.record_success()
 
-            # Try to parse JSON, fallback to text
-            try:
-                data = response.json()
-            except ValueError:
-                data = response.text
+        # Try to parse JSON, fallback to text
+        try:
+            data = response.json()
+        except ValueError:
+            data = response.text
 
-            return BaseResponse(
-                data=data,
+        if observers:
+            event = RequestEnd(
+                request=name,
+                method=method,
+                url=url,
                 status_code=response.status_code,
-                headers=dict(response.headers),
+                total_seconds=received - started,
+                ttfb_seconds=_elapsed_seconds(response),
+                response_bytes=_content_length(response),
+                json_decode_seconds=time.perf_counter() - received,
             )
+            notify(observers, "on_request_end", event)
+
+        result = BaseResponse(
+            data=data,
+            status_code=response.status_code,
+            headers=dict(response.headers),
+        )
+        if self.hash_content:
+            content = getattr(response, "content", None)
+            if isinstance(content, (bytes, bytearray)):
+                result.content_hash = content_hash(content)
+        return result
+
+
+def _has_all_steps(trip: Trip) -> bool:
+    """Whether an embedded trip carries its steps, not an empty placeholder"""
+    steps = trip.all_steps
+    if not steps or "all_steps" not in trip.model_fields_set:
+        return False
+    if "step_count" in trip.model_fields_set:
+        return len(steps) == trip.step_count
+    return True
+
+
+def _raise_for_page(response: BaseResponse, username: str, field: str) -> None:
+    if response.is_error:
+        raise RuntimeError(
+            f"Failed to fetch {field} of {username}: "
+            f"{response.status_code} {response.data}"
+        )
+
+
+def _elapsed_seconds(response: Any) -> Optional[float]:
+    elapsed = getattr(response, "elapsed", None)
+    return elapsed.total_seconds() if isinstance(elapsed, timedelta) else None
 
-        except requests.RequestException as e:
-            # Return error response
-            return BaseResponse(data={"error": str(e)}, status_code=0, headers={})
+
+def _content_length(response: Any) -> Optional[int]:
+    content = getattr(response, "content", None)
+    return len(content) if isinstance(content, (bytes, bytearray)) else None
 
 
 class PolarstepsClient:
@@ -69,6 +225,17 @@ class PolarstepsClient:
         remember_token: Optional[str] = None,
         cache_ttl: int = 300,  # 5 minutes,
         cache_maxsize: int = 1_000,
+        transport: Optional[Transport] = None,
+        observers: Optional[list[ClientObserver]] = None,
+        cache: Optional[MutableMapping[str, CachedResponse]] = None,
+        stale_while_revalidate: int = 0,
+        stale_if_error: int = 0,
+        negative_ttl: Optional[Mapping[int, float]] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        prefetch: Optional[PrefetchPolicy] = None,
+        cache_embedded_trips: bool = False,
+        reuse_unchanged: bool = True,
+        middleware: Optional[Sequence[Middleware]] = None,
     ):
         if not remember_token:
             load_dotenv()
@@ -78,54 +245,314 @@ class PolarstepsClient:
                 "Remember token must be provided either directly or via configuration"
             )
 
+        self.observers: list[ClientObserver] = list(observers or [])
         self.http_client = HTTPClient(
             base_url=self.base_url,
             remember_token=remember_token,
+            transport=transport,
+            observers=self.observers,
+            circuit_breaker=circuit_breaker,
+            hash_content=reuse_unchanged,
         )
-        self._cache: TTLCache[str, Union[TripResponse, UserResponse]] = TTLCache(
-            maxsize=cache_maxsize, ttl=cache_ttl
+        if middleware:
+            self.http_client = RequestPipeline(self.http_client, middleware)  # type: ignore[assignment]
+        # A caller-provided cache (e.g. shared across a ClientPool) wins
+        self._cache: MutableMapping[str, CachedResponse] = (
+            cache
+            if cache is not None
+            else ObservedTTLCache(
+                maxsize=cache_maxsize, ttl=cache_ttl, observers=self.observers
+            )
         )
 
-    def get_trip(self, trip_id: str) -> TripResponse:
+        # Seconds past expiry a response may still be served: while it is
+        # refreshed in the background, or when the API is failing
+        self.cache_ttl = cache_ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self.stale_if_error = stale_if_error
+        self._stale: Optional[TTLCache[str, tuple[float, CachedResponse]]] = None
+        if stale_while_revalidate or stale_if_error:
+            self._stale = TTLCache(
+                maxsize=cache_maxsize,
+                ttl=cache_ttl + max(stale_while_revalidate, stale_if_error),
+            )
+        self._stale_lock = threading.Lock()
+        self._refreshing: set[str] = set()
+        self._refresh_lock = threading.Lock()
+        self._refresher: Optional[ThreadPoolExecutor] = None
+
+        # Error responses cached briefly, keyed by status code or status class
+        self.negative_ttl = dict(negative_ttl or {})
+        self._negative: Optional[TLRUCache[str, CachedResponse]] = None
+        if self.negative_ttl:
+            self._negative = TLRUCache(maxsize=cache_maxsize, ttu=self._negative_ttu)
+        self._negative_lock = threading.Lock()
+
+        # Background loading of a fetched user's likely next trips
+        self.prefetch = prefetch
+        self._prefetcher = Prefetcher(self, prefetch) if prefetch else None
+
+        # Trips embedded in user responses; complete ones also fill the cache
+        self.cache_embedded_trips = cache_embedded_trips
+        self._partial_trips: Optional[TTLCache[str, TripResponse]] = None
+        if cache_embedded_trips:
+            self._partial_trips = TTLCache(maxsize=cache_maxsize, ttl=cache_ttl)
+        self._partial_trips_lock = threading.Lock()
+
+        # Last parsed response per key, outliving the TTL: a refetched body with
+        # the same content hash reuses its model instead of validating again
+        self._last_parsed: Optional[LRUCache[str, CachedResponse]] = None
+        if reuse_unchanged:
+            self._last_parsed = LRUCache(maxsize=cache_maxsize)
+        self._last_parsed_lock = threading.Lock()
+
+    def _negative_ttl_for(self, status_code: int) -> Optional[float]:
+        ttl = self.negative_ttl.get(status_code)
+        if ttl is None:
+            ttl = self.negative_ttl.get(status_code // 100 * 100)
+        return ttl
+
+    def _negative_ttu(self, key: str, response: CachedResponse, now: float) -> float:
+        return now + (self._negative_ttl_for(response.status_code) or 0)
+
+    def add_observer(self, observer: ClientObserver) -> None:
+        """Subscribe an observer to request, validation and cache events"""
+        self.observers.append(observer)
+
+    def _notify_cache(self, kind: str, key: str) -> None:
+        if self.observers:
+            notify(self.observers, "on_cache", CacheEvent(kind, key))
+
+    def _stale_entry(
+        self, key: str, response_cls: type[ResponseT], grace: int
+    ) -> Optional[ResponseT]:
+        """The last good response if it expired no more than `grace` seconds ago"""
+        if not grace or self._stale is None:
+            return None
+        with self._stale_lock:
+            entry = self._stale.get(key)
+        if entry is None:
+            return None
+        stored_at, response = entry
+        if not isinstance(response, response_cls):
+            return None
+        if time.monotonic() - stored_at > self.cache_ttl + grace:
+            return None
+        return response
+
+    def _refresh(
+        self, key: str, response_cls: type[ResponseT], request: BaseRequest
+    ) -> None:
+        # One background refresh per key at a time
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            if self._refresher is None:
+                self._refresher = ThreadPoolExecutor(
+                    max_workers=2, thread_name_prefix="polarsteps-refresh"
+                )
+            refresher = self._refresher
+
+        def run() -> None:
+            try:
+                self._load(key, response_cls, request)
+            except Exception as e:
+                print(f"Background refresh of {key} failed: {e}")
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.discard(key)
+
+        refresher.submit(run)
+
+    def _fetch(
+        self, key: str, response_cls: type[ResponseT], request: BaseRequest
+    ) -> ResponseT:
         # Check the cache first
-        cached_response = self._cache.get(trip_id)
-        if cached_response is not None and isinstance(cached_response, TripResponse):
+        cached_response = self._cache.get(key)
+        if cached_response is not None and isinstance(cached_response, response_cls):
+            self._notify_cache("hit", key)
             return cached_response
 
-        # Cache miss - make the API call
-        request = GetTripRequest(trip_id)
+        # Expired but within the grace period: serve it and refresh behind it
+        stale = self._stale_entry(key, response_cls, self.stale_while_revalidate)
+        if stale is not None:
+            self._notify_cache("stale", key)
+            self._refresh(key, response_cls, request)
+            return stale
+
+        if self._negative is not None:
+            with self._negative_lock:
+                failed = self._negative.get(key)
+            if failed is not None and isinstance(failed, response_cls):
+                self._notify_cache("negative", key)
+                return failed
+
+        self._notify_cache("miss", key)
+        return self._load(key, response_cls, request)
+
+    def _unchanged(
+        self, key: str, response_cls: type[ResponseT], response: BaseResponse
+    ) -> Optional[ResponseT]:
+        """The previous response with the new body's metadata, if bytes match"""
+        if self._last_parsed is None or response.content_hash is None:
+            return None
+        with self._last_parsed_lock:
+            previous = self._last_parsed.get(key)
+        if (
+            not isinstance(previous, response_cls)
+            or previous.content_hash != response.content_hash
+            or previous.status_code != response.status_code
+        ):
+            return None
+        reused = copy.copy(previous)
+        reused.data = response.data
+        reused.headers = response.headers
+        return reused
+
+    def _load(
+        self, key: str, response_cls: type[ResponseT], request: BaseRequest
+    ) -> ResponseT:
+        # Cached and decoded here, so pipeline cache/decode stages stand aside
+        request.client_managed = True
         response = self.http_client.execute(request)
 
-        trip_response = TripResponse(
-            data=response.data,
-            status_code=response.status_code,
-            headers=response.headers,
-        )
+        parsed = self._unchanged(key, response_cls, response)
+        if parsed is not None:
+            self._notify_cache("unchanged", key)
+        else:
+            parsed = decode(response, response_cls, self.observers, key)
+
+        # Error responses only go to the short-lived negative cache
+        if parsed.is_success:
+            self._cache[key] = parsed
+            if self._stale is not None:
+                with self._stale_lock:
+                    self._stale[key] = (time.monotonic(), parsed)
+            if self._last_parsed is not None and parsed.content_hash is not None:
+                with self._last_parsed_lock:
+                    self._last_parsed[key] = parsed
+            user = parsed.user if isinstance(parsed, UserResponse) else None
+            if self._partial_trips is not None and user is not None:
+                self._cache_embedded_trips(user, parsed.data)
+            if self._prefetcher is not None and user is not None:
+                self._prefetcher.prefetch_user(user)
+            return parsed
 
-        # Avoid caching error responses
-        if trip_response.is_success:
-            self._cache[trip_id] = trip_response
+        if response.status_code == 0 or response.status_code >= 500:
+            stale = self._stale_entry(key, response_cls, self.stale_if_error)
+            if stale is not None:
+                self._notify_cache("stale", key)
+                return stale
+        if self._negative is not None and self._negative_ttl_for(parsed.status_code):
+            with self._negative_lock:
+                self._negative[key] = parsed
+        return parsed
 
-        return trip_response
+    def _cache_embedded_trips(self, user: User, data: Any) -> None:
+        assert self._partial_trips is not None
+        raw_trips = data.get("alltrips") if isinstance(data, dict) else None
+        for index, trip in enumerate(user.alltrips or []):
+            key = str(trip.id)
+            raw = raw_trips[index] if raw_trips and index < len(raw_trips) else None
+            # The user endpoint usually leaves out the steps
+            if _has_all_steps(trip):
+                if key not in self._cache:
+                    self._cache[key] = TripResponse.from_trip(trip, raw)
+            else:
+                partial = TripResponse.from_trip(trip, raw, partial=True)
+                with self._partial_trips_lock:
+                    self._partial_trips[key] = partial
+
+    def send(self, request: BaseRequest) -> BaseResponse:
+        """Execute any request, decoded into its `response_model`.
+
+        Requests with a cache key get everything `get_trip` does: the client
+        cache, stale and negative entries and unchanged-body reuse.
+        """
+        response_cls = request.response_model or BaseResponse
+        key = _client_key(request)
+        if key is not None:
+            return self._fetch(key, response_cls, request)
+        request.client_managed = True
+        return decode(self.http_client.execute(request), response_cls, self.observers)
+
+    def get_trip(self, trip_id: str, allow_partial: bool = False) -> TripResponse:
+        """Fetch a trip; `allow_partial` accepts one embedded in a fetched user"""
+        if allow_partial and self._partial_trips is not None:
+            with self._partial_trips_lock:
+                partial = self._partial_trips.get(trip_id)
+            if partial is not None and trip_id not in self._cache:
+                self._notify_cache("partial", trip_id)
+                return partial
+        return self._fetch(trip_id, TripResponse, GetTripRequest(trip_id))
 
     def get_user_by_username(self, username: str) -> UserResponse:
-        # Check the cache first
-        cached_response = self._cache.get(username)
-        if cached_response is not None and isinstance(cached_response, UserResponse):
-            return cached_response
+        return self._fetch(username, UserResponse, GetUserByUsernameRequest(username))
 
-        # Cache miss - make the API call
-        request = GetUserByUsernameRequest(username)
-        response = self.http_client.execute(request)
+    def iter_user_trips(self, username: str, page_size: int = 50) -> Iterator[Trip]:
+        """Yield a user's trips, fetching `page_size` of them per request"""
+        return self._iter_pages(username, "alltrips", Trip, page_size)
 
-        user_response = UserResponse(
-            data=response.data,
-            status_code=response.status_code,
-            headers=response.headers,
-        )
+    def iter_followers(self, username: str, page_size: int = 100) -> Iterator[User]:
+        """Yield a user's followers, fetching `page_size` of them per request"""
+        return self._iter_pages(username, "followers", User, page_size)
+
+    def _iter_pages(
+        self, username: str, field: str, model_cls: type[ItemT], page_size: int
+    ) -> Iterator[ItemT]:
+        # A full profile already in the cache needs no requests at all
+        cached = self._cache.get(username)
+        if isinstance(cached, UserResponse) and cached.user is not None:
+            yield from getattr(cached.user, field) or []
+            return
+
+        offset = 0
+        first_id = None
+        while True:
+            request = GetUserByUsernameRequest(
+                username, fields=[field], offset=offset, limit=page_size
+            )
+            # Pages are partial users, validated item by item below
+            request.client_managed = True
+            response = self.http_client.execute(request)
+            _raise_for_page(response, username, field)
+            items = (
+                response.data.get(field) if isinstance(response.data, dict) else None
+            )
+            items = items or []
+            page_first = items[0].get("id") if items else None
+            if offset and page_first is not None and page_first == first_id:
+                # The server ignored the offset and sent the first page again:
+                # fetch the whole profile once and continue where we were
+                full = self.get_user_by_username(username)
+                _raise_for_page(full, username, field)
+                if full.user is None:
+                    raise RuntimeError(f"Failed to parse {field} of {username}")
+                yield from (getattr(full.user, field) or [])[offset:]
+                return
+            first_id = first_id if offset else page_first
+            # Items are validated one at a time, only as far as the caller reads
+            for item in items:
+                yield validate_model(model_cls, item)
+            # A short page is the last; a long one means the limit was ignored
+            if len(items) != page_size:
+                return
+            offset += len(items)
 
-        # Avoid caching error responses
-        if user_response.is_success:
-            self._cache[username] = user_response
+    def warm(
+        self, usernames: Iterable[str] = (), trip_ids: Iterable[str] = ()
+    ) -> dict[str, int]:
+        """Prime the cache with users and trips; returns each key's status code"""
+        if self._prefetcher is None:
+            self._prefetcher = Prefetcher(self, PrefetchPolicy(count=0))
+        return self._prefetcher.warm(usernames, trip_ids)
 
-        return user_response
+    def close(self) -> None:
+        """Wait for background refreshes and prefetches to finish"""
+        with self._refresh_lock:
+            refresher, self._refresher = self._refresher, None
+        if refresher is not None:
+            refresher.shutdown(wait=True)
+        if self._prefetcher is not None:
+            self._prefetcher.close()
@@ -0,0 +1,176 @@
+from collections.abc import Iterable
+from typing import Any, NamedTuple, Optional, TypeVar, Union
+
+from pydantic import BaseModel
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# Path elements are field names, or (key field, key value) for a list item
+PathElement = Union[str, tuple[str, Any]]
+IDENTITY_FIELDS = ("id", "uuid")
+
+
+class Change(NamedTuple):
+    # "set" a field, "add"/"remove" a list item, or "order" a list by its keys
+    op: str
+    path: tuple[PathElement, ...]
+    value: Any = None
+    # Position of an added item in the new list; None appends
+    index: Optional[int] = None
+
+
+def _identity(item: Any) -> Optional[tuple[str, Any]]:
+    if not isinstance(item, BaseModel):
+        return None
+    for name in IDENTITY_FIELDS:
+        value = getattr(item, name, None)
+        if value is not None:
+            return name, value
+    return None
+
+
+def _keyed(items: list[Any]) -> Optional[dict[tuple[str, Any], Any]]:
+    """Items by identity, or None when some item has none or keys repeat"""
+    keyed = {}
+    for item in items:
+        key = _identity(item)
+        if key is None or key in keyed:
+            return None
+        keyed[key] = item
+    return keyed
+
+
+def diff(old: BaseModel, new: BaseModel) -> list[Change]:
+    """Changes turning `old` into `new`.
+
+    Nested models are compared field by field and lists of models are
+    matched by `id` (or `uuid`) through dicts, so an unchanged subtree costs
+    one equality check. Added items carry their position, and a list whose
+    surviving items moved gets one "order" change with the new key order.
+    Models are referenced in the change set, not copied.
+    """
+    changes: list[Change] = []
+    _diff_model(old, new, (), changes)
+    return changes
+
+
+def _diff_model(
+    old: BaseModel, new: BaseModel, path: tuple[PathElement, ...], out: list[Change]
+) -> None:
+    for name in type(new).model_fields:
+        before = getattr(old, name, None)
+        after = getattr(new, name, None)
+        if before is after or before == after:
+            continue
+        field_path = (*path, name)
+        if (
+            isinstance(before, BaseModel)
+            and isinstance(after, BaseModel)
+            and type(before) is type(after)
+        ):
+            _diff_model(before, after, field_path, out)
+        elif isinstance(before, list) and isinstance(after, list):
+            _diff_list(before, after, field_path, out)
+        else:
+            out.append(Change("set", field_path, after))
+
+
+def _diff_list(
+    before: list[Any],
+    after: list[Any],
+    path: tuple[PathElement, ...],
+    out: list[Change],
+) -> None:
+    old_items = _keyed(before)
+    new_items = _keyed(after)
+    if old_items is None or new_items is None:
+        out.append(Change("set", path, after))
+        return
+    # Removals first, then additions by ascending position, so each insert
+    # index is valid against the list as it stands when it is applied
+    out.extend(
+        Change("remove", (*path, key)) for key in old_items if key not in new_items
+    )
+    for index, (key, item) in enumerate(new_items.items()):
+        previous = old_items.get(key)
+        if previous is None:
+            out.append(Change("add", (*path, key), item, index))
+        elif previous is not item and previous != item:
+            _diff_model(previous, item, (*path, key), out)
+    kept_before = [key for key in old_items if key in new_items]
+    kept_after = [key for key in new_items if key in old_items]
+    if kept_before != kept_after:
+        out.append(Change("order", path, list(new_items)))
+
+
+def apply(model: ModelT, changes: Iterable[Change]) -> ModelT:
+    """A copy of `model` with `changes` applied; `model` itself is untouched.
+
+    Only the models and lists along changed paths are copied.
+    """
+    root = model.model_copy()
+    copied = {id(root)}
+    for change in changes:
+        _apply(root, change, copied)
+    return root
+
+
+def _child(parent: Any, step: PathElement, copied: set[int]) -> Any:
+    """The copied-on-write child of a model (field) or list (item key)"""
+    if isinstance(step, str):
+        child = getattr(parent, step)
+        if isinstance(child, list) and id(child) not in copied:
+            child = list(child)
+            copied.add(id(child))
+            setattr(parent, step, child)
+        elif isinstance(child, BaseModel) and id(child) not in copied:
+            child = child.model_copy()
+            copied.add(id(child))
+            setattr(parent, step, child)
+        return child
+    for index, item in enumerate(parent):
+        if _identity(item) == step:
+            if id(item) not in copied:
+                item = item.model_copy()
+                copied.add(id(item))
+                parent[index] = item
+            return item
+    raise KeyError(f"No list item with {step[0]}={step[1]!r}")
+
+
+def _apply(root: BaseModel, change: Change, copied: set[int]) -> None:
+    if change.op == "set":
+        *parents, name = change.path
+        target: Any = root
+        for step in parents:
+            target = _child(target, step, copied)
+        setattr(target, str(name), change.value)
+        return
+    if change.op == "order":
+        *parents, name = change.path
+        owner = root
+        for step in parents:
+            owner = _child(owner, step, copied)
+        items = _child(owner, name, copied)
+        position = {key: index for index, key in enumerate(change.value)}
+        items.sort(key=lambda item: position.get(_identity(item), len(position)))
+        return
+    if change.op not in ("add", "remove"):
+        raise ValueError(f"Unknown change operation '{change.op}'")
+
+    *parents, name, key = change.path
+    owner: Any = root
+    for step in parents:
+        owner = _child(owner, step, copied)
+    items = _child(owner, name, copied)
+    if items is None:
+        items = []
+        copied.add(id(items))
+        setattr(owner, str(name), items)
+    if change.op == "add":
+        if change.index is None:
+            items.append(change.value)
+        else:
+            items.insert(change.index, change.value)
+    else:
+        items[:] = [item for item in items if _identity(item) != key]
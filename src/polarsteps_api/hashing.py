@@ -0,0 +1,24 @@
+import hashlib
+from typing import Callable
+
+BodyHasher = Callable[[bytes], str]
+
+
+def _blake2b(body: bytes) -> str:
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def _default_hasher() -> BodyHasher:
+    try:
+        import xxhash
+    except ImportError:
+        return _blake2b
+    return lambda body: xxhash.xxh3_128_hexdigest(body)
+
+
+_hasher: BodyHasher = _default_hasher()
+
+
+def content_hash(body: bytes) -> str:
+    """Fast fingerprint of a response body: xxh3 if installed, else blake2b"""
+    return _hasher(body)
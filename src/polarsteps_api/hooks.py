@@ -0,0 +1,308 @@
+import threading
+from bisect import bisect_left
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from cachetools import TTLCache
+
+
+@dataclass(frozen=True)
+class RequestStart:
+    request: str
+    method: str
+    url: str
+
+
+@dataclass(frozen=True)
+class RequestEnd:
+    request: str
+    method: str
+    url: str
+    status_code: int
+    total_seconds: float
+    # Time to response headers, as reported by the transport
+    ttfb_seconds: Optional[float] = None
+    # requests does not expose these; transports that can may fill them in
+    dns_seconds: Optional[float] = None
+    connect_seconds: Optional[float] = None
+    response_bytes: Optional[int] = None
+    json_decode_seconds: Optional[float] = None
+    error: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class ValidationEvent:
+    model: str
+    seconds: float
+    success: bool
+
+
+@dataclass(frozen=True)
+class CacheEvent:
+    # One of "hit", "partial", "stale", "negative", "miss", "unchanged",
+    # "eviction", "expiry"
+    kind: str
+    key: Any
+
+
+@dataclass(frozen=True)
+class ParsedEvent:
+    # Cache key and the freshly parsed Trip or User
+    key: Any
+    model: Any
+
+
+@dataclass(frozen=True)
+class RetryEvent:
+    request: str
+    url: str
+    attempt: int
+    reason: str
+
+
+class ClientObserver:
+    """Base class for client instrumentation; override the hooks you need"""
+
+    def on_request_start(self, event: RequestStart) -> None:
+        pass
+
+    def on_request_end(self, event: RequestEnd) -> None:
+        pass
+
+    def on_validation(self, event: ValidationEvent) -> None:
+        pass
+
+    def on_cache(self, event: CacheEvent) -> None:
+        pass
+
+    def on_parsed(self, event: ParsedEvent) -> None:
+        pass
+
+    def on_retry(self, event: RetryEvent) -> None:
+        pass
+
+
+def notify(observers: Iterable[ClientObserver], hook: str, event: Any) -> None:
+    """Deliver `event` to every observer, never letting one break a request"""
+    for observer in observers:
+        try:
+            getattr(observer, hook)(event)
+        except Exception as e:
+            print(f"Observer {hook} failed: ", e)
+
+
+class ObservedTTLCache(TTLCache):
+    """TTLCache reporting evictions and expiries to observers.
+
+    Background refreshes, prefetches and concurrent callers share the cache,
+    so every operation holds a re-entrant lock.
+    """
+
+    def __init__(
+        self,
+        maxsize: float,
+        ttl: float,
+        observers: Sequence[ClientObserver],
+        **kwargs: Any,
+    ):
+        super().__init__(maxsize=maxsize, ttl=ttl, **kwargs)
+        self.observers = observers
+        self._lock = threading.RLock()
+
+    def __getitem__(self, key: Any) -> Any:
+        with self._lock:
+            return super().__getitem__(key)
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        with self._lock:
+            super().__setitem__(key, value)
+
+    def __delitem__(self, key: Any) -> None:
+        with self._lock:
+            super().__delitem__(key)
+
+    def __contains__(self, key: Any) -> bool:
+        with self._lock:
+            return super().__contains__(key)
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        with self._lock:
+            return super().get(key, default)
+
+    def pop(self, key: Any, *default: Any) -> Any:
+        with self._lock:
+            return super().pop(key, *default)
+
+    def popitem(self) -> tuple[Any, Any]:
+        with self._lock:
+            key, value = super().popitem()
+        if self.observers:
+            notify(self.observers, "on_cache", CacheEvent("eviction", key))
+        return key, value
+
+    def expire(self, time: Optional[float] = None) -> list[tuple[Any, Any]]:
+        with self._lock:
+            expired = super().expire(time)
+        if expired and self.observers:
+            for key, _ in expired:
+                notify(self.observers, "on_cache", CacheEvent("expiry", key))
+        return expired
+
+
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+SIZE_BUCKETS = tuple(float(2**power) for power in range(10, 27, 2))  # 1KiB..64MiB
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th quantile"""
+        if self.count == 0:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts, strict=False):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+Labels = tuple[tuple[str, str], ...]
+
+
+class MetricsCollector(ClientObserver):
+    """In-memory histograms and counters fed by client events"""
+
+    def __init__(self, prefix: str = "polarsteps"):
+        self.prefix = prefix
+        self.histograms: dict[tuple[str, Labels], Histogram] = {}
+        self.counters: dict[tuple[str, Labels], float] = {}
+        self._lock = threading.Lock()
+
+    def observe(
+        self,
+        name: str,
+        value: float,
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+        **labels: str,
+    ) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def increment(self, name: str, amount: float = 1, **labels: str) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def histogram(self, name: str, **labels: str) -> Optional[Histogram]:
+        return self.histograms.get((name, tuple(sorted(labels.items()))))
+
+    def counter(self, name: str, **labels: str) -> float:
+        return self.counters.get((name, tuple(sorted(labels.items()))), 0)
+
+    def on_request_end(self, event: RequestEnd) -> None:
+        labels = {"request": event.request, "status": str(event.status_code)}
+        self.increment("requests", **labels)
+        self.observe("request_duration_seconds", event.total_seconds, **labels)
+        timings = {
+            "request_ttfb_seconds": event.ttfb_seconds,
+            "request_dns_seconds": event.dns_seconds,
+            "request_connect_seconds": event.connect_seconds,
+            "json_decode_seconds": event.json_decode_seconds,
+        }
+        for name, value in timings.items():
+            if value is not None:
+                self.observe(name, value, request=event.request)
+        if event.response_bytes is not None:
+            self.observe(
+                "response_bytes",
+                event.response_bytes,
+                buckets=SIZE_BUCKETS,
+                request=event.request,
+            )
+
+    def on_validation(self, event: ValidationEvent) -> None:
+        self.observe("validation_seconds", event.seconds, model=event.model)
+        if not event.success:
+            self.increment("validation_failures", model=event.model)
+
+    def on_cache(self, event: CacheEvent) -> None:
+        self.increment("cache_events", event=event.kind)
+
+    def on_retry(self, event: RetryEvent) -> None:
+        self.increment("retries", request=event.request)
+
+    def to_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        lines: list[str] = []
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items(), key=lambda item: item[0])
+        declared = set()
+        for (name, labels), value in counters:
+            metric = f"{self.prefix}_{name}_total"
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric}{_format_labels(labels)} {_format_value(value)}")
+        for (name, labels), histogram in histograms:
+            metric = f"{self.prefix}_{name}"
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f"# TYPE {metric} histogram")
+            cumulative = 0
+            bounds = (*histogram.buckets, float("inf"))
+            for bound, count in zip(bounds, histogram.counts, strict=True):
+                cumulative += count
+                bucket_labels = _format_labels((*labels, ("le", _format_value(bound))))
+                lines.append(f"{metric}_bucket{bucket_labels} {cumulative}")
+            series = _format_labels(labels)
+            lines.append(f"{metric}_sum{series} {_format_value(histogram.sum)}")
+            lines.append(f"{metric}_count{series} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
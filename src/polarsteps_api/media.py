@@ -0,0 +1,171 @@
+import os
+import posixpath
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, NamedTuple, Optional, Union
+from urllib.parse import urlsplit
+
+import requests
+
+if TYPE_CHECKING:
+    from polarsteps_api.client import PolarstepsClient
+    from polarsteps_api.models.trip import CoverPhoto, MediaItem, Trip
+
+# URL fields to try for each size variant, best first
+VARIANTS: dict[str, tuple[str, ...]] = {
+    "original": ("cdn_path", "path"),
+    "large": ("large_thumbnail_path", "cdn_path", "path"),
+    "small": ("small_thumbnail_path", "large_thumbnail_path"),
+}
+PART_SUFFIX = ".part"
+DEFAULT_EXTENSION = ".jpg"
+
+
+class MediaAsset(NamedTuple):
+    uuid: str
+    url: str
+    filename: str
+    trip_id: Optional[int] = None
+    step_id: Optional[int] = None
+
+
+class DownloadResult(NamedTuple):
+    asset: MediaAsset
+    path: str
+    # "downloaded", "resumed", "exists" or "failed"
+    status: str
+    bytes_written: int = 0
+    error: Optional[str] = None
+
+
+def _asset(
+    item: Union["MediaItem", "CoverPhoto"],
+    variant: str,
+    trip_id: Optional[int],
+    step_id: Optional[int],
+) -> Optional[MediaAsset]:
+    for field in VARIANTS[variant]:
+        url = getattr(item, field, None)
+        if url:
+            extension = posixpath.splitext(urlsplit(url).path)[1] or DEFAULT_EXTENSION
+            return MediaAsset(
+                item.uuid, url, f"{item.uuid}{extension}", trip_id, step_id
+            )
+    return None
+
+
+def build_manifest(
+    trips: Iterable["Trip"], variant: str = "large", include_cover: bool = True
+) -> list[MediaAsset]:
+    """Downloadable media of `trips`, deduplicated by uuid.
+
+    Deleted media and steps are skipped, as are items whose original is
+    unavailable when the "original" variant is requested.
+    """
+    if variant not in VARIANTS:
+        raise ValueError(
+            f"Unknown variant '{variant}', expected one of {', '.join(VARIANTS)}"
+        )
+    manifest: dict[str, MediaAsset] = {}
+    for trip in trips:
+        items: list[tuple[Union[MediaItem, CoverPhoto], Optional[int]]] = []
+        if include_cover and trip.cover_photo is not None:
+            items.append((trip.cover_photo, None))
+        for step in trip.all_steps or []:
+            if step.is_deleted:
+                continue
+            items.extend(
+                (item, step.id) for item in step.media or [] if not item.is_deleted
+            )
+
+        for item, step_id in items:
+            if item.uuid in manifest:
+                continue
+            if variant == "original" and item.full_res_unavailable:
+                continue
+            asset = _asset(item, variant, trip.id, step_id)
+            if asset is not None:
+                manifest[item.uuid] = asset
+    return list(manifest.values())
+
+
+class MediaDownloader:
+    """Downloads media assets in parallel, streaming to `<file>.part` files.
+
+    Interrupted downloads resume with a Range request. Media is served from a
+    CDN, so the session never carries the account's remember token.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        workers: int = 8,
+        chunk_size: int = 64 * 1024,
+        timeout: float = 30.0,
+        session: Optional[Any] = None,
+        client: Optional["PolarstepsClient"] = None,
+    ):
+        self.directory = directory
+        self.workers = max(1, workers)
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.client = client
+        if session is None:
+            session = requests.Session()
+            session.headers.update({"User-Agent": "PolarstepsClient/1.0"})
+        self.session = session
+
+    def download(self, assets: Iterable[MediaAsset]) -> list[DownloadResult]:
+        os.makedirs(self.directory, exist_ok=True)
+        with ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="polarsteps-media"
+        ) as executor:
+            return list(executor.map(self._download, assets))
+
+    def download_trip(
+        self, trip: Union["Trip", str], variant: str = "large"
+    ) -> list[DownloadResult]:
+        """Download a trip's media; a trip ID is fetched through the client"""
+        if isinstance(trip, str):
+            if self.client is None:
+                raise ValueError("A client is required to download by trip ID")
+            response = self.client.get_trip(trip)
+            if response.trip is None:
+                raise ValueError(f"Could not fetch trip {trip}: {response.data}")
+            trip = response.trip
+        return self.download(build_manifest([trip], variant=variant))
+
+    def _download(self, asset: MediaAsset) -> DownloadResult:
+        path = os.path.join(self.directory, asset.filename)
+        if os.path.exists(path):
+            return DownloadResult(asset, path, "exists")
+
+        part = path + PART_SUFFIX
+        offset = os.path.getsize(part) if os.path.exists(part) else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+        try:
+            with self.session.get(
+                asset.url, headers=headers, stream=True, timeout=self.timeout
+            ) as response:
+                if response.status_code == 416 and offset:
+                    # The part file already holds the whole asset
+                    os.replace(part, path)
+                    return DownloadResult(asset, path, "resumed")
+                if response.status_code not in (200, 206):
+                    return DownloadResult(
+                        asset, path, "failed", error=f"HTTP {response.status_code}"
+                    )
+                # A 200 means the server ignored the Range header: start over
+                resumed = offset > 0 and response.status_code == 206
+                written = 0
+                with open(part, "ab" if resumed else "wb") as fp:
+                    for chunk in response.iter_content(chunk_size=self.chunk_size):
+                        fp.write(chunk)
+                        written += len(chunk)
+        except (requests.RequestException, OSError) as e:
+            return DownloadResult(asset, path, "failed", error=str(e))
+
+        os.replace(part, path)
+        return DownloadResult(
+            asset, path, "resumed" if resumed else "downloaded", written
+        )
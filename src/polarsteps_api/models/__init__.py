@@ -1,11 +1,31 @@
-from .request import GetTripRequest, GetUserByUsernameRequest
-from .response import TripResponse, UserResponse
-from .trip import Location, MediaItem, Step, TravelTrackerDevice, Trip
-from .user import Stats, User
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
 
-# Rebuild models to resolve forward references
-User.model_rebuild()
-Trip.model_rebuild()
+if TYPE_CHECKING:
+    from .request import GetTripRequest, GetUserByUsernameRequest
+    from .response import TripResponse, UserResponse
+    from .summary import TimestampFormatter, summarize_steps, summarize_trips
+    from .trip import Location, MediaItem, Step, TravelTrackerDevice, Trip
+    from .user import Stats, User
+
+# Submodules are imported on first attribute access, and model schemas are
+# built on first validation (defer_build), to keep `import` cheap
+_LAZY_IMPORTS = {
+    "GetTripRequest": ".request",
+    "GetUserByUsernameRequest": ".request",
+    "TripResponse": ".response",
+    "UserResponse": ".response",
+    "TimestampFormatter": ".summary",
+    "summarize_steps": ".summary",
+    "summarize_trips": ".summary",
+    "Location": ".trip",
+    "MediaItem": ".trip",
+    "Step": ".trip",
+    "TravelTrackerDevice": ".trip",
+    "Trip": ".trip",
+    "User": ".user",
+    "Stats": ".user",
+}
 
 __all__ = [
     "GetTripRequest",
@@ -19,4 +39,20 @@ __all__ = [
     "Trip",
     "User",
     "Stats",
+    "TimestampFormatter",
+    "summarize_steps",
+    "summarize_trips",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    module = _LAZY_IMPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), *__all__])
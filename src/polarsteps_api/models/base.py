@@ -3,8 +3,21 @@ from typing import Any, Optional
 
 
 class BaseRequest(ABC):
-    def __init__(self, headers: Optional[dict[str, str]] = None):
+    # Class the body is decoded into, and how long a pipeline may cache it;
+    # None leaves the response raw or uses the cache's default TTL
+    response_model: Optional[type["BaseResponse"]] = None
+    cache_ttl: Optional[float] = None
+    # Set by PolarstepsClient when it caches and decodes the response itself,
+    # so pipeline cache and decode stages let the request through untouched
+    client_managed: bool = False
+
+    def __init__(
+        self,
+        headers: Optional[dict[str, str]] = None,
+        params: Optional[dict[str, Any]] = None,
+    ):
         self.headers = headers or {}
+        self.params = params or {}
 
     @abstractmethod
     def get_endpoint(self) -> str:
@@ -14,13 +27,33 @@ class BaseRequest(ABC):
     def get_method(self) -> str:
         pass
 
+    def get_params(self) -> dict[str, Any]:
+        """Query parameters; values that are None are left out"""
+        return {key: value for key, value in self.params.items() if value is not None}
+
+    def cache_key(self) -> Optional[str]:
+        """Key identifying the response; None when it must not be cached"""
+        return None
+
 
 class BaseResponse:
+    # Fingerprint of the raw body, when the transport exposed one
+    content_hash: Optional[str] = None
+    # Name of the model the body is validated into, if any
+    model_name: Optional[str] = None
+    # False when refused locally (e.g. an open circuit breaker), not upstream
+    retryable: bool = True
+
     def __init__(self, data: Any, status_code: int, headers: dict[str, str]):
         self.data = data
         self.status_code = status_code
         self.headers = headers
 
+    @property
+    def parsed(self) -> Any:
+        """The validated model, or None"""
+        return None
+
     @property
     def is_success(self) -> bool:
         return 200 <= self.status_code < 400
@@ -1,9 +1,18 @@
-from typing import Any
+from collections.abc import Sequence
+from typing import Any, Optional
 
 from polarsteps_api.models.base import BaseRequest
+from polarsteps_api.models.response import TripResponse, UserResponse
+
+# Query parameter names for field selection and paging
+FIELDS_PARAM = "fields"
+OFFSET_PARAM = "offset"
+LIMIT_PARAM = "limit"
 
 
 class GetTripRequest(BaseRequest):
+    response_model = TripResponse
+
     def __init__(self, trip_id: str, **kwargs: Any) -> None:
         super().__init__(**kwargs)
         self.trip_id = trip_id
@@ -11,17 +20,37 @@ class GetTripRequest(BaseRequest):
     def get_endpoint(self) -> str:
         return f"/trips/{self.trip_id}"
 
+    def cache_key(self) -> Optional[str]:
+        return self.trip_id
+
     def get_method(self) -> str:
         return "GET"
 
 
 class GetUserByUsernameRequest(BaseRequest):
-    def __init__(self, username: str, **kwargs: Any) -> None:
+    response_model = UserResponse
+
+    def __init__(
+        self,
+        username: str,
+        fields: Optional[Sequence[str]] = None,
+        offset: Optional[int] = None,
+        limit: Optional[int] = None,
+        **kwargs: Any,
+    ) -> None:
         super().__init__(**kwargs)
         self.username = username
+        if fields:
+            self.params[FIELDS_PARAM] = ",".join(fields)
+        self.params[OFFSET_PARAM] = offset
+        self.params[LIMIT_PARAM] = limit
 
     def get_endpoint(self) -> str:
         return f"/users/byusername/{self.username}"
 
+    def cache_key(self) -> Optional[str]:
+        # A page or field subset must not stand in for the full profile
+        return None if self.get_params() else self.username
+
     def get_method(self) -> str:
         return "GET"
@@ -3,31 +3,59 @@ from typing import Any, Optional
 from polarsteps_api.models.base import BaseResponse
 from polarsteps_api.models.trip import Trip
 from polarsteps_api.models.user import User
+from polarsteps_api.profiling import validate_model
 
 
 class TripResponse(BaseResponse):
+    model_name = "Trip"
+
     def __init__(self, data: Any, status_code: int, headers: dict[str, str]) -> None:
         super().__init__(data, status_code, headers)
+        # True when built from a trip embedded elsewhere, e.g. without its steps
+        self.partial = False
         # Only create Trip model if response is successful and data is valid
         if self.is_success and data:
             try:
-                self.trip: Optional[Trip] = Trip(**data)
+                self.trip: Optional[Trip] = validate_model(Trip, data)
             except Exception as e:
                 print("Failed to serialize TripResponse: ", e)
                 self.trip = None
         else:
             self.trip = None
 
+    @classmethod
+    def from_trip(
+        cls, trip: Trip, data: Any = None, partial: bool = False
+    ) -> "TripResponse":
+        """Wrap an already parsed trip without validating it again"""
+        response = cls.__new__(cls)
+        BaseResponse.__init__(
+            response, data if data is not None else trip.model_dump(), 200, {}
+        )
+        response.trip = trip
+        response.partial = partial
+        return response
+
+    @property
+    def parsed(self) -> Optional[Trip]:
+        return self.trip
+
 
 class UserResponse(BaseResponse):
+    model_name = "User"
+
     def __init__(self, data: Any, status_code: int, headers: dict[str, str]) -> None:
         super().__init__(data, status_code, headers)
         # Only create UserData model if response is successful and data is valid
         if self.is_success and data:
             try:
-                self.user: Optional[User] = User(**data)
+                self.user: Optional[User] = validate_model(User, data)
             except Exception as e:
                 print("Failed to serialize UserResponse: ", e)
                 self.user = None
         else:
             self.user = None
+
+    @property
+    def parsed(self) -> Optional[User]:
+        return self.user
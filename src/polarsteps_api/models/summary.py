@@ -0,0 +1,165 @@
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Optional, Union
+
+if TYPE_CHECKING:
+    from polarsteps_api.models.trip import Step, Trip
+
+Summaries = Union[list[dict], dict[str, list]]
+
+DATE_FORMAT = "%Y/%m/%d"
+TIMESTAMP_FORMAT = "%Y/%m/%d %H:%M:%S"
+STEP_LOCATION_EXCLUDE = frozenset(
+    {"uuid", "precision", "full_detail", "administrative_area"}
+)
+
+
+class TimestampFormatter:
+    """Memoised timestamp -> local datetime / string conversions.
+
+    A single instance can be shared across calls so repeated renders of the
+    same trips and steps skip `datetime.fromtimestamp` and `strftime`.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.datetime = lru_cache(maxsize=maxsize)(self._to_datetime)
+        self.format = lru_cache(maxsize=maxsize)(self._to_string)
+        self.length_days = lru_cache(maxsize=maxsize)(self._to_length_days)
+
+    @staticmethod
+    def _to_datetime(timestamp: Optional[float]) -> datetime:
+        return datetime.fromtimestamp(timestamp or 0)
+
+    def _to_string(self, timestamp: Optional[float], fmt: str) -> str:
+        return self.datetime(timestamp).strftime(fmt)
+
+    def _to_length_days(self, start: Optional[float], end: Optional[float]) -> str:
+        length = (self.datetime(end) - self.datetime(start)).days + 1
+        return f"{length} day{'' if length == 1 else 's'}"
+
+    def cache_clear(self) -> None:
+        self.datetime.cache_clear()
+        self.format.cache_clear()
+        self.length_days.cache_clear()
+
+
+default_formatter = TimestampFormatter()
+
+
+def _collect(
+    values: Iterable[tuple], keys: tuple[str, ...], columnar: bool
+) -> Summaries:
+    """Row dicts, or one list per key filled in the same single pass"""
+    if not columnar:
+        return [dict(zip(keys, row, strict=True)) for row in values]
+    columns: list[list] = [[] for _ in keys]
+    appends = [column.append for column in columns]
+    for row in values:
+        for append, value in zip(appends, row, strict=True):
+            append(value)
+    return dict(zip(keys, columns, strict=True))
+
+
+TRIP_SUMMARY_KEYS = (
+    "id",
+    "name",
+    "summary",
+    "start_date",
+    "end_date",
+    "length_days",
+    "total_km",
+    "step_count",
+    "country_count",
+    "views",
+    "like_count",
+    "is_shared_trip",
+    "cover_photo_path",
+)
+
+STEP_SUMMARY_KEYS = (
+    "name",
+    "description",
+    "timestamp",
+    "location",
+    "weather",
+    "medias",
+    "views",
+    "comments",
+    "likes",
+)
+
+
+def summarize_trips(
+    trips: Iterable["Trip"],
+    columnar: bool = False,
+    formatter: Optional[TimestampFormatter] = None,
+) -> Summaries:
+    """Batch equivalent of `Trip.to_summary` over a collection of trips"""
+    fmt = formatter or default_formatter
+    to_date = fmt.format
+    to_length = fmt.length_days
+
+    def values() -> Iterator[tuple]:
+        # In TRIP_SUMMARY_KEYS order
+        for trip in trips:
+            start, end = trip.start_date, trip.end_date
+            buddies = trip.trip_buddies
+            yield (
+                trip.id,
+                trip.name,
+                trip.summary,
+                to_date(start, DATE_FORMAT),
+                to_date(end, DATE_FORMAT),
+                to_length(start, end),
+                trip.total_km,
+                trip.step_count,
+                trip.country_count,
+                trip.views,
+                trip.like_count,
+                buddies is not None and len(buddies) > 0,
+                trip.cover_photo_path,
+            )
+
+    return _collect(values(), TRIP_SUMMARY_KEYS, columnar)
+
+
+def summarize_steps(
+    steps: Iterable["Step"],
+    columnar: bool = False,
+    formatter: Optional[TimestampFormatter] = None,
+) -> Summaries:
+    """Batch equivalent of `Step.to_summary` over a collection of steps"""
+    to_timestamp = (formatter or default_formatter).format
+
+    def values() -> Iterator[tuple]:
+        # In STEP_SUMMARY_KEYS order
+        location_keys: Optional[tuple[str, ...]] = None
+        for step in steps:
+            location = step.location
+            location_summary: dict[str, Any] = {}
+            if location:
+                if location_keys is None:
+                    location_keys = tuple(
+                        name
+                        for name in type(location).model_fields
+                        if name not in STEP_LOCATION_EXCLUDE
+                    )
+                fields = location.__dict__
+                location_summary = {key: fields[key] for key in location_keys}
+            yield (
+                step.name,
+                step.description,
+                to_timestamp(step.start_time, TIMESTAMP_FORMAT),
+                location_summary,
+                {
+                    "condition": step.weather_condition,
+                    "temperature": step.weather_temperature,
+                },
+                len(step.media or []),
+                step.views,
+                step.comment_count,
+                len(step.user_likes or []),
+            )
+
+    return _collect(values(), STEP_SUMMARY_KEYS, columnar)
@@ -1,13 +1,15 @@
 from datetime import datetime
-from typing import TYPE_CHECKING, Any, Optional
+from typing import Any, Optional
 
-from pydantic import BaseModel, field_validator, model_validator
+from pydantic import BaseModel, ConfigDict, field_validator, model_validator
 
-if TYPE_CHECKING:
-    from polarsteps_api.models.user import User
+from polarsteps_api.models.summary import summarize_steps, summarize_trips
+from polarsteps_api.profiling import profiled_validator
 
 
 class CoverPhoto(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     id: int
     uuid: str
     path: Optional[str] = None
@@ -21,6 +23,7 @@ class CoverPhoto(BaseModel):
 
     @field_validator("last_modified", mode="before")
     @classmethod
+    @profiled_validator
     def validate_last_modified(cls, v: Any) -> Any:
         """Validate timestamp fields."""
         if v is None:
@@ -39,6 +42,8 @@ class CoverPhoto(BaseModel):
 
 
 class Location(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     id: Optional[int] = None
     uuid: Optional[str] = None
     name: Optional[str] = None
@@ -54,6 +59,8 @@ class Location(BaseModel):
 
 
 class MediaItem(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     id: int
     uuid: str
     type: int
@@ -75,6 +82,8 @@ class MediaItem(BaseModel):
 
 
 class Step(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     id: int
     uuid: str
     trip_id: int
@@ -109,27 +118,12 @@ class Step(BaseModel):
         )
 
     def to_summary(self) -> dict:
-        return {
-            "name": self.name,
-            "description": self.description,
-            "timestamp": self.timestamp,
-            "location": self.location.model_dump(
-                exclude={"uuid", "precision", "full_detail", "administrative_area"}
-            )
-            if self.location
-            else {},
-            "weather": {
-                "condition": self.weather_condition,
-                "temperature": self.weather_temperature,
-            },
-            "medias": len(self.media or []),
-            "views": self.views,
-            "comments": self.comment_count,
-            "likes": len(self.user_likes or []),
-        }
+        return summarize_steps([self])[0]
 
 
 class TravelTrackerDevice(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     id: int
     uuid: str
     device_name: Optional[str] = None
@@ -141,11 +135,15 @@ class TravelTrackerDevice(BaseModel):
 class TripBuddy(BaseModel):
     """Simplified model for trip buddies that come as limited dictionaries"""
 
+    model_config = ConfigDict(defer_build=True)
+
     buddy_user_id: int
     uuid: str
 
 
 class Trip(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     id: int
     uuid: str
     name: Optional[str] = None
@@ -202,6 +200,7 @@ class Trip(BaseModel):
         mode="before",
     )
     @classmethod
+    @profiled_validator
     def validate_timestamps(cls, v: Any) -> Any:
         """Validate timestamp fields."""
         if v is None:
@@ -219,6 +218,7 @@ class Trip(BaseModel):
         return v
 
     @model_validator(mode="after")
+    @profiled_validator
     def validate_country_count(self) -> "Trip":
         """Override the default country_count method which seems invalid"""
         if self.country_count and self.country_count > 0:
@@ -257,22 +257,7 @@ class Trip(BaseModel):
 
     def to_summary(self) -> dict:
         """Return a compact summary of the trip"""
-        y_m_d_format = "%Y/%m/%d"
-        return {
-            "id": self.id,
-            "name": self.name,
-            "summary": self.summary,
-            "start_date": self.datetime_start.strftime(y_m_d_format),
-            "end_date": self.datetime_end.strftime(y_m_d_format),
-            "length_days": self.length_days,
-            "total_km": self.total_km,
-            "step_count": self.step_count,
-            "country_count": self.country_count,
-            "views": self.views,
-            "like_count": self.like_count,
-            "is_shared_trip": self.is_shared_trip,
-            "cover_photo_path": self.cover_photo_path,
-        }
+        return summarize_trips([self])[0]
 
     def to_detailed_summary(self, n_steps: int = 5) -> dict:
         """Return a more detailed summary including key steps"""
@@ -288,7 +273,7 @@ class Trip(BaseModel):
         summary = self.to_summary()
         summary.update(
             {
-                "steps": [step.to_summary() for step in steps[:n_steps]],
+                "steps": summarize_steps(steps[:n_steps]),
                 "trip_buddies_count": len(self.trip_buddies or []),
                 "media_count": sum(
                     len(step.media or []) for step in (self.all_steps or [])
@@ -296,3 +281,8 @@ class Trip(BaseModel):
             }
         )
         return summary
+
+
+# Resolves the "User" forward reference when the schema is first built;
+# imported last because user.py imports this module the same way
+from polarsteps_api.models.user import User  # noqa: E402
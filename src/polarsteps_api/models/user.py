@@ -1,13 +1,15 @@
 from datetime import datetime
-from typing import TYPE_CHECKING, Any, Optional, Union
+from typing import Any, Optional, Union
 
-from pydantic import BaseModel, field_validator
+from pydantic import BaseModel, ConfigDict, field_validator
 
-if TYPE_CHECKING:
-    from polarsteps_api.models.trip import Location, Trip
+from polarsteps_api.models.summary import summarize_trips
+from polarsteps_api.profiling import profiled_validator
 
 
 class Stats(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     continents: list[str]
     country_codes: list[str]
     country_count: int
@@ -24,6 +26,7 @@ class Stats(BaseModel):
 
     @field_validator("last_trip_end_date", mode="before")
     @classmethod
+    @profiled_validator
     def validate_timestamps(cls, v: Any) -> Any:
         """Validate timestamp fields."""
         if v is None:
@@ -42,6 +45,8 @@ class Stats(BaseModel):
 
 
 class User(BaseModel):
+    model_config = ConfigDict(defer_build=True)
+
     id: int
     uuid: str
     username: str
@@ -81,6 +86,7 @@ class User(BaseModel):
 
     @field_validator("creation_date", "last_modified", mode="before")
     @classmethod
+    @profiled_validator
     def validate_timestamps(cls, v: Any) -> Any:
         """Validate timestamp fields."""
         if v is None:
@@ -157,7 +163,12 @@ class User(BaseModel):
     def to_trips_summary(self) -> dict:
         """Return user info with trip summaries only"""
         summary = self.to_summary()
-        summary["trips"] = [
-            trip.to_summary() for trip in (self.alltrips or []) if not trip.is_deleted
-        ]
+        summary["trips"] = summarize_trips(
+            trip for trip in (self.alltrips or []) if not trip.is_deleted
+        )
         return summary
+
+
+# Resolves the "Location"/"Trip" forward references when the schema is first
+# built; imported last because trip.py imports this module the same way
+from polarsteps_api.models.trip import Location, Trip  # noqa: E402
@@ -0,0 +1,321 @@
+import functools
+import threading
+import time
+from collections.abc import Sequence
+from concurrent.futures import Future
+from typing import Any, Callable, Optional, TypeVar
+
+from cachetools import TLRUCache
+
+from polarsteps_api.hooks import (
+    CacheEvent,
+    ClientObserver,
+    MetricsCollector,
+    ParsedEvent,
+    RetryEvent,
+    ValidationEvent,
+    notify,
+)
+from polarsteps_api.models.base import BaseRequest, BaseResponse
+from polarsteps_api.ratelimit import RateLimiter
+
+Handler = Callable[[BaseRequest], BaseResponse]
+ResponseT = TypeVar("ResponseT", bound=BaseResponse)
+
+# Connection failures, throttling and transient gateway errors
+RETRY_STATUSES = (0, 429, 502, 503, 504)
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+def request_key(request: BaseRequest) -> Optional[tuple[str, str]]:
+    """`cache_key()` qualified by the request class, so endpoints never collide"""
+    key = request.cache_key()
+    return None if key is None else (type(request).__name__, key)
+
+
+class Middleware:
+    """One stage of a RequestPipeline; override `handle`"""
+
+    def handle(self, request: BaseRequest, call_next: Handler) -> BaseResponse:
+        return call_next(request)
+
+
+class RequestPipeline:
+    """Middleware chain in front of `HTTPClient.execute`.
+
+    The first middleware sees the request first and the response last. The
+    pipeline stands in for the HTTPClient, so every endpoint goes through it:
+
+        client.http_client = RequestPipeline(
+            client.http_client, [CoalesceMiddleware(), RetryMiddleware()]
+        )
+    """
+
+    def __init__(self, http_client: Any, middleware: Sequence[Middleware] = ()):
+        self.http_client = http_client
+        self.middleware = list(middleware)
+        handler: Handler = http_client.execute
+        for stage in reversed(self.middleware):
+            handler = functools.partial(stage.handle, call_next=handler)
+        self._handler = handler
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.http_client, name)
+
+    def execute(self, request: BaseRequest) -> BaseResponse:
+        return self._handler(request)
+
+
+class CacheMiddleware(Middleware):
+    """Serve successful responses by cache key for the request's `cache_ttl`"""
+
+    def __init__(
+        self,
+        ttl: float = 300,
+        maxsize: int = 1_000,
+        observers: Optional[Sequence[ClientObserver]] = None,
+    ):
+        self.ttl = ttl
+        self.observers = list(observers or [])
+        # Values are (ttl, response) so each entry expires on its own schedule
+        self._cache: TLRUCache[tuple[str, str], tuple[float, BaseResponse]] = TLRUCache(
+            maxsize=maxsize, ttu=self._ttu, timer=time.monotonic
+        )
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _ttu(key: Any, value: tuple[float, BaseResponse], now: float) -> float:
+        return now + value[0]
+
+    def _notify(self, kind: str, key: str) -> None:
+        if self.observers:
+            notify(self.observers, "on_cache", CacheEvent(kind, key))
+
+    def handle(self, request: BaseRequest, call_next: Handler) -> BaseResponse:
+        key = request_key(request)
+        ttl = request.cache_ttl if request.cache_ttl is not None else self.ttl
+        if key is None or ttl <= 0 or request.client_managed:
+            return call_next(request)
+        with self._lock:
+            entry = self._cache.get(key)
+        if entry is not None:
+            self._notify("hit", key[1])
+            return entry[1]
+        self._notify("miss", key[1])
+        response = call_next(request)
+        if response.is_success:
+            with self._lock:
+                self._cache[key] = (ttl, response)
+        return response
+
+    def invalidate(self, request: BaseRequest) -> None:
+        key = request_key(request)
+        if key is not None:
+            with self._lock:
+                self._cache.pop(key, None)
+
+
+class CoalesceMiddleware(Middleware):
+    """Share one in-flight request between concurrent callers with the same key"""
+
+    def __init__(self) -> None:
+        self._in_flight: dict[tuple[str, str], Future[BaseResponse]] = {}
+        self._lock = threading.Lock()
+
+    def handle(self, request: BaseRequest, call_next: Handler) -> BaseResponse:
+        key = request_key(request)
+        if key is None:
+            return call_next(request)
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if future is None:
+                future = self._in_flight[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            response = call_next(request)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+        future.set_result(response)
+        return response
+
+
+class RetryMiddleware(Middleware):
+    """Retry idempotent requests on transient failures with exponential backoff.
+
+    A numeric Retry-After header takes precedence over the backoff, capped at
+    `max_backoff`. Each retry is reported to observers as a RetryEvent.
+    Responses marked not `retryable`, such as an open circuit breaker's, are
+    returned at once.
+    """
+
+    def __init__(
+        self,
+        attempts: int = 3,
+        backoff: float = 0.5,
+        max_backoff: float = 10.0,
+        statuses: Sequence[int] = RETRY_STATUSES,
+        methods: Sequence[str] = IDEMPOTENT_METHODS,
+        observers: Optional[Sequence[ClientObserver]] = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.attempts = max(1, attempts)
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.statuses = frozenset(statuses)
+        self.methods = frozenset(method.upper() for method in methods)
+        self.observers = list(observers or [])
+        self.sleep = sleep
+
+    def delay(self, attempt: int, response: BaseResponse) -> float:
+        """Seconds to wait before retry number `attempt` (1-based)"""
+        for name, value in response.headers.items():
+            if name.lower() == "retry-after":
+                try:
+                    return min(self.max_backoff, max(0.0, float(value)))
+                except ValueError:
+                    break  # An HTTP date; fall back to the backoff
+        return min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+
+    def handle(self, request: BaseRequest, call_next: Handler) -> BaseResponse:
+        response = call_next(request)
+        if request.get_method().upper() not in self.methods:
+            return response
+        for attempt in range(1, self.attempts):
+            if response.status_code not in self.statuses or not response.retryable:
+                break
+            if self.observers:
+                reason = (
+                    f"status {response.status_code}"
+                    if response.status_code
+                    else str(_error(response))
+                )
+                event = RetryEvent(
+                    request=type(request).__name__,
+                    url=request.get_endpoint(),
+                    attempt=attempt,
+                    reason=reason,
+                )
+                notify(self.observers, "on_retry", event)
+            self.sleep(self.delay(attempt, response))
+            response = call_next(request)
+        return response
+
+
+def _error(response: BaseResponse) -> Any:
+    if isinstance(response.data, dict):
+        return response.data.get("error", "connection error")
+    return "connection error"
+
+
+class RateLimitMiddleware(Middleware):
+    """Block each request until the shared token bucket allows it"""
+
+    def __init__(self, limiter: RateLimiter):
+        self.limiter = limiter
+
+    def handle(self, request: BaseRequest, call_next: Handler) -> BaseResponse:
+        self.limiter.acquire()
+        return call_next(request)
+
+
+class MetricsMiddleware(Middleware):
+    """Time everything below this stage, per request class and final status.
+
+    Unlike the HTTPClient's RequestEnd events this includes cache hits,
+    coalesced waits, retries and rate limiting.
+    """
+
+    def __init__(self, collector: MetricsCollector):
+        self.collector = collector
+
+    def handle(self, request: BaseRequest, call_next: Handler) -> BaseResponse:
+        started = time.perf_counter()
+        response = call_next(request)
+        name = type(request).__name__
+        self.collector.observe(
+            "pipeline_duration_seconds", time.perf_counter() - started, request=name
+        )
+        self.collector.increment(
+            "pipeline_requests", request=name, status=str(response.status_code)
+        )
+        return response
+
+
+def decode(
+    response: BaseResponse,
+    model: type[ResponseT],
+    observers: Sequence[ClientObserver] = (),
+    key: Any = None,
+) -> ResponseT:
+    """`response` wrapped in `model`, reporting validation and parsed events"""
+    if isinstance(response, model):
+        return response
+    started = time.perf_counter()
+    decoded = model(
+        data=response.data,
+        status_code=response.status_code,
+        headers=response.headers,
+    )
+    decoded.content_hash = response.content_hash
+    decoded.retryable = response.retryable
+    if observers and decoded.model_name and decoded.is_success and response.data:
+        instance = decoded.parsed
+        event = ValidationEvent(
+            decoded.model_name, time.perf_counter() - started, instance is not None
+        )
+        notify(observers, "on_validation", event)
+        if instance is not None:
+            notify(observers, "on_parsed", ParsedEvent(key, instance))
+    return decoded
+
+
+class DecodeMiddleware(Middleware):
+    """Wrap raw responses in the request's `response_model`"""
+
+    def __init__(self, observers: Optional[Sequence[ClientObserver]] = None):
+        self.observers = list(observers or [])
+
+    def handle(self, request: BaseRequest, call_next: Handler) -> BaseResponse:
+        response = call_next(request)
+        model = request.response_model
+        if model is None or request.client_managed:
+            return response
+        return decode(response, model, self.observers, request.cache_key())
+
+
+def default_middleware(
+    cache_ttl: float = 300,
+    cache_maxsize: int = 1_000,
+    attempts: int = 3,
+    rate: Optional[float] = None,
+    burst: Optional[float] = None,
+    metrics: Optional[MetricsCollector] = None,
+    observers: Optional[Sequence[ClientObserver]] = None,
+) -> list[Middleware]:
+    """Metrics, cache, coalescing, decode, retry and rate limit, outermost first.
+
+    Decoding sits inside the cache so parsed models are what gets cached, and
+    the rate limit sits inside the retries so every attempt is counted. Given
+    to a PolarstepsClient, the cache and decode stages leave the client's own
+    requests to its cache, which also serves stale and unchanged responses.
+    """
+    middleware: list[Middleware] = []
+    if metrics is not None:
+        middleware.append(MetricsMiddleware(metrics))
+    if cache_ttl > 0:
+        middleware.append(
+            CacheMiddleware(ttl=cache_ttl, maxsize=cache_maxsize, observers=observers)
+        )
+    middleware.append(CoalesceMiddleware())
+    middleware.append(DecodeMiddleware(observers))
+    if attempts > 1:
+        middleware.append(RetryMiddleware(attempts=attempts, observers=observers))
+    if rate:
+        middleware.append(RateLimitMiddleware(RateLimiter(rate, burst)))
+    return middleware
@@ -0,0 +1,270 @@
+import threading
+from collections import deque
+from collections.abc import Iterator, MutableMapping
+from concurrent.futures import Future
+from typing import Any, Callable, Optional
+
+from cachetools import TTLCache
+
+from polarsteps_api.client import CachedResponse, HTTPClient, PolarstepsClient
+from polarsteps_api.hooks import ClientObserver
+from polarsteps_api.models.base import BaseRequest, BaseResponse
+from polarsteps_api.models.response import TripResponse
+from polarsteps_api.ratelimit import RateLimiter
+from polarsteps_api.transport import Transport
+
+# Polarsteps' visibility value for content anyone can see
+PUBLIC_VISIBILITY = 0
+
+
+def is_public(response: CachedResponse) -> bool:
+    """Whether a response may be served to every account from the shared cache.
+
+    Only public trips qualify. A user response depends on who asked: even a
+    public profile carries the viewer's follow requests, saved spots and the
+    followers-only trips they may see, so users always stay private.
+    """
+    if isinstance(response, TripResponse) and response.trip is not None:
+        return response.trip.visibility == PUBLIC_VISIBILITY
+    return False
+
+
+class TenantCache(MutableMapping):
+    """Per-account cache view backed by a cache shared between accounts.
+
+    Public responses go to the shared cache so any account can reuse them;
+    everything else stays private to the account that fetched it.
+    """
+
+    def __init__(
+        self,
+        shared: MutableMapping[str, CachedResponse],
+        private: MutableMapping[str, CachedResponse],
+        lock: threading.Lock,
+        public: Callable[[CachedResponse], bool] = is_public,
+    ):
+        self.shared = shared
+        self.private = private
+        self.public = public
+        self._lock = lock
+
+    def __getitem__(self, key: str) -> CachedResponse:
+        with self._lock:
+            if key in self.private:
+                return self.private[key]
+            return self.shared[key]
+
+    def __setitem__(self, key: str, value: CachedResponse) -> None:
+        with self._lock:
+            if self.public(value):
+                self.private.pop(key, None)
+                self.shared[key] = value
+            else:
+                self.private[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        with self._lock:
+            found = self.private.pop(key, None) is not None
+            found = self.shared.pop(key, None) is not None or found
+        if not found:
+            raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        with self._lock:
+            keys = {*self.private, *self.shared}
+        return iter(keys)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len({*self.private, *self.shared})
+
+    def clear(self) -> None:
+        # Only this account's view; the shared cache belongs to the pool
+        with self._lock:
+            self.private.clear()
+
+
+class _Job:
+    __slots__ = ("request", "future")
+
+    def __init__(self, request: BaseRequest):
+        self.request = request
+        self.future: Future[BaseResponse] = Future()
+
+
+class _Account:
+    def __init__(
+        self,
+        name: str,
+        http_client: HTTPClient,
+        max_concurrency: int,
+        limiter: Optional[RateLimiter],
+    ):
+        self.name = name
+        self.http_client = http_client
+        self.max_concurrency = max_concurrency
+        self.limiter = limiter
+        self.queue: deque[_Job] = deque()
+        self.in_flight = 0
+
+
+class _PooledHTTPClient:
+    """Stands in for an account's HTTPClient, routing execute() through the pool"""
+
+    def __init__(self, pool: "ClientPool", account: str, http_client: HTTPClient):
+        self.pool = pool
+        self.account = account
+        self.http_client = http_client
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.http_client, name)
+
+    def execute(self, request: BaseRequest) -> BaseResponse:
+        return self.pool.submit(self.account, request).result()
+
+
+class ClientPool:
+    """Many authenticated accounts served by one set of worker threads.
+
+    Each account has its own session, a cap on concurrent requests and an
+    optional rate budget. Workers pick queued requests round-robin across
+    accounts, so a busy account cannot starve the others. Public responses
+    are cached once for all accounts.
+    """
+
+    def __init__(
+        self,
+        workers: int = 8,
+        cache_ttl: int = 300,
+        cache_maxsize: int = 10_000,
+        observers: Optional[list[ClientObserver]] = None,
+    ):
+        self.cache_ttl = cache_ttl
+        self.cache_maxsize = cache_maxsize
+        self.observers: list[ClientObserver] = list(observers or [])
+        self.shared_cache: TTLCache[str, CachedResponse] = TTLCache(
+            maxsize=cache_maxsize, ttl=cache_ttl
+        )
+        self._cache_lock = threading.Lock()
+        self._accounts: dict[str, _Account] = {}
+        self._clients: dict[str, PolarstepsClient] = {}
+        self._order: list[str] = []
+        self._next = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self._workers = [
+            threading.Thread(
+                target=self._work, name=f"polarsteps-pool-{i}", daemon=True
+            )
+            for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def __enter__(self) -> "ClientPool":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def add_account(
+        self,
+        name: str,
+        remember_token: str,
+        max_concurrency: int = 2,
+        rate: Optional[float] = None,
+        burst: Optional[float] = None,
+        transport: Optional[Transport] = None,
+    ) -> PolarstepsClient:
+        """Register an account; `rate` is its request budget per second"""
+        if name in self._accounts:
+            raise ValueError(f"Account '{name}' is already registered")
+        client = PolarstepsClient(
+            remember_token=remember_token,
+            transport=transport,
+            observers=self.observers,
+            cache=TenantCache(
+                shared=self.shared_cache,
+                private=TTLCache(maxsize=self.cache_maxsize, ttl=self.cache_ttl),
+                lock=self._cache_lock,
+            ),
+        )
+        account = _Account(
+            name=name,
+            http_client=client.http_client,
+            max_concurrency=max(1, max_concurrency),
+            limiter=RateLimiter(rate, burst) if rate else None,
+        )
+        client.http_client = _PooledHTTPClient(self, name, client.http_client)  # type: ignore[assignment]
+        with self._condition:
+            self._accounts[name] = account
+            self._clients[name] = client
+            self._order.append(name)
+        return client
+
+    def client(self, name: str) -> PolarstepsClient:
+        """The account's PolarstepsClient; its requests are scheduled by the pool"""
+        return self._clients[name]
+
+    def submit(self, account: str, request: BaseRequest) -> "Future[BaseResponse]":
+        job = _Job(request)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("ClientPool is closed")
+            self._accounts[account].queue.append(job)
+            self._condition.notify()
+        return job.future
+
+    def pending(self, account: Optional[str] = None) -> int:
+        with self._condition:
+            accounts = [self._accounts[account]] if account else self._accounts.values()
+            return sum(len(a.queue) for a in accounts)
+
+    def _next_job(self) -> tuple[Optional[_Account], Optional[_Job], Optional[float]]:
+        """Pick the next runnable job round-robin; otherwise how long to wait"""
+        wait: Optional[float] = None
+        count = len(self._order)
+        for offset in range(count):
+            account = self._accounts[self._order[(self._next + offset) % count]]
+            if not account.queue or account.in_flight >= account.max_concurrency:
+                continue
+            delay = account.limiter.try_acquire() if account.limiter else 0.0
+            if delay > 0:
+                wait = delay if wait is None else min(wait, delay)
+                continue
+            self._next = (self._next + offset + 1) % count
+            account.in_flight += 1
+            return account, account.queue.popleft(), None
+        return None, None, wait
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                account, job, wait = self._next_job()
+                while job is None:
+                    if self._closed:
+                        return
+                    self._condition.wait(timeout=wait)
+                    account, job, wait = self._next_job()
+            assert account is not None
+            try:
+                if job.future.set_running_or_notify_cancel():
+                    job.future.set_result(account.http_client.execute(job.request))
+            except Exception as e:
+                job.future.set_exception(e)
+            finally:
+                with self._condition:
+                    account.in_flight -= 1
+                    self._condition.notify_all()
+
+    def close(self, wait: bool = True) -> None:
+        """Stop the workers; queued requests are cancelled"""
+        with self._condition:
+            self._closed = True
+            for account in self._accounts.values():
+                while account.queue:
+                    account.queue.popleft().future.cancel()
+            self._condition.notify_all()
+        if wait:
+            for worker in self._workers:
+                worker.join()
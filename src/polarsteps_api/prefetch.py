@@ -0,0 +1,125 @@
+import threading
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import wait as wait_for
+from typing import TYPE_CHECKING, Any, Callable, NamedTuple, Optional
+
+from polarsteps_api.ratelimit import RateLimiter
+from polarsteps_api.scheduler import Priority, request_priority
+
+if TYPE_CHECKING:
+    from polarsteps_api.client import CachedResponse, PolarstepsClient
+    from polarsteps_api.models.trip import Trip
+    from polarsteps_api.models.user import User
+
+RANKINGS: dict[str, Callable[["Trip"], float]] = {
+    "last_modified": lambda trip: trip.last_modified or trip.start_date or 0,
+    "views": lambda trip: trip.views or 0,
+}
+
+
+class PrefetchPolicy(NamedTuple):
+    """Which trips of a fetched user to load into the cache in the background"""
+
+    count: int = 3
+    rank_by: str = "last_modified"
+    max_concurrency: int = 2
+    # Bytes per second across all prefetches; None for no limit
+    bandwidth: Optional[float] = None
+    # Charged when a response carries no Content-Length
+    estimated_bytes: int = 64_000
+
+    def select(self, user: "User") -> list[str]:
+        """IDs of the user's top `count` trips by `rank_by`"""
+        trips = [trip for trip in (user.alltrips or []) if not trip.is_deleted]
+        trips.sort(key=RANKINGS[self.rank_by], reverse=True)
+        return [str(trip.id) for trip in trips[: self.count]]
+
+
+class Prefetcher:
+    """Runs prefetches and cache warming for a client within a shared budget"""
+
+    def __init__(self, client: "PolarstepsClient", policy: PrefetchPolicy):
+        if policy.rank_by not in RANKINGS:
+            raise ValueError(
+                f"Unknown ranking '{policy.rank_by}', expected one of "
+                f"{', '.join(RANKINGS)}"
+            )
+        self.client = client
+        self.policy = policy
+        self.limiter = (
+            RateLimiter(policy.bandwidth, burst=policy.bandwidth)
+            if policy.bandwidth
+            else None
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, policy.max_concurrency),
+            thread_name_prefix="polarsteps-prefetch",
+        )
+        # In-flight fetches by (kind, key), so repeated requests share one
+        self._queued: dict[tuple[str, str], Future[Any]] = {}
+        self._lock = threading.Lock()
+
+    def _charge(self, response: "CachedResponse") -> None:
+        if self.limiter is None:
+            return
+        try:
+            size = int(response.headers.get("Content-Length", ""))
+        except ValueError:
+            size = self.policy.estimated_bytes
+        # Spend the bytes after the fact, capped so one huge trip cannot stall
+        self.limiter.acquire(min(size, self.limiter.burst))
+
+    def _submit(
+        self, key: str, fetch: Callable[[str], "CachedResponse"]
+    ) -> "Future[CachedResponse]":
+        queued = (fetch.__name__, key)
+
+        def run() -> "CachedResponse":
+            try:
+                # Cache hits download nothing, so they cost no bandwidth
+                cached = key in self.client._cache
+                # Behind any interactive calls when a RequestScheduler is in use
+                with request_priority(Priority.BACKGROUND):
+                    response = fetch(key)
+                if not cached:
+                    self._charge(response)
+                return response
+            finally:
+                with self._lock:
+                    self._queued.pop(queued, None)
+
+        with self._lock:
+            future = self._queued.get(queued)
+            if future is None:
+                future = self._queued[queued] = self._executor.submit(run)
+        return future
+
+    def prefetch_user(self, user: "User") -> list["Future[CachedResponse]"]:
+        """Queue the policy's trips for `user` that are not cached yet"""
+        return [
+            self._submit(trip_id, self.client.get_trip)
+            for trip_id in self.policy.select(user)
+            if trip_id not in self.client._cache
+        ]
+
+    def warm(
+        self, usernames: Iterable[str] = (), trip_ids: Iterable[str] = ()
+    ) -> dict[str, int]:
+        """Fetch users and trips into the cache; returns each key's status code"""
+        futures = {
+            username: self._submit(username, self.client.get_user_by_username)
+            for username in usernames
+        }
+        futures.update(
+            (trip_id, self._submit(trip_id, self.client.get_trip))
+            for trip_id in map(str, trip_ids)
+        )
+        wait_for(futures.values())
+        return {
+            key: 0 if future.exception() else future.result().status_code
+            for key, future in futures.items()
+        }
+
+    def close(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,189 @@
+import functools
+import sys
+import threading
+import time
+import typing
+from collections.abc import Iterator
+from contextlib import contextmanager, suppress
+from contextvars import ContextVar
+from typing import Any, Callable, Optional, TypeVar
+
+from pydantic import BaseModel
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+F = TypeVar("F", bound=Callable[..., Any])
+
+_active: ContextVar[Optional["ValidationProfiler"]] = ContextVar(
+    "polarsteps_validation_profiler", default=None
+)
+# The profiler whose real validation is running in this thread/task; the
+# measuring passes run validators too and must not be counted
+_recording: ContextVar[Optional["ValidationProfiler"]] = ContextVar(
+    "polarsteps_recording_validators", default=None
+)
+
+
+def _resolve_forward_ref(name: str, owner: type[BaseModel]) -> Any:
+    namespace = vars(sys.modules[owner.__module__])
+    if name in namespace:
+        return namespace[name]
+    # Names only imported under TYPE_CHECKING: find the model class by name
+    package = owner.__module__.split(".")[0]
+    pending = list(BaseModel.__subclasses__())
+    while pending:
+        candidate = pending.pop()
+        if candidate.__name__ == name and candidate.__module__.startswith(package):
+            return candidate
+        pending.extend(candidate.__subclasses__())
+    return None
+
+
+def _nested_model(annotation: Any, owner: type[BaseModel]) -> Optional[type[BaseModel]]:
+    """The model class inside Optional[...] / list[...] annotations, if any"""
+    if isinstance(annotation, typing.ForwardRef):
+        annotation = annotation.__forward_arg__
+    if isinstance(annotation, str):
+        annotation = _resolve_forward_ref(annotation, owner)
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in typing.get_args(annotation):
+        model = _nested_model(arg, owner)
+        if model is not None:
+            return model
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def _nested_fields(model_cls: type[BaseModel]) -> tuple[tuple[str, type], ...]:
+    fields = []
+    for name, field in model_cls.model_fields.items():
+        nested = _nested_model(field.annotation, model_cls)
+        if nested is not None:
+            fields.append((name, nested))
+    return tuple(fields)
+
+
+class ValidationProfiler:
+    """Cumulative validation time and instance counts per model and validator.
+
+    Model times are exclusive: each nested model is validated on its own first
+    and its time is subtracted from the parent's, so the report shows where
+    the cost actually sits. This re-validates nested payloads once per level,
+    so only use it while investigating.
+    """
+
+    def __init__(self) -> None:
+        self.models: dict[str, list[float]] = {}
+        self.validators: dict[str, list[float]] = {}
+        self.parsed = 0
+        self.parse_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def _add(self, table: dict[str, list[float]], name: str, seconds: float) -> None:
+        with self._lock:
+            entry = table.setdefault(name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+
+    def record_validator(self, name: str, seconds: float) -> None:
+        if _recording.get() is self:
+            self._add(self.validators, name, seconds)
+
+    def validate(self, model_cls: type[ModelT], data: Any) -> ModelT:
+        """Validate `data` into `model_cls`, recording where the time goes"""
+        self._measure(model_cls, data)
+        token = _recording.set(self)
+        started = time.perf_counter()
+        try:
+            return model_cls.model_validate(data)
+        finally:
+            _recording.reset(token)
+            with self._lock:
+                self.parsed += 1
+                self.parse_seconds += time.perf_counter() - started
+
+    def _measure(self, model_cls: type[BaseModel], data: Any) -> float:
+        children = 0.0
+        if isinstance(data, dict):
+            for name, nested in _nested_fields(model_cls):
+                value = data.get(name)
+                if isinstance(value, dict):
+                    children += self._measure(nested, value)
+                elif isinstance(value, list):
+                    for item in value:
+                        if isinstance(item, dict):
+                            children += self._measure(nested, item)
+
+        started = time.perf_counter()
+        # Failures are reported by the real validation afterwards
+        with suppress(Exception):
+            model_cls.model_validate(data)
+        total = time.perf_counter() - started
+        self._add(self.models, model_cls.__name__, max(total - children, 0.0))
+        return total
+
+    def report(self, limit: Optional[int] = None) -> str:
+        """Ranked table of exclusive model time and validator time"""
+        rows = [("model", name, *entry) for name, entry in self.models.items()]
+        rows += [("validator", name, *entry) for name, entry in self.validators.items()]
+        rows.sort(key=lambda row: row[3], reverse=True)
+        overall = sum(entry[1] for entry in self.models.values()) or 1.0
+
+        lines = [
+            f"{self.parsed} payloads parsed in {self.parse_seconds * 1e3:.3f} ms",
+            f"{'kind':<10} {'name':<36} {'count':>8} {'total ms':>10} "
+            f"{'mean us':>10} {'share':>7}",
+        ]
+        for kind, name, count, seconds in rows[:limit]:
+            lines.append(
+                f"{kind:<10} {name:<36} {int(count):>8} {seconds * 1e3:>10.3f} "
+                f"{seconds / count * 1e6:>10.1f} {seconds / overall:>7.1%}"
+            )
+        return "\n".join(lines)
+
+    def print_report(self, limit: Optional[int] = None) -> None:
+        print(self.report(limit))
+
+
+@contextmanager
+def profile_validation(
+    profiler: Optional[ValidationProfiler] = None,
+) -> Iterator[ValidationProfiler]:
+    """Profile every response parsed within the block (current thread/task)"""
+    profiler = profiler or ValidationProfiler()
+    token = _active.set(profiler)
+    try:
+        yield profiler
+    finally:
+        _active.reset(token)
+
+
+def validate_model(model_cls: type[ModelT], data: Any) -> ModelT:
+    """`model_cls(**data)`, routed through the active profiler if there is one"""
+    profiler = _active.get()
+    if profiler is None:
+        return model_cls(**data)
+    return profiler.validate(model_cls, data)
+
+
+def profiled_validator(func: F) -> F:
+    """Time a custom pydantic validator while a profiler is active.
+
+    Place it below `@classmethod` for field validators.
+    """
+
+    @functools.wraps(func)
+    def wrapper(owner: Any, *args: Any, **kwargs: Any) -> Any:
+        profiler = _active.get()
+        if profiler is None:
+            return func(owner, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return func(owner, *args, **kwargs)
+        finally:
+            cls = owner if isinstance(owner, type) else type(owner)
+            profiler.record_validator(
+                f"{cls.__name__}.{func.__name__}", time.perf_counter() - started
+            )
+
+    return typing.cast(F, wrapper)
@@ -0,0 +1,223 @@
+import math
+import threading
+from collections.abc import Iterable, Sequence
+from typing import Any, Optional
+
+from cachetools import LRUCache
+
+from polarsteps_api.models.trip import Trip
+
+# (lat, lon)
+Point = tuple[float, float]
+
+# Simplification error allowed, in screen pixels at the requested zoom level
+PIXEL_TOLERANCE = 1.0
+TILE_SIZE = 256
+MAX_ZOOM = 22
+_SEGMENT_POINT_KEYS = ("path", "points", "coordinates")
+# GeoJSON order: pairs under these keys are [lon, lat]
+_LON_FIRST_KEYS = ("coordinates",)
+_SEGMENT_ANCHOR_KEYS = ("start_step_id", "from_step_id", "step_id")
+
+
+def _to_point(value: Any, lon_first: bool = False) -> Optional[Point]:
+    if isinstance(value, dict):
+        lat, lon = value.get("lat"), value.get("lon", value.get("lng"))
+    elif isinstance(value, (list, tuple)) and len(value) >= 2:
+        lat, lon = (value[1], value[0]) if lon_first else (value[0], value[1])
+    else:
+        return None
+    if lat is None or lon is None:
+        return None
+    return float(lat), float(lon)
+
+
+def segment_points(segment: dict[str, Any]) -> list[Point]:
+    """Points of a route segment given as a path, point list or polyline"""
+    for key in _SEGMENT_POINT_KEYS:
+        value = segment.get(key)
+        if isinstance(value, str):
+            return decode_polyline(value)
+        if isinstance(value, list):
+            lon_first = key in _LON_FIRST_KEYS
+            points = (_to_point(item, lon_first) for item in value)
+            return [point for point in points if point is not None]
+    if isinstance(segment.get("polyline"), str):
+        return decode_polyline(segment["polyline"])
+    return []
+
+
+def build_route(trip: Trip) -> list[Point]:
+    """Step locations in time order, with route segments spliced in.
+
+    A segment follows the step it names (`start_step_id`), otherwise the
+    step nearest to its first point.
+    """
+    steps = sorted(
+        (
+            step
+            for step in trip.all_steps or []
+            if not step.is_deleted
+            and step.location is not None
+            and step.location.lat is not None
+            and step.location.lon is not None
+        ),
+        key=lambda step: (step.start_time or 0, step.id),
+    )
+    stops: list[Point] = [(step.location.lat, step.location.lon) for step in steps]  # type: ignore[misc, union-attr]
+    positions = {step.id: index for index, step in enumerate(steps)}
+
+    after: dict[int, list[Point]] = {}
+    for segment in trip.route_segments or []:
+        points = segment_points(segment)
+        if not points:
+            continue
+        anchor = next(
+            (
+                positions[segment[key]]
+                for key in _SEGMENT_ANCHOR_KEYS
+                if segment.get(key) in positions
+            ),
+            None,
+        )
+        if anchor is None:
+            if not stops:
+                anchor = -1
+            else:
+                first = points[0]
+                anchor = min(
+                    range(len(stops)),
+                    key=lambda i: (
+                        (stops[i][0] - first[0]) ** 2 + (stops[i][1] - first[1]) ** 2
+                    ),
+                )
+        after.setdefault(anchor, []).extend(points)
+
+    route = list(after.get(-1, []))
+    for index, stop in enumerate(stops):
+        route.append(stop)
+        route.extend(after.get(index, []))
+    # Drop consecutive duplicates
+    return [p for i, p in enumerate(route) if i == 0 or p != route[i - 1]]
+
+
+def _mercator(point: Point) -> tuple[float, float]:
+    lat = max(min(point[0], 85.05112878), -85.05112878)
+    x = (point[1] + 180.0) / 360.0
+    sin = math.sin(math.radians(lat))
+    y = 0.5 - math.log((1 + sin) / (1 - sin)) / (4 * math.pi)
+    return x, y
+
+
+def zoom_tolerance(zoom: int, pixels: float = PIXEL_TOLERANCE) -> float:
+    """Tolerance in unit Web Mercator coordinates for `pixels` at `zoom`"""
+    return pixels / (TILE_SIZE * 2 ** max(0, min(zoom, MAX_ZOOM)))
+
+
+def simplify(points: Sequence[Point], tolerance: float) -> list[Point]:
+    """Douglas–Peucker on Web Mercator coordinates; `tolerance` in those units"""
+    if len(points) < 3 or tolerance <= 0:
+        return list(points)
+    projected = [_mercator(p) for p in points]
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    tolerance_sq = tolerance * tolerance
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        ax, ay = projected[first]
+        bx, by = projected[last]
+        dx, dy = bx - ax, by - ay
+        length_sq = dx * dx + dy * dy
+        worst, worst_index = -1.0, -1
+        for index in range(first + 1, last):
+            px, py = projected[index]
+            if length_sq == 0:
+                distance = (px - ax) ** 2 + (py - ay) ** 2
+            else:
+                t = max(0.0, min(1.0, ((px - ax) * dx + (py - ay) * dy) / length_sq))
+                distance = (px - ax - t * dx) ** 2 + (py - ay - t * dy) ** 2
+            if distance > worst:
+                worst, worst_index = distance, index
+        if worst > tolerance_sq:
+            keep[worst_index] = True
+            stack.append((first, worst_index))
+            stack.append((worst_index, last))
+    return [point for point, kept in zip(points, keep, strict=True) if kept]
+
+
+def encode_polyline(points: Iterable[Point], precision: int = 5) -> str:
+    """Google encoded polyline of (lat, lon) points"""
+    factor = 10**precision
+    output = []
+    previous_lat = previous_lon = 0
+    for lat, lon in points:
+        lat_i, lon_i = round(lat * factor), round(lon * factor)
+        for delta in (lat_i - previous_lat, lon_i - previous_lon):
+            value = ~(delta << 1) if delta < 0 else delta << 1
+            while value >= 0x20:
+                output.append(chr((0x20 | (value & 0x1F)) + 63))
+                value >>= 5
+            output.append(chr(value + 63))
+        previous_lat, previous_lon = lat_i, lon_i
+    return "".join(output)
+
+
+def decode_polyline(encoded: str, precision: int = 5) -> list[Point]:
+    factor = 10**precision
+    points: list[Point] = []
+    index = lat = lon = 0
+    while index < len(encoded):
+        deltas = []
+        for _ in range(2):
+            shift = result = 0
+            while True:
+                byte = ord(encoded[index]) - 63
+                index += 1
+                result |= (byte & 0x1F) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            deltas.append(~(result >> 1) if result & 1 else result >> 1)
+        lat += deltas[0]
+        lon += deltas[1]
+        points.append((lat / factor, lon / factor))
+    return points
+
+
+def to_geojson(points: Sequence[Point], properties: Optional[dict] = None) -> dict:
+    """GeoJSON LineString feature; coordinates are (lon, lat)"""
+    return {
+        "type": "Feature",
+        "geometry": {
+            "type": "LineString",
+            "coordinates": [[lon, lat] for lat, lon in points],
+        },
+        "properties": properties or {},
+    }
+
+
+class RouteRenderer:
+    """Simplified trip routes per zoom level, cached by (trip, last_modified, zoom)"""
+
+    def __init__(self, maxsize: int = 1_024, pixels: float = PIXEL_TOLERANCE):
+        self.pixels = pixels
+        self._cache: LRUCache[tuple[Any, ...], list[Point]] = LRUCache(maxsize)
+        self._lock = threading.Lock()
+
+    def points(self, trip: Trip, zoom: int) -> list[Point]:
+        key = (trip.id, trip.last_modified, zoom)
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        points = simplify(build_route(trip), zoom_tolerance(zoom, self.pixels))
+        with self._lock:
+            self._cache[key] = points
+        return points
+
+    def polyline(self, trip: Trip, zoom: int) -> str:
+        return encode_polyline(self.points(trip, zoom))
+
+    def geojson(self, trip: Trip, zoom: int) -> dict:
+        return to_geojson(self.points(trip, zoom), {"trip_id": trip.id, "zoom": zoom})
@@ -0,0 +1,197 @@
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any, Optional
+
+from polarsteps_api.models.base import BaseRequest, BaseResponse
+
+
+class Priority(IntEnum):
+    INTERACTIVE = 0
+    DEFAULT = 1
+    BACKGROUND = 2
+
+
+# (priority, relative timeout) used by execute() for the current thread/task
+_request_context: ContextVar[tuple[Priority, Optional[float]]] = ContextVar(
+    "polarsteps_request_priority", default=(Priority.DEFAULT, None)
+)
+
+
+@contextmanager
+def request_priority(
+    priority: Priority, timeout: Optional[float] = None
+) -> Iterator[None]:
+    """Run the client calls in this block with `priority` and a deadline"""
+    token = _request_context.set((priority, timeout))
+    try:
+        yield
+    finally:
+        _request_context.reset(token)
+
+
+def deadline_exceeded() -> BaseResponse:
+    return BaseResponse(
+        data={"error": "Deadline exceeded before the request was sent"},
+        status_code=0,
+        headers={},
+    )
+
+
+class _Job:
+    __slots__ = ("request", "priority", "deadline", "future")
+
+    def __init__(
+        self, request: BaseRequest, priority: Priority, deadline: Optional[float]
+    ):
+        self.request = request
+        self.priority = priority
+        self.deadline = deadline
+        self.future: Future[BaseResponse] = Future()
+
+
+class RequestScheduler:
+    """Priority queue with deadlines in front of `HTTPClient.execute`.
+
+    Queued requests are started highest priority first, each class limited to
+    its own number of in-flight requests. `reserved` workers (a quarter by
+    default) only ever run INTERACTIVE requests, so background crawls cannot
+    crowd out interactive calls. Requests whose deadline passes while queued
+    fail fast with a status_code=0 response instead of being sent.
+
+        client.http_client = RequestScheduler(client.http_client)
+        with request_priority(Priority.INTERACTIVE, timeout=2.0):
+            client.get_trip(trip_id)
+    """
+
+    def __init__(
+        self,
+        http_client: Any,
+        workers: int = 8,
+        max_in_flight: Optional[dict[Priority, int]] = None,
+        reserved: Optional[int] = None,
+    ):
+        self.http_client = http_client
+        if reserved is None:
+            reserved = max(1, workers // 4) if workers > 1 else 0
+        # Workers DEFAULT and BACKGROUND requests may occupy between them
+        self.shared_workers = max(1, workers - reserved)
+        self.max_in_flight = {
+            Priority.INTERACTIVE: workers,
+            Priority.DEFAULT: self.shared_workers,
+            Priority.BACKGROUND: max(1, self.shared_workers // 2),
+        }
+        self.max_in_flight.update(max_in_flight or {})
+        self._queues: dict[Priority, deque[_Job]] = {p: deque() for p in Priority}
+        self._in_flight = dict.fromkeys(Priority, 0)
+        self.dropped = dict.fromkeys(Priority, 0)
+        self._condition = threading.Condition()
+        self._closed = False
+        self._workers = [
+            threading.Thread(
+                target=self._work, name=f"polarsteps-scheduler-{i}", daemon=True
+            )
+            for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.http_client, name)
+
+    def submit(
+        self,
+        request: BaseRequest,
+        priority: Priority = Priority.DEFAULT,
+        timeout: Optional[float] = None,
+    ) -> "Future[BaseResponse]":
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        job = _Job(request, priority, deadline)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("RequestScheduler is closed")
+            self._queues[priority].append(job)
+            self._condition.notify()
+        return job.future
+
+    def execute(self, request: BaseRequest) -> BaseResponse:
+        """Queue with the priority/timeout from `request_priority` and wait"""
+        priority, timeout = _request_context.get()
+        future = self.submit(request, priority=priority, timeout=timeout)
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            # Still queued: drop it. Already sent: let it finish in the background
+            if future.cancel():
+                with self._condition:
+                    self.dropped[priority] += 1
+            return deadline_exceeded()
+
+    def pending(self, priority: Optional[Priority] = None) -> int:
+        with self._condition:
+            if priority is not None:
+                return len(self._queues[priority])
+            return sum(len(queue) for queue in self._queues.values())
+
+    def _shared_in_flight(self) -> int:
+        return self._in_flight[Priority.DEFAULT] + self._in_flight[Priority.BACKGROUND]
+
+    def _next_job(self) -> Optional[_Job]:
+        now = time.monotonic()
+        for priority in Priority:
+            queue = self._queues[priority]
+            if self._in_flight[priority] >= self.max_in_flight[priority]:
+                continue
+            if priority is not Priority.INTERACTIVE and self._shared_in_flight() >= (
+                self.shared_workers
+            ):
+                continue
+            while queue:
+                job = queue.popleft()
+                if job.future.cancelled():
+                    continue
+                if job.deadline is not None and job.deadline <= now:
+                    self.dropped[priority] += 1
+                    if job.future.set_running_or_notify_cancel():
+                        job.future.set_result(deadline_exceeded())
+                    continue
+                self._in_flight[priority] += 1
+                return job
+        return None
+
+    def _work(self) -> None:
+        while True:
+            with self._condition:
+                job = self._next_job()
+                while job is None:
+                    if self._closed:
+                        return
+                    self._condition.wait()
+                    job = self._next_job()
+            try:
+                if job.future.set_running_or_notify_cancel():
+                    job.future.set_result(self.http_client.execute(job.request))
+            except Exception as e:
+                job.future.set_exception(e)
+            finally:
+                with self._condition:
+                    self._in_flight[job.priority] -= 1
+                    self._condition.notify_all()
+
+    def close(self, wait: bool = True) -> None:
+        """Stop the workers; queued requests are cancelled"""
+        with self._condition:
+            self._closed = True
+            for queue in self._queues.values():
+                while queue:
+                    queue.popleft().future.cancel()
+            self._condition.notify_all()
+        if wait:
+            for worker in self._workers:
+                worker.join()
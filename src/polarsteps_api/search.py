@@ -0,0 +1,180 @@
+import math
+import re
+import threading
+import unicodedata
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Any, NamedTuple, Optional
+
+from polarsteps_api.hooks import ClientObserver, ParsedEvent
+from polarsteps_api.models.trip import Step, Trip
+from polarsteps_api.models.user import User
+
+TOKEN_RE = re.compile(r"\w+")
+
+# Weight of a token occurrence per indexed field
+STEP_FIELDS = {"name": 3.0, "display_name": 3.0, "description": 1.0}
+TRIP_FIELDS = {"name": 3.0, "summary": 1.0}
+
+# (kind, id): kind is "trip" or "step"
+DocKey = tuple[str, int]
+
+
+def tokenize(text: Optional[str]) -> list[str]:
+    """Lower-cased, accent-stripped word tokens"""
+    if not text:
+        return []
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return TOKEN_RE.findall(stripped)
+
+
+class SearchHit(NamedTuple):
+    kind: str
+    id: int
+    trip_id: int
+    score: float
+
+
+class SearchIndex(ClientObserver):
+    """Incremental inverted index over trip and step text.
+
+    Posting lists map each token to the documents containing it; a sorted
+    vocabulary serves prefix queries by bisection. A query only touches the
+    postings of its own terms. Add it to a client as an observer to index
+    every trip (and user's embedded trips) the client parses.
+    """
+
+    def __init__(self) -> None:
+        self._postings: dict[str, dict[DocKey, float]] = {}
+        self._vocabulary: list[str] = []
+        self._doc_tokens: dict[DocKey, tuple[str, ...]] = {}
+        self._doc_trip: dict[DocKey, int] = {}
+        self._trip_steps: dict[int, list[DocKey]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._doc_tokens)
+
+    def on_parsed(self, event: ParsedEvent) -> None:
+        if isinstance(event.model, Trip):
+            self.add_trip(event.model)
+        elif isinstance(event.model, User):
+            for trip in event.model.alltrips or []:
+                self.add_trip(trip)
+
+    def _add_doc(self, key: DocKey, trip_id: int, weights: Counter) -> None:
+        self._remove_doc(key)
+        for token, weight in weights.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                insort(self._vocabulary, token)
+            postings[key] = weight
+        self._doc_tokens[key] = tuple(weights)
+        self._doc_trip[key] = trip_id
+
+    def _remove_doc(self, key: DocKey) -> None:
+        for token in self._doc_tokens.pop(key, ()):
+            postings = self._postings[token]
+            del postings[key]
+            if not postings:
+                del self._postings[token]
+                del self._vocabulary[bisect_left(self._vocabulary, token)]
+        self._doc_trip.pop(key, None)
+
+    @staticmethod
+    def _weights(model: Any, fields: dict[str, float]) -> Counter:
+        weights: Counter = Counter()
+        for field, weight in fields.items():
+            for token in tokenize(getattr(model, field, None)):
+                weights[token] += weight
+        return weights
+
+    def add_trip(self, trip: Trip) -> None:
+        """(Re)index a trip; its steps only if the trip carries `all_steps`"""
+        with self._lock:
+            self._add_doc(("trip", trip.id), trip.id, self._weights(trip, TRIP_FIELDS))
+            if "all_steps" not in trip.model_fields_set:
+                return
+            for key in self._trip_steps.pop(trip.id, []):
+                self._remove_doc(key)
+            keys = []
+            for step in trip.all_steps or []:
+                if step.is_deleted:
+                    continue
+                key = ("step", step.id)
+                self._add_doc(key, trip.id, self._weights(step, STEP_FIELDS))
+                keys.append(key)
+            self._trip_steps[trip.id] = keys
+
+    def add_step(self, step: Step) -> None:
+        with self._lock:
+            key = ("step", step.id)
+            self._add_doc(key, step.trip_id, self._weights(step, STEP_FIELDS))
+            keys = self._trip_steps.setdefault(step.trip_id, [])
+            if key not in keys:
+                keys.append(key)
+
+    def remove_trip(self, trip_id: int) -> None:
+        with self._lock:
+            for key in self._trip_steps.pop(trip_id, []):
+                self._remove_doc(key)
+            self._remove_doc(("trip", trip_id))
+
+    def _expand(self, token: str, prefix: bool) -> list[str]:
+        if not prefix:
+            return [token] if token in self._postings else []
+        start = bisect_left(self._vocabulary, token)
+        end = bisect_left(self._vocabulary, token + "\U0010ffff", start)
+        return self._vocabulary[start:end]
+
+    def search(
+        self,
+        query: str,
+        limit: Optional[int] = 20,
+        kind: Optional[str] = None,
+        prefix: bool = True,
+    ) -> list[SearchHit]:
+        """Documents matching every query term, best first.
+
+        The last term matches as a prefix when `prefix` is set, so partially
+        typed queries already find results. Scores are tf-idf sums.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        with self._lock:
+            total = len(self._doc_tokens) or 1
+            term_scores: list[dict[DocKey, float]] = []
+            for position, token in enumerate(tokens):
+                expand = prefix and position == len(tokens) - 1
+                scores: dict[DocKey, float] = {}
+                for term in self._expand(token, expand):
+                    postings = self._postings[term]
+                    idf = math.log(1 + total / len(postings))
+                    for key, weight in postings.items():
+                        score = weight * idf
+                        if score > scores.get(key, 0.0):
+                            scores[key] = score
+                if not scores:
+                    return []
+                term_scores.append(scores)
+
+            # Intersect starting from the rarest term
+            term_scores.sort(key=len)
+            matches = term_scores[0]
+            if kind is not None:
+                matches = {key: s for key, s in matches.items() if key[0] == kind}
+            hits = []
+            for key, score in matches.items():
+                for other in term_scores[1:]:
+                    extra = other.get(key)
+                    if extra is None:
+                        break
+                    score += extra
+                else:
+                    hits.append(SearchHit(key[0], key[1], self._doc_trip[key], score))
+
+        hits.sort(key=lambda hit: (-hit.score, hit.kind, hit.id))
+        return hits[:limit]
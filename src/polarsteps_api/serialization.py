@@ -0,0 +1,158 @@
+from collections.abc import Iterable, Iterator
+from typing import IO, Any, Callable, NamedTuple, Optional, Union
+
+import pydantic_core
+from pydantic import BaseModel
+
+JSONEncoder = Callable[[Any], bytes]
+IncEx = Union[set, dict]
+
+
+class Preset(NamedTuple):
+    """Raw field selection applied when serialising a model"""
+
+    include: Optional[IncEx] = None
+    exclude: Optional[IncEx] = None
+
+
+_LOCATION = {"living_location": {"uuid", "precision"}}
+_SOCIAL = {
+    "followers": {"__all__": {"username"}},
+    "followees": {"__all__": {"username"}},
+}
+_PROFILE = {
+    "id": True,
+    "username": True,
+    "first_name": True,
+    "last_name": True,
+    "description": True,
+    "profile_image_path": True,
+    "living_location": True,
+    "country_count": True,
+}
+
+# Subsets of the raw model fields, serialised as stored (e.g. float timestamps).
+# They are not the to_summary / to_profile / to_social shapes: derived values
+# such as length_days or follower counts need those methods.
+PRESETS: dict[str, Preset] = {
+    "trip_summary_fields": Preset(
+        include={
+            "id",
+            "name",
+            "summary",
+            "start_date",
+            "end_date",
+            "total_km",
+            "step_count",
+            "country_count",
+            "views",
+            "like_count",
+            "cover_photo_path",
+        }
+    ),
+    "step_summary_fields": Preset(
+        include={
+            "name": True,
+            "description": True,
+            "start_time": True,
+            "location": True,
+            "weather_condition": True,
+            "weather_temperature": True,
+            "views": True,
+            "comment_count": True,
+        },
+        exclude={
+            "location": {"uuid", "precision", "full_detail", "administrative_area"}
+        },
+    ),
+    "user_profile_fields": Preset(include=_PROFILE, exclude=_LOCATION),
+    "user_social_fields": Preset(include=_SOCIAL),
+    "user_summary_fields": Preset(
+        include={**_PROFILE, **_SOCIAL, "stats": True}, exclude=_LOCATION
+    ),
+}
+
+
+def _default_encoder() -> JSONEncoder:
+    try:
+        import orjson
+    except ImportError:
+        return pydantic_core.to_json
+    return orjson.dumps
+
+
+_encoder: JSONEncoder = _default_encoder()
+
+
+def set_encoder(encoder: Optional[JSONEncoder]) -> None:
+    """Use `encoder` for plain objects, or restore the default when None"""
+    global _encoder
+    _encoder = encoder or _default_encoder()
+
+
+def get_encoder() -> JSONEncoder:
+    return _encoder
+
+
+def _resolve_preset(preset: Union[str, Preset, None]) -> Preset:
+    if preset is None:
+        return Preset()
+    if isinstance(preset, Preset):
+        return preset
+    try:
+        return PRESETS[preset]
+    except KeyError:
+        raise ValueError(
+            f"Unknown preset '{preset}', expected one of {sorted(PRESETS)}"
+        ) from None
+
+
+def dumps(
+    obj: Any,
+    preset: Union[str, Preset, None] = None,
+    include: Optional[IncEx] = None,
+    exclude: Optional[IncEx] = None,
+    exclude_none: bool = False,
+) -> bytes:
+    """Serialise a model or a summary dict to compact JSON bytes.
+
+    Models are written by pydantic's serializer directly, without building an
+    intermediate dict; anything else goes through the configured encoder.
+    """
+    if isinstance(obj, BaseModel):
+        selected = _resolve_preset(preset)
+        return type(obj).__pydantic_serializer__.to_json(
+            obj,
+            include=include if include is not None else selected.include,
+            exclude=exclude if exclude is not None else selected.exclude,
+            exclude_none=exclude_none,
+        )
+    return _encoder(obj)
+
+
+def iter_json_array(
+    items: Iterable[Any],
+    preset: Union[str, Preset, None] = None,
+    **kwargs: Any,
+) -> Iterator[bytes]:
+    """Yield the chunks of a JSON array, one item at a time"""
+    yield b"["
+    separator = b""
+    for item in items:
+        yield separator
+        yield dumps(item, preset=preset, **kwargs)
+        separator = b","
+    yield b"]"
+
+
+def write_json_array(
+    items: Iterable[Any],
+    fp: IO[bytes],
+    preset: Union[str, Preset, None] = None,
+    **kwargs: Any,
+) -> int:
+    """Stream a JSON array of models (e.g. trips) into a binary file object"""
+    written = 0
+    for chunk in iter_json_array(items, preset=preset, **kwargs):
+        written += fp.write(chunk)
+    return written
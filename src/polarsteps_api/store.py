@@ -0,0 +1,359 @@
+import json
+import math
+import sqlite3
+import threading
+from collections.abc import Iterable
+from datetime import datetime, timezone
+from typing import Any, Optional, Union
+
+from polarsteps_api.geo import haversine_km
+from polarsteps_api.models.summary import Summaries, summarize_trips
+from polarsteps_api.models.trip import Step, Trip
+from polarsteps_api.models.user import User
+from polarsteps_api.serialization import dumps
+
+# Size in degrees of the lat/lon cells used to index step locations
+GRID_DEGREES = 0.5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    uuid TEXT,
+    username TEXT,
+    last_modified REAL,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS trips (
+    id INTEGER PRIMARY KEY,
+    uuid TEXT,
+    user_id INTEGER,
+    name TEXT,
+    start_date REAL,
+    end_date REAL,
+    total_km REAL,
+    step_count INTEGER,
+    views INTEGER,
+    last_modified REAL,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS steps (
+    id INTEGER PRIMARY KEY,
+    uuid TEXT,
+    trip_id INTEGER NOT NULL,
+    start_time REAL,
+    country_code TEXT,
+    lat REAL,
+    lon REAL,
+    grid_lat INTEGER,
+    grid_lon INTEGER,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS media (
+    id INTEGER PRIMARY KEY,
+    uuid TEXT,
+    trip_id INTEGER NOT NULL,
+    step_id INTEGER,
+    position INTEGER,
+    data BLOB NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS users_username ON users (username);
+CREATE INDEX IF NOT EXISTS trips_user_id ON trips (user_id);
+CREATE INDEX IF NOT EXISTS trips_total_km ON trips (total_km);
+CREATE INDEX IF NOT EXISTS steps_trip_id ON steps (trip_id);
+CREATE INDEX IF NOT EXISTS steps_country_start ON steps (country_code, start_time);
+CREATE INDEX IF NOT EXISTS steps_start_time ON steps (start_time);
+CREATE INDEX IF NOT EXISTS steps_grid ON steps (grid_lat, grid_lon);
+CREATE INDEX IF NOT EXISTS media_step_id ON media (step_id);
+CREATE INDEX IF NOT EXISTS media_trip_id ON media (trip_id);
+"""
+
+
+def grid_cell(lat: float, lon: float) -> tuple[int, int]:
+    return math.floor(lat / GRID_DEGREES), math.floor(lon / GRID_DEGREES)
+
+
+def _longitude_ranges(west: float, east: float) -> list[tuple[float, float]]:
+    """Split [west, east] at the antimeridian; empty when it spans every longitude"""
+    if east - west >= 360.0:
+        return []
+    if west < -180.0:
+        return [(west + 360.0, 180.0), (-180.0, east)]
+    if east > 180.0:
+        return [(west, 180.0), (-180.0, east - 360.0)]
+    return [(west, east)]
+
+
+def _year_range(year: int) -> tuple[float, float]:
+    start = datetime(year, 1, 1, tzinfo=timezone.utc).timestamp()
+    end = datetime(year + 1, 1, 1, tzinfo=timezone.utc).timestamp()
+    return start, end
+
+
+class TripStore:
+    """SQLite store of fetched users, trips, steps and media.
+
+    Each row keeps the model's JSON next to indexed columns, so queries filter
+    in SQL and only the matching rows are turned back into models. Trips
+    without `all_steps` (e.g. from `User.alltrips`) keep previously stored
+    steps.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def __enter__(self) -> "TripStore":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # Writing
+
+    def upsert_trip(self, trip: Trip) -> None:
+        self.upsert_trips([trip])
+
+    def upsert_trips(self, trips: Iterable[Trip]) -> None:
+        with self._lock, self._conn:
+            for trip in trips:
+                self._write_trip(trip)
+
+    def upsert_user(self, user: User) -> None:
+        """Store a user along with the trips embedded in `alltrips`"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO users VALUES (?, ?, ?, ?, ?)",
+                (
+                    user.id,
+                    user.uuid,
+                    user.username,
+                    user.last_modified,
+                    dumps(user, exclude={"alltrips"}),
+                ),
+            )
+            for trip in user.alltrips or []:
+                self._write_trip(trip)
+
+    def _write_trip(self, trip: Trip) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO trips VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                trip.id,
+                trip.uuid,
+                trip.user_id,
+                trip.name,
+                trip.start_date,
+                trip.end_date,
+                trip.total_km,
+                trip.step_count,
+                trip.views,
+                trip.last_modified,
+                dumps(trip, exclude={"all_steps", "user"}),
+            ),
+        )
+        if "all_steps" not in trip.model_fields_set:
+            return
+
+        self._conn.execute("DELETE FROM steps WHERE trip_id = ?", (trip.id,))
+        self._conn.execute("DELETE FROM media WHERE trip_id = ?", (trip.id,))
+        step_rows = []
+        media_rows = []
+        for step in trip.all_steps or []:
+            location = step.location
+            lat = location.lat if location else None
+            lon = location.lon if location else None
+            cell = grid_cell(lat, lon) if lat is not None and lon is not None else None
+            step_rows.append(
+                (
+                    step.id,
+                    step.uuid,
+                    trip.id,
+                    step.start_time,
+                    location.country_code if location else None,
+                    lat,
+                    lon,
+                    cell[0] if cell else None,
+                    cell[1] if cell else None,
+                    dumps(step, exclude={"media"}),
+                )
+            )
+            media_rows.extend(
+                (item.id, item.uuid, trip.id, step.id, position, dumps(item))
+                for position, item in enumerate(step.media or [])
+            )
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO steps VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            step_rows,
+        )
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO media VALUES (?, ?, ?, ?, ?, ?)", media_rows
+        )
+
+    # Reading
+
+    def _query(self, sql: str, params: Iterable[Any] = ()) -> list[tuple[Any, ...]]:
+        with self._lock:
+            return self._conn.execute(sql, tuple(params)).fetchall()
+
+    def _media_by_step(self, step_ids: list[int]) -> dict[int, list[Any]]:
+        media: dict[int, list[Any]] = {}
+        # Stay below SQLite's bound parameter limit
+        for start in range(0, len(step_ids), 500):
+            chunk = step_ids[start : start + 500]
+            rows = self._query(
+                "SELECT step_id, data FROM media WHERE step_id IN "
+                f"({', '.join('?' * len(chunk))}) ORDER BY step_id, position",
+                chunk,
+            )
+            for step_id, data in rows:
+                media.setdefault(step_id, []).append(json.loads(data))
+        return media
+
+    def _steps(self, rows: list[tuple[Any, ...]]) -> list[Step]:
+        """Models for (id, data) step rows, with their media"""
+        media = self._media_by_step([row[0] for row in rows])
+        return [
+            Step.model_validate({**json.loads(data), "media": media.get(step_id, [])})
+            for step_id, data in rows
+        ]
+
+    def get_trip(self, trip_id: Union[int, str]) -> Optional[Trip]:
+        rows = self._query("SELECT data FROM trips WHERE id = ?", (int(trip_id),))
+        if not rows:
+            return None
+        steps = self._steps(
+            self._query(
+                "SELECT id, data FROM steps WHERE trip_id = ? ORDER BY start_time, id",
+                (int(trip_id),),
+            )
+        )
+        trip = Trip.model_validate(json.loads(rows[0][0]))
+        trip.all_steps = steps
+        return trip
+
+    def get_user(self, username: str) -> Optional[User]:
+        """The stored user; `alltrips` holds its stored trips without steps"""
+        rows = self._query("SELECT id, data FROM users WHERE username = ?", (username,))
+        if not rows:
+            return None
+        user_id, data = rows[0]
+        user = User.model_validate(json.loads(data))
+        user.alltrips = self.trips(user_id=user_id)
+        return user
+
+    def trips(
+        self,
+        user_id: Optional[int] = None,
+        min_km: Optional[float] = None,
+        country_code: Optional[str] = None,
+        year: Optional[int] = None,
+        limit: Optional[int] = None,
+    ) -> list[Trip]:
+        """Stored trips (without steps) matching every given filter"""
+        clauses, params = [], []
+        if user_id is not None:
+            clauses.append("user_id = ?")
+            params.append(user_id)
+        if min_km is not None:
+            clauses.append("total_km >= ?")
+            params.append(min_km)
+        if country_code is not None:
+            clauses.append("id IN (SELECT trip_id FROM steps WHERE country_code = ?)")
+            params.append(country_code.upper())
+        if year is not None:
+            start, end = _year_range(year)
+            clauses.append("start_date < ? AND (end_date IS NULL OR end_date >= ?)")
+            params.extend((end, start))
+        sql = "SELECT data FROM trips"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY start_date DESC, id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [
+            Trip.model_validate(json.loads(data))
+            for (data,) in self._query(sql, params)
+        ]
+
+    def trip_summaries(self, **filters: Any) -> Summaries:
+        """`Trip.to_summary` rows for `trips(**filters)`"""
+        return summarize_trips(self.trips(**filters))
+
+    def steps(
+        self,
+        trip_id: Optional[Union[int, str]] = None,
+        country_code: Optional[str] = None,
+        year: Optional[int] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> list[Step]:
+        """Stored steps matching every given filter, in chronological order"""
+        clauses, params = [], []
+        if trip_id is not None:
+            clauses.append("trip_id = ?")
+            params.append(int(trip_id))
+        if country_code is not None:
+            clauses.append("country_code = ?")
+            params.append(country_code.upper())
+        if year is not None:
+            start, end = _year_range(year)
+            clauses.append("start_time >= ? AND start_time < ?")
+            params.extend((start, end))
+        if since is not None:
+            clauses.append("start_time >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("start_time < ?")
+            params.append(until)
+        sql = "SELECT id, data FROM steps"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY start_time, id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self._steps(self._query(sql, params))
+
+    def steps_near(self, lat: float, lon: float, radius_km: float) -> list[Step]:
+        """Steps within `radius_km` of a point, nearest first"""
+        # Grid cells covering the bounding box, then an exact distance check
+        dlat = radius_km / 111.0
+        dlon = radius_km / max(111.0 * math.cos(math.radians(lat)), 1e-6)
+        lon = (lon + 180.0) % 360.0 - 180.0
+        low_lat = grid_cell(max(lat - dlat, -90.0), 0.0)[0]
+        high_lat = grid_cell(min(lat + dlat, 90.0), 0.0)[0]
+        sql = "SELECT id, lat, lon, data FROM steps WHERE grid_lat BETWEEN ? AND ?"
+        params: list[Any] = [low_lat, high_lat]
+        ranges = _longitude_ranges(lon - dlon, lon + dlon)
+        if ranges:
+            sql += " AND (" + " OR ".join(["grid_lon BETWEEN ? AND ?"] * len(ranges))
+            sql += ")"
+            for west, east in ranges:
+                params.extend((grid_cell(0.0, west)[1], grid_cell(0.0, east)[1]))
+        rows = self._query(sql, params)
+        nearby = sorted(
+            (haversine_km(lat, lon, step_lat, step_lon), step_id, data)
+            for step_id, step_lat, step_lon, data in rows
+        )
+        return self._steps(
+            [
+                (step_id, data)
+                for distance, step_id, data in nearby
+                if distance <= radius_km
+            ]
+        )
+
+    def counts(self) -> dict[str, int]:
+        return {
+            table: self._query(f"SELECT COUNT(*) FROM {table}")[0][0]
+            for table in ("users", "trips", "steps", "media")
+        }
@@ -0,0 +1,107 @@
+import json
+import threading
+from collections.abc import Iterable, Mapping
+from datetime import timedelta
+from typing import Any, Optional, Protocol
+
+import requests
+
+# Response headers that must never end up in a fixture file
+REDACTED_HEADERS = frozenset({"set-cookie"})
+
+
+class Transport(Protocol):
+    """Anything with the `requests.Session.request` calling convention"""
+
+    def request(self, method: str, url: str, **kwargs: Any) -> Any: ...
+
+
+class RecordedResponse:
+    """Minimal `requests.Response` stand-in served from a recording"""
+
+    def __init__(
+        self,
+        status_code: int,
+        headers: Optional[Mapping[str, str]] = None,
+        body: str = "",
+    ):
+        self.status_code = status_code
+        self.headers = dict(headers or {})
+        self.text = body
+        self.content = body.encode("utf-8")
+        self.elapsed = timedelta(0)
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+
+def _record_key(method: str, url: str) -> tuple[str, str]:
+    return method.upper(), url
+
+
+class RecordingTransport:
+    """Forward requests to a real transport and append each exchange to JSONL"""
+
+    def __init__(self, path: str, transport: Optional[Transport] = None):
+        self.path = path
+        self.transport = transport or requests.Session()
+        self._lock = threading.Lock()
+
+    def request(self, method: str, url: str, **kwargs: Any) -> Any:
+        response = self.transport.request(method=method, url=url, **kwargs)
+        record = {
+            "request": {"method": method.upper(), "url": url},
+            "response": {
+                "status_code": response.status_code,
+                "headers": {
+                    key: value
+                    for key, value in dict(response.headers).items()
+                    if key.lower() not in REDACTED_HEADERS
+                },
+                "body": response.text,
+            },
+        }
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+        return response
+
+
+class ReplayTransport:
+    """Serve recorded responses from memory without touching the network.
+
+    Exchanges recorded several times for the same request are replayed in
+    order, after which the last one keeps being served.
+    """
+
+    def __init__(self, records: Iterable[Mapping[str, Any]]):
+        self._responses: dict[tuple[str, str], list[Mapping[str, Any]]] = {}
+        self._positions: dict[tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+        for record in records:
+            request = record["request"]
+            key = _record_key(request["method"], request["url"])
+            self._responses.setdefault(key, []).append(record["response"])
+
+    @classmethod
+    def from_file(cls, path: str) -> "ReplayTransport":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.loads(line) for line in f if line.strip())
+
+    def __len__(self) -> int:
+        return sum(len(responses) for responses in self._responses.values())
+
+    def request(self, method: str, url: str, **kwargs: Any) -> RecordedResponse:
+        key = _record_key(method, url)
+        responses = self._responses.get(key)
+        if not responses:
+            raise requests.ConnectionError(f"No recorded response for {method} {url}")
+        with self._lock:
+            position = self._positions.get(key, 0)
+            self._positions[key] = min(position + 1, len(responses) - 1)
+        response = responses[position]
+        return RecordedResponse(
+            status_code=response["status_code"],
+            headers=response.get("headers"),
+            body=response.get("body", ""),
+        )
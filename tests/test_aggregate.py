@@ -0,0 +1,105 @@
+"""Unit tests for the trip aggregation engine."""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from polarsteps_api.aggregate import TripAggregator
+from polarsteps_api.models.trip import Trip
+
+
+def ts(*args):
+    return datetime(*args, tzinfo=timezone.utc).timestamp()
+
+
+def step(step_id, when, country, lat, lon, media=0, tz="Europe/Lisbon"):
+    return {
+        "id": step_id,
+        "uuid": f"s{step_id}",
+        "trip_id": 1,
+        "start_time": when,
+        "timezone_id": tz,
+        "location": {"lat": lat, "lon": lon, "country_code": country},
+        "media": [
+            {"id": i, "uuid": f"m{step_id}-{i}", "type": 0} for i in range(media)
+        ],
+    }
+
+
+def make_trip(trip_id=1, steps=None):
+    return Trip(
+        id=trip_id,
+        uuid=f"t{trip_id}",
+        all_steps=steps
+        if steps is not None
+        else [
+            step(1, ts(2024, 3, 1, 12), "pt", 38.72, -9.14, media=2),
+            step(2, ts(2024, 3, 1, 18), "PT", 41.15, -8.61),
+            # 23:30 UTC is already the next day in Madrid
+            step(3, ts(2024, 3, 2, 23, 30), "ES", 40.42, -3.70, 1, "Europe/Madrid"),
+        ],
+    )
+
+
+class TestTripAggregator:
+    """Test cases for TripAggregator."""
+
+    def test_group_bys(self):
+        """Test totals by country, local day and year."""
+        aggregator = TripAggregator()
+        aggregator.add_trip(make_trip())
+
+        countries = aggregator.countries()
+        assert countries["PT"]["steps"] == 2
+        assert countries["PT"]["media"] == 2
+        assert countries["PT"]["days"] == 1
+        assert countries["PT"]["km"] == pytest.approx(274, abs=3)
+        assert countries["ES"]["km"] == pytest.approx(422, abs=5)
+
+        assert list(aggregator.days()) == ["2024-03-01", "2024-03-03"]
+        assert aggregator.years()[2024]["steps"] == 3
+        assert aggregator.total.days == 2
+
+    def test_readding_replaces_trip(self):
+        """Test a new version of a trip replaces the old contribution."""
+        aggregator = TripAggregator()
+        aggregator.add_trip(make_trip())
+        aggregator.add_trip(make_trip(steps=[step(1, ts(2023, 6, 1), "FR", 48.8, 2.3)]))
+
+        assert aggregator.countries() == {
+            "FR": {"steps": 1, "km": 0.0, "media": 0, "days": 1}
+        }
+        assert list(aggregator.years()) == [2023]
+        assert len(aggregator) == 1
+
+    def test_incremental_and_remove(self):
+        """Test trips can be added and removed one at a time."""
+        aggregator = TripAggregator()
+        aggregator.add_trips(
+            [make_trip(), make_trip(2, [step(9, ts(2024, 3, 1, 9), "PT", 38.7, -9.1)])]
+        )
+        assert aggregator.countries()["PT"]["steps"] == 3
+        assert aggregator.countries()["PT"]["days"] == 1
+
+        aggregator.remove_trip(1)
+        assert aggregator.countries() == {
+            "PT": {"steps": 1, "km": 0.0, "media": 0, "days": 1}
+        }
+        assert 1 not in aggregator
+
+    def test_trips_without_steps_are_ignored(self):
+        """Test embedded trips without all_steps do not wipe stored data."""
+        aggregator = TripAggregator()
+        aggregator.add_trip(make_trip())
+        aggregator.add_trip(Trip(id=1, uuid="t1"))
+
+        assert aggregator.total.steps == 3
+
+    def test_unknown_country_and_timezone(self):
+        """Test missing country codes and bad timezones fall back safely."""
+        aggregator = TripAggregator()
+        aggregator.add_trip(
+            make_trip(steps=[step(1, ts(2024, 1, 1), None, 0.0, 0.0, tz="Mars/Base")])
+        )
+        assert list(aggregator.countries()) == ["unknown"]
+        assert list(aggregator.days()) == ["2024-01-01"]
@@ -0,0 +1,89 @@
+"""Unit tests for the NDJSON archive writer and reader."""
+
+import os
+
+import pytest
+
+from polarsteps_api.archive import ArchiveReader, ArchiveWriter, index_path
+from polarsteps_api.models.trip import Step, Trip
+from polarsteps_api.models.user import User
+
+
+def make_trip(trip_id: int) -> Trip:
+    return Trip(
+        id=trip_id,
+        uuid=f"trip-{trip_id}",
+        name=f"Trip {trip_id}\nwith a newline",
+        all_steps=[Step(id=trip_id * 10, uuid=f"step-{trip_id}", trip_id=trip_id)],
+    )
+
+
+class TestPlainArchive:
+    """Test cases for uncompressed archives."""
+
+    def test_round_trip(self, tmp_path):
+        """Test records stream back in order and can be fetched by ID."""
+        path = str(tmp_path / "trips.ndjson")
+        trips = [make_trip(i) for i in range(1, 6)]
+
+        with ArchiveWriter(path) as writer:
+            assert writer.write_many(trips) == 5
+
+        assert os.path.exists(index_path(path))
+        reader = ArchiveReader(path, Trip)
+        assert list(reader) == trips
+        assert len(reader) == 5
+        assert 3 in reader
+        assert reader.get(3) == trips[2]
+        assert reader.get("missing") is None
+
+    def test_append_and_overwrite(self, tmp_path):
+        """Test appending keeps earlier records and later writes win."""
+        path = str(tmp_path / "trips.ndjson")
+        with ArchiveWriter(path) as writer:
+            writer.write(make_trip(1))
+            writer.write(make_trip(2))
+
+        updated = make_trip(1).model_copy(update={"name": "Renamed"})
+        with ArchiveWriter(path) as writer:
+            writer.write(updated)
+
+        reader = ArchiveReader(path, Trip)
+        assert reader.get(1).name == "Renamed"
+        assert reader.get(2) == make_trip(2)
+        assert len(list(reader)) == 3
+
+    def test_users_with_custom_ids(self, tmp_path):
+        """Test users can be indexed by an explicit record ID."""
+        path = str(tmp_path / "users.ndjson")
+        user = User(id=1, uuid="user-1", username="explorer")
+        with ArchiveWriter(path) as writer:
+            writer.write(user, record_id=user.username)
+
+        assert ArchiveReader(path, User).get("explorer") == user
+
+    def test_unsupported_compression(self, tmp_path):
+        """Test unknown compression names are rejected."""
+        with pytest.raises(ValueError, match="Unsupported compression"):
+            ArchiveWriter(str(tmp_path / "trips.ndjson"), compression="lz4")
+
+
+class TestCompressedArchive:
+    """Test cases for zstd chunked archives."""
+
+    def test_round_trip(self, tmp_path):
+        """Test chunked frames stream back and seek by ID."""
+        pytest.importorskip("zstandard")
+        path = str(tmp_path / "trips.ndjson.zst")
+        trips = [make_trip(i) for i in range(1, 8)]
+
+        with ArchiveWriter(path, compression="zstd", chunk_size=3) as writer:
+            writer.write_many(trips)
+        with ArchiveWriter(path, compression="zstd", chunk_size=3) as writer:
+            writer.write(make_trip(8))
+
+        reader = ArchiveReader(path, Trip)
+        assert reader.compressed
+        assert list(reader) == [*trips, make_trip(8)]
+        assert reader.get(5) == trips[4]
+        assert reader.get(8) == make_trip(8)
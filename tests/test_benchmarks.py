@@ -0,0 +1,49 @@
+"""Sanity checks for the benchmark generators and regression gate."""
+
+from benchmarks.generators import make_trip_data, make_user_data
+from benchmarks.run import BENCHMARKS, Sizes, find_regressions, run
+from polarsteps_api.models.trip import Trip
+from polarsteps_api.models.user import User
+
+
+class TestGenerators:
+    """Test that synthetic payloads parse into models."""
+
+    def test_trip_data_parses(self):
+        """Test generated trips honour the requested sizes."""
+        trip = Trip(**make_trip_data(step_count=4, media_per_step=2))
+
+        assert len(trip.all_steps) == 4
+        assert all(len(step.media) == 2 for step in trip.all_steps)
+        assert trip.country_count > 0
+
+    def test_user_data_parses(self):
+        """Test generated users honour the requested sizes."""
+        user = User(**make_user_data(trip_count=3, follower_count=6, steps_per_trip=2))
+
+        assert len(user.alltrips) == 3
+        assert len(user.followers) == 6
+        assert len(user.alltrips[0].all_steps) == 2
+
+    def test_generators_are_deterministic(self):
+        """Test the same seed yields the same payload."""
+        assert make_trip_data(seed=1) == make_trip_data(seed=1)
+
+
+class TestRegressionGate:
+    """Test cases for the benchmark runner."""
+
+    def test_find_regressions(self):
+        """Test only benchmarks beyond the threshold are reported."""
+        results = {"fast": 1.0, "slow": 1.5, "new": 9.0}
+        baseline = {"fast": 0.95, "slow": 1.0}
+
+        assert find_regressions(results, baseline, threshold=0.2) == {"slow": 1.5}
+
+    def test_every_benchmark_runs(self):
+        """Test each registered benchmark sets up and runs on tiny inputs."""
+        sizes = Sizes(steps=1, media=1, trips=1, followers=1)
+        results = run(sizes=sizes, repeat=1)
+
+        assert set(results) == set(BENCHMARKS)
+        assert all(seconds > 0 for seconds in results.values())
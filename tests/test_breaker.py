@@ -0,0 +1,117 @@
+"""Unit tests for the circuit breaker."""
+
+import pytest
+import requests
+
+from polarsteps_api.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from polarsteps_api.client import HTTPClient
+from polarsteps_api.models.request import GetTripRequest
+from polarsteps_api.transport import RecordedResponse
+
+
+class FlakyTransport:
+    """Raises connection errors while `down` is set"""
+
+    def __init__(self):
+        self.down = True
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        if self.down:
+            raise requests.ConnectionError("Connection refused")
+        return RecordedResponse(200, {}, '{"id": 1}')
+
+
+class TestCircuitBreaker:
+    """Test cases for CircuitBreaker."""
+
+    def test_opens_after_threshold(self):
+        """Test the circuit opens after consecutive failures only."""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == CLOSED
+
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+
+    def test_single_probe_when_half_open(self):
+        """Test one probe is allowed after the timeout and decides the state."""
+        now = [0.0]
+        breaker = CircuitBreaker(
+            failure_threshold=1, reset_timeout=10, clock=lambda: now[0]
+        )
+        breaker.record_failure()
+
+        now[0] = 10.0
+        assert breaker.state == HALF_OPEN
+        assert breaker.allow()
+        assert not breaker.allow()
+
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        now[0] = 20.0
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CLOSED
+        assert breaker.allow()
+
+    def test_invalid_threshold(self):
+        """Test a threshold below one is rejected."""
+        with pytest.raises(ValueError, match="at least 1"):
+            CircuitBreaker(failure_threshold=0)
+
+    def test_http_client_fails_fast(self):
+        """Test HTTPClient stops calling the transport while the circuit is open."""
+        now = [0.0]
+        transport = FlakyTransport()
+        breaker = CircuitBreaker(
+            failure_threshold=2, reset_timeout=5, clock=lambda: now[0]
+        )
+        client = HTTPClient(
+            "https://api.example.com",
+            "token",
+            transport=transport,
+            circuit_breaker=breaker,
+        )
+
+        for _ in range(5):
+            response = client.execute(GetTripRequest("1"))
+            assert response.status_code == 0
+        assert transport.calls == 2
+        assert "Circuit breaker open" in response.data["error"]
+
+        transport.down = False
+        now[0] = 5.0
+        assert client.execute(GetTripRequest("1")).status_code == 200
+        assert breaker.state == CLOSED
+
+    def test_probe_released_when_transport_raises(self):
+        """Test an unexpected error during the probe does not wedge the breaker."""
+        now = [0.0]
+        transport = FlakyTransport()
+        breaker = CircuitBreaker(
+            failure_threshold=1, reset_timeout=5, clock=lambda: now[0]
+        )
+        client = HTTPClient(
+            "https://api.example.com",
+            "token",
+            transport=transport,
+            circuit_breaker=breaker,
+        )
+        client.execute(GetTripRequest("1"))
+        assert breaker.state == OPEN
+
+        now[0] = 5.0
+        transport.request = lambda *args, **kwargs: 1 / 0
+        with pytest.raises(ZeroDivisionError):
+            client.execute(GetTripRequest("1"))
+        assert breaker.state == HALF_OPEN
+
+        del transport.request
+        transport.down = False
+        assert client.execute(GetTripRequest("1")).status_code == 200
+        assert breaker.state == CLOSED
@@ -0,0 +1,78 @@
+"""Unit tests for multiprocess bulk re-parsing."""
+
+import json
+
+import pytest
+
+from benchmarks.generators import make_trip_data
+from polarsteps_api.archive import ArchiveWriter
+from polarsteps_api.bulk import reparse, reparse_archive
+from polarsteps_api.models.trip import Trip
+
+
+def payloads(count):
+    return [
+        json.dumps(make_trip_data(trip_id=i, step_count=3, seed=i))
+        for i in range(count)
+    ]
+
+
+class TestReparse:
+    """Test cases for reparse."""
+
+    def test_in_process(self):
+        """Test payloads come back as the models' JSON, in input order."""
+        raw = payloads(5)
+        results = list(reparse(raw, workers=1, chunk_size=2))
+
+        assert [result.index for result in results] == list(range(5))
+        for result, payload in zip(results, raw, strict=True):
+            expected = Trip.model_validate_json(payload)
+            assert Trip.model_validate_json(result.data) == expected
+
+    @pytest.mark.parametrize("ordered", [True, False])
+    def test_process_pool(self, ordered):
+        """Test a process pool returns every result, ordered when asked."""
+        results = list(reparse(payloads(20), workers=2, chunk_size=3, ordered=ordered))
+
+        indexes = [result.index for result in results]
+        assert sorted(indexes) == list(range(20))
+        if ordered:
+            assert indexes == list(range(20))
+        assert all(result.error is None for result in results)
+
+    def test_errors_and_presets(self):
+        """Test invalid payloads are reported and presets applied."""
+        raw = [*payloads(1), '{"id": "not a number"}', "not json"]
+        results = list(reparse(raw, workers=1, preset="trip_summary_fields"))
+
+        assert set(json.loads(results[0].data)) <= {
+            "id",
+            "name",
+            "summary",
+            "start_date",
+            "end_date",
+            "total_km",
+            "step_count",
+            "country_count",
+            "views",
+            "like_count",
+            "cover_photo_path",
+        }
+        assert results[1].data is None and results[1].error
+        assert results[2].data is None and results[2].error
+
+    def test_unknown_model(self):
+        """Test an unknown model name is rejected."""
+        with pytest.raises(ValueError, match="Unknown model"):
+            list(reparse([], model="step"))
+
+    def test_archive(self, tmp_path):
+        """Test every archived record is re-parsed."""
+        path = str(tmp_path / "trips.ndjson")
+        with ArchiveWriter(path) as writer:
+            for payload in payloads(4):
+                writer.write(Trip.model_validate_json(payload))
+
+        results = list(reparse_archive(path, workers=1))
+        assert [json.loads(r.data)["id"] for r in results] == [0, 1, 2, 3]
@@ -0,0 +1,96 @@
+"""Unit tests for the polarsteps command line tool."""
+
+import io
+import json
+from unittest.mock import patch
+
+import pytest
+
+from polarsteps_api.cli import main, open_sink, read_keys
+from polarsteps_api.store import TripStore
+from polarsteps_api.transport import RecordedResponse
+
+
+def fake_request(self, method, url, **kwargs):
+    if "/users/byusername/alice" in url:
+        body = {
+            "id": 7,
+            "uuid": "u7",
+            "username": "alice",
+            "alltrips": [{"id": 1, "uuid": "t1", "all_steps": []}],
+        }
+        return RecordedResponse(200, {}, json.dumps(body))
+    if url.endswith("/trips/2"):
+        return RecordedResponse(200, {}, '{"id": 2, "uuid": "t2"}')
+    return RecordedResponse(404, {}, '{"error": "not found"}')
+
+
+@pytest.fixture(autouse=True)
+def token(monkeypatch):
+    monkeypatch.setenv("POLARSTEPS_REMEMBER_TOKEN", "token")
+
+
+class TestReadKeys:
+    """Test cases for read_keys."""
+
+    def test_files_and_stdin(self, tmp_path, monkeypatch):
+        """Test keys are merged, deduplicated and stripped of blanks/comments."""
+        path = tmp_path / "users.txt"
+        path.write_text("alice\n\n# nightly\nbob\nalice\n")
+        assert read_keys(["carol"], str(path)) == ["carol", "alice", "bob"]
+
+        monkeypatch.setattr("sys.stdin", io.StringIO("1\n2\n"))
+        assert read_keys([], "-") == ["1", "2"]
+
+
+class TestFetch:
+    """Test cases for `polarsteps fetch`."""
+
+    @patch("requests.Session.request", fake_request)
+    def test_ndjson_export(self, tmp_path, capsys):
+        """Test users and trips are written as NDJSON records."""
+        output = tmp_path / "export.ndjson"
+        code = main(["fetch", "-u", "alice", "-t", "2", "-o", str(output), "-q"])
+
+        assert code == 0
+        records = [json.loads(line) for line in output.read_text().splitlines()]
+        assert sorted((r["type"], r["data"]["id"]) for r in records) == [
+            ("trip", 2),
+            ("user", 7),
+        ]
+
+    @patch("requests.Session.request", fake_request)
+    def test_sqlite_export_and_errors(self, tmp_path, capsys):
+        """Test the SQLite sink and a non-zero exit code on failures."""
+        output = str(tmp_path / "export.sqlite")
+        code = main(["fetch", "-u", "alice", "-t", "2", "-t", "3", "-o", output])
+
+        assert code == 1
+        assert "Failed to fetch trip 3: 404" in capsys.readouterr().err
+        with TripStore(output) as store:
+            assert store.get_user("alice").id == 7
+            assert store.get_trip(2).uuid == "t2"
+
+    def test_nothing_to_fetch(self, capsys):
+        """Test an empty job list is a usage error."""
+        assert main(["fetch"]) == 2
+
+    def test_output_error_is_usage_error(self, capsys):
+        """Test a file-only format without a path exits 2 with one line."""
+        assert main(["fetch", "-u", "bob", "-f", "sqlite", "-q"]) == 2
+        err = capsys.readouterr().err
+        assert err == "Cannot write output: sqlite output needs a file path\n"
+
+    def test_missing_token_is_usage_error(self, tmp_path, monkeypatch, capsys):
+        """Test a missing remember token exits 2 without a traceback."""
+        monkeypatch.delenv("POLARSTEPS_REMEMBER_TOKEN")
+        monkeypatch.setattr("polarsteps_api.client._dotenv_loaded", True)
+        output = tmp_path / "export.ndjson"
+
+        assert main(["fetch", "-u", "bob", "-o", str(output), "-q"]) == 2
+        assert "Remember token must be provided" in capsys.readouterr().err
+
+    def test_sink_needs_path(self):
+        """Test file-only formats reject stdout."""
+        with pytest.raises(ValueError, match="needs a file path"):
+            open_sink(None, "sqlite")
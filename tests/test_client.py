@@ -1,12 +1,19 @@
+import json
+import time
 from unittest.mock import Mock, patch
+from urllib.parse import parse_qs, urlparse
 
 import pytest
 import requests
 
 from polarsteps_api.client import HTTPClient, PolarstepsClient
+from polarsteps_api.hashing import content_hash
+from polarsteps_api.hooks import ClientObserver
 from polarsteps_api.models.base import BaseRequest, BaseResponse
 from polarsteps_api.models.request import GetTripRequest, GetUserByUsernameRequest
 from polarsteps_api.models.response import TripResponse, UserResponse
+from polarsteps_api.pipeline import default_middleware
+from polarsteps_api.transport import RecordedResponse
 
 
 @pytest.fixture
@@ -42,6 +49,7 @@ def mock_request():
     mock_req = Mock(spec=BaseRequest)
     mock_req.get_endpoint.return_value = "/test"
     mock_req.get_method.return_value = "GET"
+    mock_req.get_params.return_value = {}
     mock_req.headers = {}
     return mock_req
 
@@ -144,6 +152,7 @@ class TestHTTPClient:
         mock_req = Mock(spec=BaseRequest)
         mock_req.get_endpoint.return_value = "/test"
         mock_req.get_method.return_value = "POST"
+        mock_req.get_params.return_value = {}
         mock_req.headers = {
             "Custom-Header": "custom-value",
             "Accept": "application/xml",  # Override session header
@@ -327,3 +336,379 @@ class TestIntegration:
         # Verify error is handled properly
         assert isinstance(result, TripResponse)
         assert_response_matches(result, {"error": "Network error"}, 0, {})
+
+
+class SequenceTransport:
+    """Serves the given (status, body) pairs in order, repeating the last one"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        status, body = self.responses[min(self.calls, len(self.responses) - 1)]
+        self.calls += 1
+        return RecordedResponse(status, {}, body)
+
+
+def expire(client, key, age=None):
+    """Drop `key` from the fresh cache, optionally aging the stale copy"""
+    del client._cache[key]
+    if age is not None:
+        _, response = client._stale[key]
+        client._stale[key] = (time.monotonic() - age, response)
+
+
+class TestStaleCache:
+    """Test cases for stale-while-revalidate and stale-if-error."""
+
+    def test_stale_served_while_refreshing(self):
+        """Test an expired entry is served at once and refreshed behind it."""
+        transport = SequenceTransport(
+            (200, '{"id": 1, "uuid": "a", "name": "old"}'),
+            (200, '{"id": 1, "uuid": "a", "name": "new"}'),
+        )
+        client = PolarstepsClient(
+            remember_token="token", transport=transport, stale_while_revalidate=60
+        )
+        assert client.get_trip("1").trip.name == "old"
+
+        expire(client, "1")
+        assert client.get_trip("1").trip.name == "old"
+        client.close()
+
+        assert transport.calls == 2
+        assert client.get_trip("1").trip.name == "new"
+        assert transport.calls == 2
+
+    def test_stale_beyond_grace_is_refetched(self):
+        """Test entries older than the grace period are fetched inline."""
+        transport = SequenceTransport(
+            (200, '{"id": 1, "uuid": "a", "name": "old"}'),
+            (200, '{"id": 1, "uuid": "a", "name": "new"}'),
+        )
+        client = PolarstepsClient(
+            remember_token="token",
+            transport=transport,
+            cache_ttl=300,
+            stale_while_revalidate=60,
+        )
+        client.get_trip("1")
+
+        expire(client, "1", age=400)
+        assert client.get_trip("1").trip.name == "new"
+
+    def test_stale_if_error(self):
+        """Test the last good value is served on 5xx and network errors."""
+        transport = SequenceTransport(
+            (200, '{"id": 1, "uuid": "a", "name": "good"}'),
+            (503, '{"error": "unavailable"}'),
+        )
+        client = PolarstepsClient(
+            remember_token="token", transport=transport, stale_if_error=600
+        )
+        client.get_trip("1")
+
+        expire(client, "1", age=400)
+        response = client.get_trip("1")
+        assert response.status_code == 200
+        assert response.trip.name == "good"
+
+        _, stale = client._stale["1"]
+        client._stale["1"] = (time.monotonic() - 1000, stale)
+        assert client.get_trip("1").status_code == 503
+
+    def test_client_errors_are_not_masked(self):
+        """Test 4xx responses are returned even with stale-if-error."""
+        transport = SequenceTransport(
+            (200, '{"id": 1, "uuid": "a"}'),
+            (404, '{"error": "not found"}'),
+        )
+        client = PolarstepsClient(
+            remember_token="token", transport=transport, stale_if_error=600
+        )
+        client.get_trip("1")
+
+        expire(client, "1")
+        assert client.get_trip("1").status_code == 404
+
+
+class TestNegativeCache:
+    """Test cases for short-lived caching of error responses."""
+
+    def test_not_found_is_cached(self):
+        """Test repeated lookups of a missing trip hit the negative cache."""
+        transport = SequenceTransport((404, '{"error": "not found"}'))
+        client = PolarstepsClient(
+            remember_token="token", transport=transport, negative_ttl={404: 60}
+        )
+
+        assert client.get_trip("1").status_code == 404
+        assert client.get_trip("1").status_code == 404
+        assert transport.calls == 1
+
+    def test_status_class_and_expiry(self):
+        """Test status class keys apply and entries expire."""
+        transport = SequenceTransport(
+            (403, '{"error": "forbidden"}'),
+            (200, '{"id": 1, "uuid": "a"}'),
+        )
+        client = PolarstepsClient(
+            remember_token="token", transport=transport, negative_ttl={400: 0.05}
+        )
+        client.get_trip("1")
+        assert client.get_trip("1").status_code == 403
+
+        time.sleep(0.1)
+        assert client.get_trip("1").status_code == 200
+        assert transport.calls == 2
+
+    def test_uncached_statuses(self):
+        """Test statuses without a TTL are never cached."""
+        transport = SequenceTransport((500, '{"error": "boom"}'))
+        client = PolarstepsClient(
+            remember_token="token", transport=transport, negative_ttl={404: 60}
+        )
+        client.get_trip("1")
+        client.get_trip("1")
+        assert transport.calls == 2
+
+
+class TestEmbeddedTrips:
+    """Test cases for reusing trips embedded in user responses."""
+
+    USER = (
+        '{"id": 7, "uuid": "u7", "username": "alice", "alltrips": ['
+        '{"id": 1, "uuid": "t1", "name": "Partial"},'
+        '{"id": 2, "uuid": "t2", "name": "Complete", "step_count": 1,'
+        ' "all_steps": [{"id": 5, "uuid": "s5", "trip_id": 2}]},'
+        '{"id": 3, "uuid": "t3", "name": "Empty", "all_steps": []},'
+        '{"id": 4, "uuid": "t4", "name": "Truncated", "step_count": 2,'
+        ' "all_steps": [{"id": 6, "uuid": "s6", "trip_id": 4}]}]}'
+    )
+
+    def make_client(self, **kwargs):
+        transport = SequenceTransport(
+            (200, self.USER), (200, '{"id": 1, "uuid": "t1", "name": "Fetched"}')
+        )
+        client = PolarstepsClient(remember_token="token", transport=transport, **kwargs)
+        client.get_user_by_username("alice")
+        return client, transport
+
+    def test_partial_trip_served_when_allowed(self):
+        """Test summary-level lookups use the embedded trip."""
+        client, transport = self.make_client(cache_embedded_trips=True)
+
+        response = client.get_trip("1", allow_partial=True)
+        assert response.partial
+        assert response.trip.name == "Partial"
+        assert response.data["name"] == "Partial"
+        assert transport.calls == 1
+
+        response = client.get_trip("1")
+        assert not response.partial
+        assert response.trip.name == "Fetched"
+        assert transport.calls == 2
+
+    def test_complete_trip_fills_cache(self):
+        """Test embedded trips with steps are plain cache hits."""
+        client, transport = self.make_client(cache_embedded_trips=True)
+
+        response = client.get_trip("2")
+        assert not response.partial
+        assert response.trip.name == "Complete"
+        assert transport.calls == 1
+
+    def test_missing_steps_stay_partial(self):
+        """Test empty or short embedded step lists do not count as complete."""
+        client, transport = self.make_client(cache_embedded_trips=True)
+
+        assert client.get_trip("3", allow_partial=True).partial
+        assert client.get_trip("4", allow_partial=True).partial
+        assert transport.calls == 1
+        # Neither went into the full cache, so a plain lookup fetches
+        assert not client.get_trip("3").partial
+        assert transport.calls == 2
+
+    def test_disabled_by_default(self):
+        """Test embedded trips are ignored unless enabled."""
+        client, transport = self.make_client()
+
+        assert client.get_trip("1", allow_partial=True).trip.name == "Fetched"
+        assert transport.calls == 2
+
+
+class TestContentHash:
+    """Test cases for reusing models of unchanged bodies."""
+
+    def test_unchanged_body_reuses_model(self):
+        """Test a byte-identical refetch skips validation."""
+        body = '{"id": 1, "uuid": "a", "name": "same"}'
+        transport = SequenceTransport((200, body))
+        client = PolarstepsClient(remember_token="token", transport=transport)
+
+        first = client.get_trip("1")
+        expire(client, "1")
+        second = client.get_trip("1")
+
+        assert transport.calls == 2
+        assert second is not first
+        assert second.trip is first.trip
+        assert second.content_hash == first.content_hash is not None
+
+    def test_changed_body_is_parsed(self):
+        """Test a different body produces a new model."""
+        transport = SequenceTransport(
+            (200, '{"id": 1, "uuid": "a", "name": "old"}'),
+            (200, '{"id": 1, "uuid": "a", "name": "new"}'),
+        )
+        client = PolarstepsClient(remember_token="token", transport=transport)
+
+        first = client.get_trip("1")
+        expire(client, "1")
+        second = client.get_trip("1")
+
+        assert second.trip is not first.trip
+        assert second.trip.name == "new"
+
+    def test_disabled(self):
+        """Test reuse can be turned off, which also skips hashing bodies."""
+        body = '{"id": 1, "uuid": "a"}'
+        client = PolarstepsClient(
+            remember_token="token",
+            transport=SequenceTransport((200, body)),
+            reuse_unchanged=False,
+        )
+        first = client.get_trip("1")
+        assert first.content_hash is None
+        expire(client, "1")
+        assert client.get_trip("1").trip is not first.trip
+
+    def test_content_hash(self):
+        """Test the hash is stable and content-sensitive."""
+        assert content_hash(b"abc") == content_hash(b"abc")
+        assert content_hash(b"abc") != content_hash(b"abd")
+
+
+class PagingTransport:
+    """Serves `alltrips` or `followers` slices according to offset and limit"""
+
+    def __init__(self, items, honour_paging=True, honour_offset=True):
+        self.items = items
+        self.honour_paging = honour_paging
+        self.honour_offset = honour_offset
+        self.urls = []
+
+    def request(self, method, url, **kwargs):
+        self.urls.append(url)
+        query = parse_qs(urlparse(url).query)
+        if not query:
+            user = {"id": 1, "uuid": "a", "username": "alice", "followers": self.items}
+            return RecordedResponse(200, {}, json.dumps(user))
+        field = query["fields"][0]
+        offset = int(query["offset"][0]) if self.honour_offset else 0
+        limit = int(query["limit"][0])
+        items = (
+            self.items[offset : offset + limit] if self.honour_paging else self.items
+        )
+        return RecordedResponse(200, {}, json.dumps({field: items}))
+
+
+def user_items(count):
+    return [{"id": i, "uuid": f"u{i}", "username": f"user{i}"} for i in range(count)]
+
+
+class TestPagination:
+    """Test cases for query parameters and lazy paging."""
+
+    def test_request_params(self):
+        """Test field selection and paging become query parameters."""
+        request = GetUserByUsernameRequest("alice", fields=["alltrips"], limit=10)
+        assert request.get_params() == {"fields": "alltrips", "limit": 10}
+        assert GetUserByUsernameRequest("alice").get_params() == {}
+
+    def test_iter_followers_pages_lazily(self):
+        """Test pages are only requested as far as the caller reads."""
+        transport = PagingTransport(user_items(5))
+        client = PolarstepsClient(remember_token="token", transport=transport)
+        followers = client.iter_followers("alice", page_size=2)
+        first = next(followers)
+        assert first.username == "user0"
+        assert len(transport.urls) == 1
+        assert "fields=followers" in transport.urls[0]
+        assert [user.id for user in followers] == [1, 2, 3, 4]
+        assert len(transport.urls) == 3
+
+    def test_iter_through_default_middleware(self, capsys):
+        """Test pages are not decoded as whole users by the pipeline."""
+        validated = []
+
+        class Recorder(ClientObserver):
+            def on_validation(self, event):
+                validated.append(event.model)
+
+        transport = PagingTransport(user_items(5))
+        client = PolarstepsClient(
+            remember_token="token",
+            transport=transport,
+            middleware=default_middleware(observers=[Recorder()]),
+        )
+        followers = list(client.iter_followers("alice", page_size=2))
+
+        assert [user.id for user in followers] == [0, 1, 2, 3, 4]
+        assert len(transport.urls) == 3
+        assert validated == []
+        assert "Failed to serialize" not in capsys.readouterr().out
+
+    def test_iter_stops_on_exact_multiple(self):
+        """Test an empty page ends iteration after full pages."""
+        transport = PagingTransport(user_items(4))
+        client = PolarstepsClient(remember_token="token", transport=transport)
+        assert len(list(client.iter_followers("alice", page_size=2))) == 4
+        assert len(transport.urls) == 3
+
+    def test_iter_server_ignores_paging(self):
+        """Test a server returning everything is read once, without repeats."""
+        transport = PagingTransport(user_items(5), honour_paging=False)
+        client = PolarstepsClient(remember_token="token", transport=transport)
+        assert [user.id for user in client.iter_followers("alice", page_size=2)] == [
+            0,
+            1,
+            2,
+            3,
+            4,
+        ]
+        assert len(transport.urls) == 1
+
+    def test_iter_server_ignores_offset(self):
+        """Test a repeated first page falls back to one full fetch."""
+        transport = PagingTransport(user_items(5), honour_offset=False)
+        client = PolarstepsClient(remember_token="token", transport=transport)
+        followers = client.iter_followers("alice", page_size=2)
+        assert [user.id for user in followers] == [0, 1, 2, 3, 4]
+        assert len(transport.urls) == 3
+        assert "?" not in transport.urls[-1]
+
+    def test_iter_uses_cached_user(self):
+        """Test a cached full profile is iterated without requests."""
+        transport = PagingTransport([])
+        client = PolarstepsClient(remember_token="token", transport=transport)
+        client._cache["alice"] = UserResponse(
+            data={
+                "id": 1,
+                "uuid": "a",
+                "username": "alice",
+                "followers": user_items(2),
+            },
+            status_code=200,
+            headers={},
+        )
+        assert [user.id for user in client.iter_followers("alice")] == [0, 1]
+        assert transport.urls == []
+
+    def test_iter_raises_on_error(self):
+        """Test an error response raises instead of ending silently."""
+        transport = SequenceTransport((404, '{"message": "not found"}'))
+        client = PolarstepsClient(remember_token="token", transport=transport)
+        with pytest.raises(RuntimeError, match="404"):
+            list(client.iter_user_trips("alice"))
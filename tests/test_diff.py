@@ -0,0 +1,141 @@
+"""Unit tests for the User/Trip diff engine."""
+
+import pytest
+
+from polarsteps_api.diff import Change, apply, diff
+from polarsteps_api.models.user import User
+
+
+def make_user(**overrides):
+    data = {
+        "id": 1,
+        "uuid": "u1",
+        "username": "alice",
+        "country_count": 3,
+        "stats": {
+            "continents": ["Europe"],
+            "country_codes": ["PT", "ES", "FR"],
+            "country_count": 3,
+            "furthest_place_from_home_country": None,
+            "furthest_place_from_home_km": None,
+            "furthest_place_from_home_location": None,
+            "km_count": 100.0,
+            "last_trip_end_date": None,
+            "like_count": 0,
+            "step_count": 1,
+            "time_traveled_in_seconds": 0,
+            "trip_count": 1,
+            "world_percentage": 0.01,
+        },
+        "followers": [
+            {"id": 2, "uuid": "u2", "username": "bob"},
+            {"id": 3, "uuid": "u3", "username": "carol"},
+        ],
+        "alltrips": [
+            {
+                "id": 10,
+                "uuid": "t10",
+                "name": "Iberia",
+                "all_steps": [
+                    {"id": 100, "uuid": "s100", "trip_id": 10, "name": "Lisbon"}
+                ],
+            }
+        ],
+    }
+    data.update(overrides)
+    return User.model_validate(data)
+
+
+class TestDiff:
+    """Test cases for diff and apply."""
+
+    def test_identical_snapshots(self):
+        """Test equal snapshots produce no changes."""
+        assert diff(make_user(), make_user()) == []
+
+    def test_changes(self):
+        """Test field, nested model and keyed list changes."""
+        old = make_user()
+        new_data = make_user().model_dump()
+        new_data["country_count"] = 4
+        new_data["stats"]["km_count"] = 250.0
+        new_data["followers"] = [
+            {"id": 3, "uuid": "u3", "username": "carol"},
+            {"id": 4, "uuid": "u4", "username": "dave"},
+        ]
+        new_data["alltrips"][0]["all_steps"][0]["name"] = "Lisboa"
+        new = User.model_validate(new_data)
+
+        changes = diff(old, new)
+        assert Change("set", ("country_count",), 4) in changes
+        assert Change("set", ("stats", "km_count"), 250.0) in changes
+        assert (
+            Change(
+                "set",
+                ("alltrips", ("id", 10), "all_steps", ("id", 100), "name"),
+                "Lisboa",
+            )
+            in changes
+        )
+        added = [c for c in changes if c.op == "add"]
+        assert [(c.path, c.value.username) for c in added] == [
+            (("followers", ("id", 4)), "dave")
+        ]
+        assert Change("remove", ("followers", ("id", 2))) in changes
+        assert len(changes) == 5
+
+    def test_reordering_is_one_change(self):
+        """Test a reordered list is reported once, as its new key order."""
+        old = make_user()
+        new = make_user(followers=list(reversed(old.model_dump()["followers"])))
+        assert diff(old, new) == [
+            Change("order", ("followers",), [("id", 3), ("id", 2)])
+        ]
+        assert apply(old, diff(old, new)) == new
+
+    def test_insert_mid_list(self):
+        """Test an item inserted between others keeps its position."""
+        old = make_user()
+        new_data = old.model_dump()
+        new_data["alltrips"][0]["all_steps"] = [
+            {"id": 100, "uuid": "s100", "trip_id": 10, "name": "Lisbon"},
+            {"id": 101, "uuid": "s101", "trip_id": 10, "name": "Sintra"},
+            {"id": 102, "uuid": "s102", "trip_id": 10, "name": "Porto"},
+        ]
+        middle = User.model_validate(new_data)
+        del new_data["alltrips"][0]["all_steps"][1]
+        outer = User.model_validate(new_data)
+
+        changes = diff(outer, middle)
+        assert [(c.op, c.index) for c in changes] == [("add", 1)]
+        patched = apply(outer, changes)
+        assert [s.id for s in patched.alltrips[0].all_steps] == [100, 101, 102]
+        assert patched == middle
+
+    def test_apply_round_trip(self):
+        """Test applying a diff reproduces the new snapshot without mutating."""
+        old = make_user()
+        new_data = make_user().model_dump()
+        new_data["stats"]["km_count"] = 999.0
+        new_data["followers"].append({"id": 5, "uuid": "u5", "username": "erin"})
+        new_data["alltrips"][0]["all_steps"][0]["name"] = "Porto"
+        new = User.model_validate(new_data)
+
+        patched = apply(old, diff(old, new))
+        assert patched == new
+        assert old == make_user()
+        # Untouched subtrees are shared, not copied
+        assert patched.followers[0] is old.followers[0]
+
+    def test_unkeyed_lists_are_replaced(self):
+        """Test lists without ids are diffed as a whole."""
+        old = make_user(saved_spots=[{"name": "a"}])
+        new = make_user(saved_spots=[{"name": "b"}])
+        assert diff(old, new) == [Change("set", ("saved_spots",), [{"name": "b"}])]
+
+    def test_apply_errors(self):
+        """Test unknown operations and missing items are reported."""
+        with pytest.raises(ValueError, match="Unknown change operation"):
+            apply(make_user(), [Change("move", ("followers", ("id", 2)))])
+        with pytest.raises(KeyError):
+            apply(make_user(), [Change("set", ("followers", ("id", 9), "username"))])
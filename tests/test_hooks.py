@@ -0,0 +1,207 @@
+"""Unit tests for client instrumentation hooks and the metrics collector."""
+
+import json
+import threading
+
+from polarsteps_api.client import PolarstepsClient
+from polarsteps_api.hooks import (
+    CacheEvent,
+    ClientObserver,
+    Histogram,
+    MetricsCollector,
+    ObservedTTLCache,
+    RequestEnd,
+)
+from polarsteps_api.transport import ReplayTransport
+
+
+class RecordingObserver(ClientObserver):
+    def __init__(self):
+        self.events = []
+
+    def on_request_start(self, event):
+        self.events.append(("start", event))
+
+    def on_request_end(self, event):
+        self.events.append(("end", event))
+
+    def on_validation(self, event):
+        self.events.append(("validation", event))
+
+    def on_cache(self, event):
+        self.events.append(("cache", event))
+
+
+def replay_client(observers):
+    record = {
+        "request": {"method": "GET", "url": "https://api.polarsteps.com/trips/1"},
+        "response": {
+            "status_code": 200,
+            "headers": {},
+            "body": json.dumps({"id": 1, "uuid": "trip-1"}),
+        },
+    }
+    return PolarstepsClient(
+        remember_token="test_token",
+        transport=ReplayTransport([record]),
+        observers=observers,
+    )
+
+
+class TestClientEvents:
+    """Test the events emitted by PolarstepsClient and HTTPClient."""
+
+    def test_event_sequence(self):
+        """Test a miss then a hit emit request, validation and cache events."""
+        observer = RecordingObserver()
+        client = replay_client([observer])
+
+        client.get_trip("1")
+        client.get_trip("1")
+
+        kinds = [kind for kind, _ in observer.events]
+        assert kinds == ["cache", "start", "end", "validation", "cache"]
+        assert observer.events[0][1] == CacheEvent("miss", "1")
+        end = observer.events[2][1]
+        assert end.request == "GetTripRequest"
+        assert end.status_code == 200
+        assert end.response_bytes == len(json.dumps({"id": 1, "uuid": "trip-1"}))
+        assert end.json_decode_seconds >= 0
+        assert observer.events[3][1].model == "Trip"
+        assert observer.events[3][1].success is True
+        assert observer.events[4][1] == CacheEvent("hit", "1")
+
+    def test_connection_error_event(self):
+        """Test failed requests still emit an end event with the error."""
+        observer = RecordingObserver()
+        client = PolarstepsClient(
+            remember_token="test_token",
+            transport=ReplayTransport([]),
+            observers=[observer],
+        )
+
+        client.get_trip("missing")
+
+        end = next(event for kind, event in observer.events if kind == "end")
+        assert end.status_code == 0
+        assert "No recorded response" in end.error
+
+    def test_add_observer_and_failing_observer(self):
+        """Test observers added later are used and errors never break requests."""
+
+        class Broken(ClientObserver):
+            def on_request_end(self, event):
+                raise RuntimeError("boom")
+
+        observer = RecordingObserver()
+        client = replay_client([Broken()])
+        client.add_observer(observer)
+
+        assert client.get_trip("1").trip is not None
+        assert any(kind == "end" for kind, _ in observer.events)
+
+
+class TestObservedTTLCache:
+    """Test eviction reporting in ObservedTTLCache."""
+
+    def test_eviction_and_expiry(self):
+        """Test size evictions and TTL expiries are reported."""
+        now = [0.0]
+        observer = RecordingObserver()
+        cache = ObservedTTLCache(
+            maxsize=1, ttl=10, observers=[observer], timer=lambda: now[0]
+        )
+
+        cache["a"] = 1
+        cache["b"] = 2
+        now[0] = 20.0
+        cache.expire()
+
+        events = [event for _, event in observer.events]
+        assert events == [CacheEvent("eviction", "a"), CacheEvent("expiry", "b")]
+
+    def test_concurrent_access(self):
+        """Test writers and readers on several threads keep the cache consistent."""
+        observer = RecordingObserver()
+        cache = ObservedTTLCache(maxsize=8, ttl=60, observers=[observer])
+        errors = []
+
+        def work(worker):
+            try:
+                for i in range(2_000):
+                    key = f"{worker}-{i % 16}"
+                    cache[key] = i
+                    cache.get(key)
+                    cache.pop(f"{worker}-{(i + 8) % 16}", None)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert len(cache) <= 8
+        assert cache.currsize == len(cache)
+
+
+class TestMetricsCollector:
+    """Test the in-memory collector and Prometheus exporter."""
+
+    def test_collects_client_metrics(self):
+        """Test a client run fills histograms and counters."""
+        metrics = MetricsCollector()
+        client = replay_client([metrics])
+
+        client.get_trip("1")
+        client.get_trip("1")
+
+        labels = {"request": "GetTripRequest", "status": "200"}
+        assert metrics.counter("requests", **labels) == 1
+        assert metrics.histogram("request_duration_seconds", **labels).count == 1
+        assert metrics.histogram("validation_seconds", model="Trip").count == 1
+        assert metrics.counter("cache_events", event="hit") == 1
+        assert metrics.counter("cache_events", event="miss") == 1
+
+    def test_prometheus_format(self):
+        """Test the exporter renders counters and cumulative buckets."""
+        metrics = MetricsCollector()
+        metrics.on_request_end(
+            RequestEnd(
+                request="GetTripRequest",
+                method="GET",
+                url="https://api.polarsteps.com/trips/1",
+                status_code=200,
+                total_seconds=0.03,
+                response_bytes=2048,
+            )
+        )
+
+        text = metrics.to_prometheus()
+
+        assert "# TYPE polarsteps_requests_total counter" in text
+        assert (
+            'polarsteps_requests_total{request="GetTripRequest",status="200"} 1' in text
+        )
+        assert "# TYPE polarsteps_request_duration_seconds histogram" in text
+        assert (
+            'polarsteps_request_duration_seconds_bucket{request="GetTripRequest",'
+            'status="200",le="0.05"} 1' in text
+        )
+        assert (
+            'polarsteps_request_duration_seconds_bucket{request="GetTripRequest",'
+            'status="200",le="+Inf"} 1' in text
+        )
+        assert 'polarsteps_response_bytes_count{request="GetTripRequest"} 1' in text
+
+    def test_histogram_quantile(self):
+        """Test quantiles resolve to bucket upper bounds."""
+        histogram = Histogram(buckets=(1, 2, 3))
+        for value in (0.5, 1.5, 2.5, 10):
+            histogram.observe(value)
+
+        assert histogram.quantile(0.5) == 2
+        assert histogram.quantile(1.0) == float("inf")
+        assert Histogram().quantile(0.5) is None
@@ -0,0 +1,54 @@
+"""Tests for lazy package imports."""
+
+import subprocess
+import sys
+
+import pytest
+
+import polarsteps_api
+from polarsteps_api import models
+
+
+def imported_modules(code: str) -> set[str]:
+    """Modules loaded by `code` in a fresh interpreter"""
+    output = subprocess.run(
+        [sys.executable, "-c", f"{code}\nimport sys\nprint(*sys.modules)"],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return set(output.split())
+
+
+class TestLazyImports:
+    """Test that importing the package defers heavy dependencies."""
+
+    def test_package_import_is_lazy(self):
+        """Test `import polarsteps_api` loads neither pydantic nor requests."""
+        modules = imported_modules("import polarsteps_api")
+
+        assert "pydantic" not in modules
+        assert "requests" not in modules
+        assert "polarsteps_api.client" not in modules
+
+    def test_models_import_skips_client(self):
+        """Test importing a model does not pull in the HTTP stack or dotenv."""
+        modules = imported_modules("from polarsteps_api.models import Trip")
+
+        assert "polarsteps_api.models.trip" in modules
+        assert "requests" not in modules
+        assert "dotenv" not in modules
+
+    def test_lazy_attributes_resolve(self):
+        """Test lazily exported names resolve to the real objects."""
+        from polarsteps_api.client import PolarstepsClient
+        from polarsteps_api.models.trip import Trip
+
+        assert polarsteps_api.PolarstepsClient is PolarstepsClient
+        assert models.Trip is Trip
+        assert set(models.__all__) <= set(dir(models))
+
+    def test_unknown_attribute(self):
+        """Test unknown names still raise AttributeError."""
+        with pytest.raises(AttributeError, match="DoesNotExist"):
+            models.DoesNotExist  # noqa: B018
@@ -0,0 +1,201 @@
+"""Unit tests for media manifests and the downloader."""
+
+import os
+
+import pytest
+import requests
+
+from polarsteps_api.media import MediaAsset, MediaDownloader, build_manifest
+from polarsteps_api.models.trip import Trip
+
+
+def make_trip():
+    return Trip(
+        id=1,
+        uuid="trip-1",
+        cover_photo={
+            "id": 9,
+            "uuid": "cover",
+            "path": "https://cdn.test/cover.jpg",
+            "large_thumbnail_path": "https://cdn.test/cover_large.jpg",
+        },
+        all_steps=[
+            {
+                "id": 10,
+                "uuid": "s10",
+                "trip_id": 1,
+                "media": [
+                    {
+                        "id": 1,
+                        "uuid": "m1",
+                        "type": 0,
+                        "path": "https://cdn.test/m1.jpg",
+                        "large_thumbnail_path": "https://cdn.test/m1_l.png",
+                    },
+                    {
+                        "id": 2,
+                        "uuid": "m2",
+                        "type": 0,
+                        "path": "https://cdn.test/m2.jpg",
+                        "is_deleted": True,
+                    },
+                    {
+                        "id": 3,
+                        "uuid": "m3",
+                        "type": 0,
+                        "path": "https://cdn.test/m3.mp4",
+                        "full_res_unavailable": True,
+                    },
+                ],
+            },
+            {
+                "id": 11,
+                "uuid": "s11",
+                "trip_id": 1,
+                "media": [
+                    {
+                        "id": 1,
+                        "uuid": "m1",
+                        "type": 0,
+                        "path": "https://cdn.test/m1.jpg",
+                    }
+                ],
+            },
+        ],
+    )
+
+
+class FakeResponse:
+    def __init__(self, status_code, body=b""):
+        self.status_code = status_code
+        self.body = body
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def iter_content(self, chunk_size):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start : start + chunk_size]
+
+
+class FakeSession:
+    """Serves `files` by URL, honouring Range requests"""
+
+    def __init__(self, files, ranges=True):
+        self.files = files
+        self.ranges = ranges
+        self.requests = []
+
+    def get(self, url, headers=None, stream=False, timeout=None):
+        headers = headers or {}
+        self.requests.append((url, headers))
+        if url not in self.files:
+            return FakeResponse(404)
+        body = self.files[url]
+        if self.ranges and "Range" in headers:
+            start = int(headers["Range"][len("bytes=") : -1])
+            if start >= len(body):
+                return FakeResponse(416)
+            return FakeResponse(206, body[start:])
+        return FakeResponse(200, body)
+
+
+class TestBuildManifest:
+    """Test cases for build_manifest."""
+
+    def test_dedup_and_skips(self):
+        """Test media is deduplicated by uuid and deleted items are skipped."""
+        manifest = build_manifest([make_trip()])
+
+        assert [asset.uuid for asset in manifest] == ["cover", "m1", "m3"]
+        assert manifest[1].url == "https://cdn.test/m1_l.png"
+        assert manifest[1].filename == "m1.png"
+        assert manifest[1].step_id == 10
+
+    def test_original_skips_unavailable(self):
+        """Test the original variant skips full_res_unavailable items."""
+        manifest = build_manifest([make_trip()], variant="original")
+
+        assert [asset.uuid for asset in manifest] == ["cover", "m1"]
+        assert manifest[1].url == "https://cdn.test/m1.jpg"
+
+    def test_unknown_variant(self):
+        """Test an unknown variant is rejected."""
+        with pytest.raises(ValueError, match="Unknown variant"):
+            build_manifest([make_trip()], variant="huge")
+
+
+class TestMediaDownloader:
+    """Test cases for MediaDownloader."""
+
+    def test_download_and_skip_existing(self, tmp_path):
+        """Test assets are written and existing files are not fetched again."""
+        session = FakeSession({"https://cdn.test/a.jpg": b"x" * 100})
+        downloader = MediaDownloader(str(tmp_path), chunk_size=16, session=session)
+        asset = MediaAsset("a", "https://cdn.test/a.jpg", "a.jpg")
+
+        (result,) = downloader.download([asset])
+        assert result.status == "downloaded"
+        assert result.bytes_written == 100
+        assert (tmp_path / "a.jpg").read_bytes() == b"x" * 100
+        assert not os.path.exists(str(tmp_path / "a.jpg.part"))
+
+        (result,) = downloader.download([asset])
+        assert result.status == "exists"
+        assert len(session.requests) == 1
+
+    def test_resume_partial_download(self, tmp_path):
+        """Test a .part file is resumed with a Range request."""
+        body = bytes(range(200))
+        session = FakeSession({"https://cdn.test/a.jpg": body})
+        (tmp_path / "a.jpg.part").write_bytes(body[:50])
+        downloader = MediaDownloader(str(tmp_path), session=session)
+
+        (result,) = downloader.download(
+            [MediaAsset("a", "https://cdn.test/a.jpg", "a.jpg")]
+        )
+        assert result.status == "resumed"
+        assert result.bytes_written == 150
+        assert session.requests[0][1] == {"Range": "bytes=50-"}
+        assert (tmp_path / "a.jpg").read_bytes() == body
+
+    def test_range_ignored_restarts(self, tmp_path):
+        """Test a full 200 response overwrites the stale part file."""
+        body = b"fresh content"
+        session = FakeSession({"https://cdn.test/a.jpg": body}, ranges=False)
+        (tmp_path / "a.jpg.part").write_bytes(b"stale")
+        downloader = MediaDownloader(str(tmp_path), session=session)
+
+        (result,) = downloader.download(
+            [MediaAsset("a", "https://cdn.test/a.jpg", "a.jpg")]
+        )
+        assert result.status == "downloaded"
+        assert (tmp_path / "a.jpg").read_bytes() == body
+
+    def test_failures_are_reported(self, tmp_path):
+        """Test HTTP and connection errors become failed results."""
+
+        class BrokenSession(FakeSession):
+            def get(self, url, **kwargs):
+                if url.endswith("down.jpg"):
+                    raise requests.ConnectionError("Connection reset")
+                return super().get(url, **kwargs)
+
+        downloader = MediaDownloader(str(tmp_path), session=BrokenSession({}))
+        results = downloader.download(
+            [
+                MediaAsset("a", "https://cdn.test/missing.jpg", "a.jpg"),
+                MediaAsset("b", "https://cdn.test/down.jpg", "b.jpg"),
+            ]
+        )
+        assert [result.status for result in results] == ["failed", "failed"]
+        assert results[0].error == "HTTP 404"
+        assert "Connection reset" in results[1].error
+
+    def test_session_has_no_cookie(self, tmp_path):
+        """Test the default session does not carry the remember token."""
+        downloader = MediaDownloader(str(tmp_path))
+        assert "Cookie" not in downloader.session.headers
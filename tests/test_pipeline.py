@@ -0,0 +1,354 @@
+"""Unit tests for the middleware request pipeline."""
+
+import threading
+import time
+
+import requests
+
+from polarsteps_api.breaker import CircuitBreaker
+from polarsteps_api.client import PolarstepsClient
+from polarsteps_api.hooks import ClientObserver, MetricsCollector
+from polarsteps_api.models.base import BaseRequest, BaseResponse
+from polarsteps_api.models.request import GetTripRequest, GetUserByUsernameRequest
+from polarsteps_api.models.response import TripResponse
+from polarsteps_api.pipeline import (
+    CacheMiddleware,
+    CoalesceMiddleware,
+    DecodeMiddleware,
+    MetricsMiddleware,
+    Middleware,
+    RequestPipeline,
+    RetryMiddleware,
+    default_middleware,
+)
+from polarsteps_api.search import SearchIndex
+from polarsteps_api.transport import RecordedResponse
+
+TRIP_BODY = '{"id": 1, "uuid": "a", "name": "Lisbon"}'
+
+
+class FakeHTTPClient:
+    """Serves the given (status, body) pairs in order, repeating the last one"""
+
+    def __init__(self, *responses, delay=0.0):
+        self.responses = list(responses) or [(200, TRIP_BODY)]
+        self.delay = delay
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def execute(self, request):
+        with self._lock:
+            status, body = self.responses[min(self.calls, len(self.responses) - 1)]
+            self.calls += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return BaseResponse(
+            data=RecordedResponse(status, {}, body).json() if body else None,
+            status_code=status,
+            headers={},
+        )
+
+
+class GetSummaryRequest(BaseRequest):
+    """An endpoint with no hand-written client method"""
+
+    cache_ttl = 0.05
+
+    def __init__(self, trip_id):
+        super().__init__()
+        self.trip_id = trip_id
+
+    def get_endpoint(self):
+        return f"/trips/{self.trip_id}/summary"
+
+    def get_method(self):
+        return "GET"
+
+    def cache_key(self):
+        return self.trip_id
+
+
+class RetryRecorder(ClientObserver):
+    def __init__(self):
+        self.events = []
+
+    def on_retry(self, event):
+        self.events.append(event)
+
+
+class EventRecorder(ClientObserver):
+    def __init__(self):
+        self.events = []
+
+    def on_validation(self, event):
+        self.events.append(("validation", event.model, event.success))
+
+    def on_parsed(self, event):
+        self.events.append(("parsed", event.key))
+
+    def on_cache(self, event):
+        self.events.append(("cache", event.kind, event.key))
+
+
+class CountingTransport:
+    """Serves the given (status, body) pairs in order, repeating the last one"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses) or [(200, TRIP_BODY)]
+        self.urls = []
+
+    def request(self, method, url, **kwargs):
+        status, body = self.responses[min(len(self.urls), len(self.responses) - 1)]
+        self.urls.append(url)
+        return RecordedResponse(status, {}, body)
+
+
+class TestRequestPipeline:
+    """Test cases for RequestPipeline and its middleware."""
+
+    def test_order(self):
+        """Test the first middleware sees the request first."""
+        seen = []
+
+        class Tag(Middleware):
+            def __init__(self, name):
+                self.name = name
+
+            def handle(self, request, call_next):
+                seen.append(self.name)
+                return call_next(request)
+
+        pipeline = RequestPipeline(FakeHTTPClient(), [Tag("outer"), Tag("inner")])
+        pipeline.execute(GetTripRequest("1"))
+        assert seen == ["outer", "inner"]
+
+    def test_delegates_attributes(self):
+        """Test the pipeline stands in for the wrapped HTTPClient."""
+        http = FakeHTTPClient()
+        assert RequestPipeline(http).responses is http.responses
+
+    def test_cache_uses_request_metadata(self):
+        """Test responses are cached by key and expire after the request's TTL."""
+        http = FakeHTTPClient()
+        pipeline = RequestPipeline(http, [CacheMiddleware(ttl=60)])
+        pipeline.execute(GetSummaryRequest("1"))
+        pipeline.execute(GetSummaryRequest("1"))
+        assert http.calls == 1
+        # Same key on another endpoint does not collide
+        pipeline.execute(GetTripRequest("1"))
+        assert http.calls == 2
+        time.sleep(0.06)
+        pipeline.execute(GetSummaryRequest("1"))
+        assert http.calls == 3
+
+    def test_cache_skips_errors_and_keyless(self):
+        """Test errors and requests without a key are never cached."""
+        http = FakeHTTPClient((500, ""), (200, TRIP_BODY))
+        pipeline = RequestPipeline(http, [CacheMiddleware()])
+        assert pipeline.execute(GetTripRequest("1")).status_code == 500
+        assert pipeline.execute(GetTripRequest("1")).status_code == 200
+        paged = GetUserByUsernameRequest("alice", limit=10)
+        pipeline.execute(paged)
+        pipeline.execute(paged)
+        assert http.calls == 4
+
+    def test_coalesce(self):
+        """Test concurrent callers with the same key share one request."""
+        http = FakeHTTPClient(delay=0.05)
+        pipeline = RequestPipeline(http, [CoalesceMiddleware()])
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(pipeline.execute(GetTripRequest("1")))
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert http.calls == 1
+        assert len(results) == 5
+        assert all(result is results[0] for result in results)
+
+    def test_retry(self):
+        """Test transient failures are retried with backoff and reported."""
+        http = FakeHTTPClient((503, ""), (0, ""), (200, TRIP_BODY))
+        recorder = RetryRecorder()
+        sleeps = []
+        retry = RetryMiddleware(
+            attempts=3, backoff=0.5, observers=[recorder], sleep=sleeps.append
+        )
+        response = RequestPipeline(http, [retry]).execute(GetTripRequest("1"))
+        assert response.status_code == 200
+        assert sleeps == [0.5, 1.0]
+        assert [event.attempt for event in recorder.events] == [1, 2]
+        assert recorder.events[0].reason == "status 503"
+
+    def test_retry_gives_up_and_honours_retry_after(self):
+        """Test retries stop after `attempts` and follow Retry-After."""
+        http = FakeHTTPClient((429, ""))
+        sleeps = []
+        retry = RetryMiddleware(attempts=2, sleep=sleeps.append)
+        response = BaseResponse(
+            data=None, status_code=429, headers={"retry-after": "3"}
+        )
+        assert retry.delay(1, response) == 3.0
+        result = RequestPipeline(http, [retry]).execute(GetTripRequest("1"))
+        assert result.status_code == 429
+        assert http.calls == 2
+        assert sleeps == [0.5]
+
+    def test_decode(self):
+        """Test raw responses are wrapped in the request's response model."""
+        pipeline = RequestPipeline(FakeHTTPClient(), [DecodeMiddleware()])
+        response = pipeline.execute(GetTripRequest("1"))
+        assert isinstance(response, TripResponse)
+        assert response.trip.name == "Lisbon"
+        assert type(pipeline.execute(GetSummaryRequest("1"))) is BaseResponse
+
+    def test_metrics(self):
+        """Test the metrics stage counts cache hits as well as fetches."""
+        collector = MetricsCollector()
+        pipeline = RequestPipeline(
+            FakeHTTPClient(), [MetricsMiddleware(collector), CacheMiddleware()]
+        )
+        pipeline.execute(GetTripRequest("1"))
+        pipeline.execute(GetTripRequest("1"))
+        labels = {"request": "GetTripRequest", "status": "200"}
+        assert collector.counter("pipeline_requests", **labels) == 2
+        histogram = collector.histogram(
+            "pipeline_duration_seconds", request="GetTripRequest"
+        )
+        assert histogram.count == 2
+
+    def test_default_middleware(self):
+        """Test the default stack caches decoded models."""
+        http = FakeHTTPClient()
+        pipeline = RequestPipeline(http, default_middleware())
+        first = pipeline.execute(GetTripRequest("1"))
+        assert isinstance(first, TripResponse)
+        assert pipeline.execute(GetTripRequest("1")) is first
+        assert http.calls == 1
+
+
+class TestClientPipeline:
+    """Test cases for running PolarstepsClient through a pipeline."""
+
+    def test_client_middleware(self):
+        """Test client requests go through the configured middleware."""
+        transport_calls = []
+
+        class Transport:
+            def request(self, method, url, **kwargs):
+                transport_calls.append(url)
+                status = 503 if len(transport_calls) == 1 else 200
+                return RecordedResponse(status, {}, TRIP_BODY)
+
+        client = PolarstepsClient(
+            remember_token="token",
+            transport=Transport(),
+            middleware=[RetryMiddleware(sleep=lambda _: None), DecodeMiddleware()],
+        )
+        response = client.get_trip("1")
+        assert response.trip.name == "Lisbon"
+        assert len(transport_calls) == 2
+        assert client.http_client.base_url == PolarstepsClient.base_url
+
+    def test_send(self):
+        """Test send() decodes and caches by the request's metadata."""
+        http = FakeHTTPClient()
+        client = PolarstepsClient(remember_token="token")
+        client.http_client = http
+        response = client.send(GetTripRequest("1"))
+        assert isinstance(response, TripResponse)
+        assert client.get_trip("1") is response
+        assert http.calls == 1
+        summary = client.send(GetSummaryRequest("1"))
+        assert type(summary) is BaseResponse
+        assert http.calls == 2
+
+    def test_default_middleware_keeps_client_features(self):
+        """Test the default stack leaves caching and decoding to the client."""
+        recorder = EventRecorder()
+        index = SearchIndex()
+        transport = CountingTransport()
+        client = PolarstepsClient(
+            remember_token="token",
+            transport=transport,
+            cache_ttl=1,
+            observers=[recorder, index],
+            middleware=default_middleware(observers=[recorder]),
+        )
+
+        first = client.get_trip("1")
+        assert [hit.id for hit in index.search("lisbon")] == [1]
+        assert recorder.events == [
+            ("cache", "miss", "1"),
+            ("validation", "Trip", True),
+            ("parsed", "1"),
+        ]
+
+        # The client's own TTL decides, not the pipeline's 300s cache
+        client._cache.clear()
+        recorder.events.clear()
+        second = client.get_trip("1")
+        assert len(transport.urls) == 2
+        # Same body again: the model is reused without validating
+        assert recorder.events == [("cache", "miss", "1"), ("cache", "unchanged", "1")]
+        assert second.trip is first.trip
+
+    def test_send_new_endpoint_uses_client_features(self):
+        """Test send() gives other endpoints negative caching and reuse."""
+        transport = CountingTransport((404, '{"error": "gone"}'), (200, TRIP_BODY))
+        client = PolarstepsClient(
+            remember_token="token",
+            transport=transport,
+            negative_ttl={404: 60},
+            middleware=default_middleware(),
+        )
+        assert client.send(GetSummaryRequest("1")).status_code == 404
+        assert client.send(GetSummaryRequest("1")).status_code == 404
+        assert len(transport.urls) == 1
+        # Keys are qualified by request class, so the trip is fetched separately
+        assert client.get_trip("1").status_code == 200
+        assert len(transport.urls) == 2
+
+    def test_open_breaker_is_not_retried(self):
+        """Test an open circuit breaker fails fast through the default stack."""
+        recorder = RetryRecorder()
+        transport = CountingTransport()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        breaker.record_failure()
+        client = PolarstepsClient(
+            remember_token="token",
+            transport=transport,
+            circuit_breaker=breaker,
+            middleware=default_middleware(observers=[recorder]),
+        )
+
+        started = time.perf_counter()
+        response = client.get_trip("1")
+        assert time.perf_counter() - started < 0.25
+        assert response.status_code == 0
+        assert "Circuit breaker open" in response.data["error"]
+        assert recorder.events == []
+        assert transport.urls == []
+
+    def test_connection_failures_still_retried(self):
+        """Test real connection errors stay retryable alongside a breaker."""
+        calls = []
+
+        class Down:
+            def request(self, method, url, **kwargs):
+                calls.append(url)
+                raise requests.ConnectionError("Connection refused")
+
+        client = PolarstepsClient(
+            remember_token="token",
+            transport=Down(),
+            circuit_breaker=CircuitBreaker(failure_threshold=5),
+            middleware=[RetryMiddleware(attempts=3, sleep=lambda _: None)],
+        )
+        assert client.get_trip("1").status_code == 0
+        assert len(calls) == 3
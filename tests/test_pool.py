@@ -0,0 +1,197 @@
+"""Unit tests for ClientPool and RateLimiter."""
+
+import json
+import threading
+import time
+
+import pytest
+
+from polarsteps_api.models.request import GetTripRequest
+from polarsteps_api.pool import ClientPool
+from polarsteps_api.ratelimit import RateLimiter
+from polarsteps_api.transport import RecordedResponse
+
+
+class FakeTransport:
+    """Serves trips from memory and logs which account asked for what"""
+
+    def __init__(self, account, log, visibility=0, delay=0.0):
+        self.account = account
+        self.log = log
+        self.visibility = visibility
+        self.delay = delay
+
+    def request(self, method, url, **kwargs):
+        time.sleep(self.delay)
+        trip_id = url.rsplit("/", 1)[-1]
+        self.log.append((self.account, trip_id))
+        body = f'{{"id": {trip_id}, "uuid": "trip-{trip_id}", "visibility": {self.visibility}}}'
+        return RecordedResponse(200, {}, body)
+
+
+class TestRateLimiter:
+    """Test cases for the token bucket."""
+
+    def test_burst_then_wait(self):
+        """Test bursts are allowed and refills follow the rate."""
+        now = [0.0]
+        limiter = RateLimiter(rate=2.0, burst=2, clock=lambda: now[0])
+
+        assert limiter.try_acquire() == 0
+        assert limiter.try_acquire() == 0
+        assert limiter.try_acquire() == pytest.approx(0.5)
+
+        now[0] = 0.5
+        assert limiter.try_acquire() == 0
+
+    def test_invalid_rate(self):
+        """Test non-positive rates are rejected."""
+        with pytest.raises(ValueError, match="Rate must be positive"):
+            RateLimiter(rate=0)
+
+    def test_unsatisfiable_burst(self):
+        """Test a burst too small to ever grant a request is rejected."""
+        with pytest.raises(ValueError, match="Burst"):
+            RateLimiter(rate=0.5, burst=0.5)
+        limiter = RateLimiter(rate=1.0, burst=2)
+        with pytest.raises(ValueError, match="Cannot acquire"):
+            limiter.acquire(3)
+
+
+class TestClientPool:
+    """Test cases for ClientPool."""
+
+    def test_round_robin_across_accounts(self):
+        """Test a backlog on one account does not starve another."""
+        log = []
+        release = threading.Event()
+
+        class Blocking(FakeTransport):
+            def request(self, method, url, **kwargs):
+                # Hold the only worker until every request is queued
+                release.wait(timeout=5)
+                return super().request(method, url, **kwargs)
+
+        with ClientPool(workers=1) as pool:
+            pool.add_account("busy", "token-a", transport=Blocking("busy", log))
+            pool.add_account("quiet", "token-b", transport=FakeTransport("quiet", log))
+            futures = [pool.submit("busy", GetTripRequest(str(i))) for i in range(5)]
+            futures += [pool.submit("quiet", GetTripRequest(str(i))) for i in (8, 9)]
+            release.set()
+            for future in futures:
+                assert future.result(timeout=5).status_code == 200
+
+        assert log == [
+            ("busy", "0"),
+            ("quiet", "8"),
+            ("busy", "1"),
+            ("quiet", "9"),
+            ("busy", "2"),
+            ("busy", "3"),
+            ("busy", "4"),
+        ]
+
+    def test_per_account_concurrency_limit(self):
+        """Test an account never exceeds its concurrency cap."""
+        log = []
+        active = []
+        peak = [0]
+        lock = threading.Lock()
+
+        class Tracking(FakeTransport):
+            def request(self, method, url, **kwargs):
+                with lock:
+                    active.append(1)
+                    peak[0] = max(peak[0], len(active))
+                try:
+                    return super().request(method, url, **kwargs)
+                finally:
+                    with lock:
+                        active.pop()
+
+        with ClientPool(workers=6) as pool:
+            pool.add_account(
+                "alice",
+                "token",
+                max_concurrency=2,
+                transport=Tracking("alice", log, delay=0.01),
+            )
+            futures = [pool.submit("alice", GetTripRequest(str(i))) for i in range(8)]
+            for future in futures:
+                future.result(timeout=5)
+
+        assert peak[0] <= 2
+        assert len(log) == 8
+
+    def test_shared_cache_for_public_data(self):
+        """Test public trips are fetched once for all accounts."""
+        log = []
+        with ClientPool(workers=2) as pool:
+            alice = pool.add_account(
+                "alice", "a", transport=FakeTransport("alice", log)
+            )
+            bob = pool.add_account("bob", "b", transport=FakeTransport("bob", log))
+
+            assert alice.get_trip("1").trip.id == 1
+            assert bob.get_trip("1").trip.id == 1
+
+        assert log == [("alice", "1")]
+
+    def test_private_data_stays_per_account(self):
+        """Test non-public trips are never served to other accounts."""
+        log = []
+        with ClientPool(workers=2) as pool:
+            alice = pool.add_account(
+                "alice", "a", transport=FakeTransport("alice", log, visibility=2)
+            )
+            bob = pool.add_account(
+                "bob", "b", transport=FakeTransport("bob", log, visibility=2)
+            )
+
+            alice.get_trip("1")
+            alice.get_trip("1")
+            bob.get_trip("1")
+
+        assert log == [("alice", "1"), ("bob", "1")]
+
+    def test_user_profiles_stay_per_account(self):
+        """Test an account's own public profile is never served to another."""
+        log = []
+
+        class Users(FakeTransport):
+            def request(self, method, url, **kwargs):
+                username = url.rsplit("/", 1)[-1]
+                self.log.append((self.account, username))
+                body = json.dumps(
+                    {
+                        "id": 1,
+                        "uuid": "u-1",
+                        "username": username,
+                        "visibility": 0,
+                        "follow_requests": [
+                            {"id": 2, "uuid": "u-2", "username": self.account}
+                        ],
+                    }
+                )
+                return RecordedResponse(200, {}, body)
+
+        with ClientPool(workers=2) as pool:
+            alice = pool.add_account("alice", "a", transport=Users("alice", log))
+            bob = pool.add_account("bob", "b", transport=Users("bob", log))
+
+            alice.get_user_by_username("alice")
+            seen_by_bob = bob.get_user_by_username("alice").user
+
+        assert log == [("alice", "alice"), ("bob", "alice")]
+        assert [u.username for u in seen_by_bob.follow_requests] == ["bob"]
+
+    def test_duplicate_account_and_closed_pool(self):
+        """Test registration and submission errors."""
+        pool = ClientPool(workers=1)
+        pool.add_account("alice", "a")
+        with pytest.raises(ValueError, match="already registered"):
+            pool.add_account("alice", "a")
+
+        pool.close()
+        with pytest.raises(RuntimeError, match="closed"):
+            pool.submit("alice", GetTripRequest("1"))
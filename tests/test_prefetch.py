@@ -0,0 +1,154 @@
+"""Unit tests for trip prefetching and cache warming."""
+
+import json
+import threading
+
+import pytest
+
+from polarsteps_api.client import PolarstepsClient
+from polarsteps_api.models.user import User
+from polarsteps_api.prefetch import Prefetcher, PrefetchPolicy
+from polarsteps_api.scheduler import Priority, RequestScheduler
+from polarsteps_api.transport import RecordedResponse
+
+TRIPS = [
+    {"id": 1, "uuid": "t1", "last_modified": 100, "views": 50},
+    {"id": 2, "uuid": "t2", "last_modified": 300, "views": 5},
+    {"id": 3, "uuid": "t3", "last_modified": 200, "views": 500},
+    {"id": 4, "uuid": "t4", "last_modified": 900, "views": 0, "is_deleted": True},
+]
+
+
+class FakeAPI:
+    """Serves one user with TRIPS and any trip by id"""
+
+    def __init__(self):
+        self.urls = []
+        self._lock = threading.Lock()
+
+    def request(self, method, url, **kwargs):
+        with self._lock:
+            self.urls.append(url)
+        if "/users/byusername/" in url:
+            body = {"id": 7, "uuid": "u7", "username": "alice", "alltrips": TRIPS}
+        else:
+            trip_id = int(url.rsplit("/", 1)[-1])
+            body = {"id": trip_id, "uuid": f"t{trip_id}"}
+        return RecordedResponse(200, {"Content-Length": "100"}, json.dumps(body))
+
+    def trip_calls(self):
+        return sorted(url.rsplit("/", 1)[-1] for url in self.urls if "/trips/" in url)
+
+
+class PriorityRecorder(RequestScheduler):
+    """Records the priority of every request it queues"""
+
+    def __init__(self, http_client):
+        super().__init__(http_client, workers=2)
+        self.seen = []
+
+    def submit(self, request, priority=Priority.DEFAULT, timeout=None):
+        self.seen.append((request.get_endpoint(), priority))
+        return super().submit(request, priority=priority, timeout=timeout)
+
+
+class TestPrefetchPolicy:
+    """Test cases for PrefetchPolicy."""
+
+    def test_select_by_last_modified(self):
+        """Test the most recently modified live trips are chosen."""
+        user = User(id=7, uuid="u7", username="alice", alltrips=TRIPS)
+        assert PrefetchPolicy(count=2).select(user) == ["2", "3"]
+
+    def test_select_by_views(self):
+        """Test ranking by views."""
+        user = User(id=7, uuid="u7", username="alice", alltrips=TRIPS)
+        assert PrefetchPolicy(count=2, rank_by="views").select(user) == ["3", "1"]
+
+    def test_unknown_ranking(self):
+        """Test an unknown ranking is rejected."""
+        client = PolarstepsClient(remember_token="token", transport=FakeAPI())
+        with pytest.raises(ValueError, match="Unknown ranking"):
+            Prefetcher(client, PrefetchPolicy(rank_by="likes"))
+
+
+class TestPrefetcher:
+    """Test cases for prefetching through PolarstepsClient."""
+
+    def test_user_fetch_prefetches_trips(self):
+        """Test fetching a user loads its top trips into the cache."""
+        api = FakeAPI()
+        client = PolarstepsClient(
+            remember_token="token", transport=api, prefetch=PrefetchPolicy(count=2)
+        )
+        client.get_user_by_username("alice")
+        client.close()
+
+        assert api.trip_calls() == ["2", "3"]
+        calls = len(api.urls)
+        assert client.get_trip("2").trip.id == 2
+        assert len(api.urls) == calls
+
+    def test_cached_trips_are_skipped(self):
+        """Test trips already in the cache are not fetched again."""
+        api = FakeAPI()
+        client = PolarstepsClient(
+            remember_token="token", transport=api, prefetch=PrefetchPolicy(count=2)
+        )
+        client.get_trip("2")
+        client.get_user_by_username("alice")
+        client.close()
+
+        assert api.trip_calls() == ["2", "3"]
+
+    def test_warm(self):
+        """Test warm fetches everything and reports status codes."""
+        api = FakeAPI()
+        client = PolarstepsClient(remember_token="token", transport=api)
+        result = client.warm(usernames=["alice"], trip_ids=[1, "5"])
+        client.close()
+
+        assert result == {"alice": 200, "1": 200, "5": 200}
+        assert api.trip_calls() == ["1", "5"]
+
+    def test_bandwidth_budget(self):
+        """Test responses are charged against the byte budget."""
+        api = FakeAPI()
+        client = PolarstepsClient(remember_token="token", transport=api)
+        prefetcher = Prefetcher(client, PrefetchPolicy(bandwidth=1_000))
+        prefetcher.warm(trip_ids=["1", "2"])
+        prefetcher.close()
+
+        assert prefetcher.limiter.try_acquire(900) > 0
+
+    def test_cache_hits_are_free(self):
+        """Test warming already cached keys does not spend the byte budget."""
+        api = FakeAPI()
+        client = PolarstepsClient(remember_token="token", transport=api)
+        client.get_trip("1")
+        client.get_trip("2")
+        prefetcher = Prefetcher(client, PrefetchPolicy(bandwidth=1_000))
+        prefetcher.warm(trip_ids=["1", "2"])
+        prefetcher.close()
+
+        assert prefetcher.limiter.try_acquire(1_000) == 0
+
+    def test_runs_at_background_priority(self):
+        """Test prefetches and warming reach the scheduler as BACKGROUND."""
+        client = PolarstepsClient(
+            remember_token="token",
+            transport=FakeAPI(),
+            prefetch=PrefetchPolicy(count=1),
+        )
+        scheduler = PriorityRecorder(client.http_client)
+        client.http_client = scheduler
+        client.get_user_by_username("alice")
+        client.warm(trip_ids=[1])
+        client.close()
+        scheduler.close()
+
+        assert scheduler.seen[0] == ("/users/byusername/alice", Priority.DEFAULT)
+        assert sorted(scheduler.seen[1:]) == [
+            ("/trips/1", Priority.BACKGROUND),
+            ("/trips/2", Priority.BACKGROUND),
+        ]
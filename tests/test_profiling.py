@@ -0,0 +1,119 @@
+"""Unit tests for the validation profiler."""
+
+import threading
+
+from pydantic import BaseModel, field_validator
+
+from benchmarks.generators import make_trip_data, make_user_data
+from polarsteps_api.models.response import TripResponse, UserResponse
+from polarsteps_api.models.trip import Trip
+from polarsteps_api.profiling import (
+    ValidationProfiler,
+    profile_validation,
+    profiled_validator,
+    validate_model,
+)
+
+
+class Checked(BaseModel):
+    """Runs `hook` from inside its validator"""
+
+    value: int
+
+    @field_validator("value")
+    @classmethod
+    @profiled_validator
+    def check(cls, v):
+        Checked.hook()
+        return v
+
+    @staticmethod
+    def hook():
+        pass
+
+
+class TestProfileValidation:
+    """Test cases for the profile_validation() context."""
+
+    def test_counts_nested_models_and_validators(self):
+        """Test instance counts per model class and validator calls."""
+        data = make_trip_data(step_count=3, media_per_step=2)
+
+        with profile_validation() as profiler:
+            response = TripResponse(data=data, status_code=200, headers={})
+
+        assert response.trip == Trip(**data)
+        assert profiler.parsed == 1
+        assert profiler.models["Trip"][0] == 1
+        assert profiler.models["Step"][0] == 3
+        assert profiler.models["MediaItem"][0] == 6
+        assert profiler.models["Location"][0] == 3
+        # Validators are only counted for the final, real validation
+        assert profiler.validators["Trip.validate_country_count"][0] == 1
+        assert profiler.validators["Trip.validate_timestamps"][0] == 4
+
+    def test_user_graph(self):
+        """Test nested users and trips are attributed separately."""
+        data = make_user_data(trip_count=2, follower_count=3)
+
+        with profile_validation() as profiler:
+            UserResponse(data=data, status_code=200, headers={})
+
+        assert profiler.models["User"][0] == 1 + 3 + 1
+        assert profiler.models["Trip"][0] == 2
+        assert profiler.models["Stats"][0] == 1
+
+    def test_inactive_outside_context(self):
+        """Test nothing is recorded once the context exits."""
+        profiler = ValidationProfiler()
+        with profile_validation(profiler):
+            validate_model(Trip, {"id": 1, "uuid": "trip-1"})
+        validate_model(Trip, {"id": 2, "uuid": "trip-2"})
+
+        assert profiler.parsed == 1
+
+    def test_invalid_payload_still_raises(self):
+        """Test validation errors propagate to the response handling."""
+        with profile_validation() as profiler:
+            response = TripResponse(data={"id": "x"}, status_code=200, headers={})
+
+        assert response.trip is None
+        assert profiler.models["Trip"][0] == 1
+
+    def test_report_is_ranked(self):
+        """Test the report lists every model and validator, slowest first."""
+        with profile_validation() as profiler:
+            validate_model(Trip, make_trip_data(step_count=2))
+
+        report = profiler.report()
+        lines = report.splitlines()
+
+        assert lines[0].startswith("1 payloads parsed")
+        assert "Trip.validate_country_count" in report
+        totals = [float(line.split()[3]) for line in lines[2:]]
+        assert totals == sorted(totals, reverse=True)
+        assert len(profiler.report(limit=1).splitlines()) == 3
+
+    def test_recording_is_per_thread(self):
+        """Test one thread's real validation does not record another's validators."""
+        profiler = ValidationProfiler()
+
+        def measure_elsewhere():
+            # Stands in for a measuring pass on another thread sharing the profiler
+            with profile_validation(profiler):
+                profiler.record_validator("Other.check", 1.0)
+
+        def hook():
+            thread = threading.Thread(target=measure_elsewhere)
+            thread.start()
+            thread.join()
+
+        Checked.hook = staticmethod(hook)
+        try:
+            with profile_validation(profiler):
+                validate_model(Checked, {"value": 1})
+        finally:
+            Checked.hook = staticmethod(lambda: None)
+
+        assert "Other.check" not in profiler.validators
+        assert profiler.validators["Checked.check"][0] == 1
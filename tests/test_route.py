@@ -0,0 +1,136 @@
+"""Unit tests for route reconstruction and simplification."""
+
+import pytest
+
+from polarsteps_api.models.trip import Trip
+from polarsteps_api.route import (
+    RouteRenderer,
+    build_route,
+    decode_polyline,
+    encode_polyline,
+    segment_points,
+    simplify,
+    to_geojson,
+    zoom_tolerance,
+)
+
+
+def make_trip(route_segments=None, last_modified=1.0):
+    steps = [
+        (1, 30.0, 38.0, -9.0),
+        (2, 10.0, 40.0, -4.0),
+        (3, 20.0, 39.0, -6.0),
+        (4, 40.0, 0.0, 0.0),
+    ]
+    return Trip(
+        id=1,
+        uuid="t1",
+        last_modified=last_modified,
+        all_steps=[
+            {
+                "id": step_id,
+                "uuid": f"s{step_id}",
+                "trip_id": 1,
+                "start_time": start,
+                "location": {"lat": lat, "lon": lon},
+                "is_deleted": step_id == 4,
+            }
+            for step_id, start, lat, lon in steps
+        ],
+        route_segments=route_segments or [],
+    )
+
+
+class TestPolyline:
+    """Test cases for polyline encoding."""
+
+    def test_known_encoding(self):
+        """Test the reference example from the polyline format documentation."""
+        points = [(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)]
+        encoded = encode_polyline(points)
+
+        assert encoded == "_p~iF~ps|U_ulLnnqC_mqNvxq`@"
+        assert decode_polyline(encoded) == points
+
+
+class TestBuildRoute:
+    """Test cases for build_route."""
+
+    def test_steps_in_time_order(self):
+        """Test live steps are ordered by start time."""
+        assert build_route(make_trip()) == [(40.0, -4.0), (39.0, -6.0), (38.0, -9.0)]
+
+    def test_segments_are_spliced(self):
+        """Test segments follow their anchor step or the nearest step."""
+        trip = make_trip(
+            [
+                {"start_step_id": 2, "path": [[39.8, -4.5], [39.4, -5.5]]},
+                {"points": [{"lat": 38.5, "lon": -7.0}]},
+                {"polyline": encode_polyline([(37.0, -9.5)])},
+                {"unrelated": True},
+            ]
+        )
+        assert build_route(trip) == [
+            (40.0, -4.0),
+            (39.8, -4.5),
+            (39.4, -5.5),
+            (39.0, -6.0),
+            (38.5, -7.0),
+            (38.0, -9.0),
+            (37.0, -9.5),
+        ]
+
+    def test_geojson_coordinates_are_lon_lat(self):
+        """Test segments holding GeoJSON coordinates round-trip to_geojson()."""
+        points = [(38.72, -9.14), (40.42, -3.70)]
+        coordinates = to_geojson(points)["geometry"]["coordinates"]
+
+        assert segment_points({"coordinates": coordinates}) == points
+        assert segment_points({"path": [list(p) for p in points]}) == points
+
+
+class TestSimplify:
+    """Test cases for simplify."""
+
+    def test_collinear_points_removed(self):
+        """Test points on a straight line are dropped."""
+        points = [(0.0, float(lon)) for lon in range(10)]
+        assert simplify(points, zoom_tolerance(10)) == [(0.0, 0.0), (0.0, 9.0)]
+
+    def test_zoom_controls_detail(self):
+        """Test higher zoom levels keep more points."""
+        points = [(0.001 * (i % 2), 0.01 * i) for i in range(100)]
+        coarse = simplify(points, zoom_tolerance(4))
+        fine = simplify(points, zoom_tolerance(18))
+
+        assert len(coarse) == 2
+        assert len(fine) == 100
+        assert coarse[0] == points[0] and coarse[-1] == points[-1]
+
+
+class TestRouteRenderer:
+    """Test cases for RouteRenderer."""
+
+    def test_outputs_and_cache(self):
+        """Test GeoJSON/polyline output and caching per last_modified."""
+        renderer = RouteRenderer()
+        trip = make_trip()
+
+        feature = renderer.geojson(trip, zoom=12)
+        assert feature["geometry"]["coordinates"][0] == [-4.0, 40.0]
+        assert feature["properties"] == {"trip_id": 1, "zoom": 12}
+        assert decode_polyline(renderer.polyline(trip, 12)) == renderer.points(trip, 12)
+        assert renderer.points(trip, 12) is renderer.points(trip, 12)
+
+        updated = make_trip(last_modified=2.0)
+        assert renderer.points(updated, 12) is not renderer.points(trip, 12)
+
+    def test_geojson_properties(self):
+        """Test to_geojson swaps to (lon, lat)."""
+        assert to_geojson([(1.0, 2.0)])["geometry"]["coordinates"] == [[2.0, 1.0]]
+
+
+@pytest.mark.parametrize("zoom", [-1, 0, 30])
+def test_zoom_tolerance_is_clamped(zoom):
+    """Test out-of-range zoom levels are clamped."""
+    assert zoom_tolerance(zoom) > 0
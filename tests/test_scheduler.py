@@ -0,0 +1,162 @@
+"""Unit tests for the request scheduler."""
+
+import threading
+import time
+
+import pytest
+
+from polarsteps_api.client import PolarstepsClient
+from polarsteps_api.models.request import GetTripRequest
+from polarsteps_api.scheduler import Priority, RequestScheduler, request_priority
+from polarsteps_api.transport import RecordedResponse
+
+
+class FakeHTTPClient:
+    """Records the order requests are executed in, optionally blocking"""
+
+    def __init__(self, release=None):
+        self.log = []
+        self.release = release
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def execute(self, request):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        if self.release is not None:
+            self.release.wait(timeout=5)
+        with self._lock:
+            self.log.append(request.trip_id)
+            self.active -= 1
+        return RecordedResponse(200, {}, "{}")
+
+
+class TestRequestScheduler:
+    """Test cases for RequestScheduler."""
+
+    def test_higher_priority_runs_first(self):
+        """Test queued interactive requests overtake background ones."""
+        release = threading.Event()
+        http = FakeHTTPClient(release)
+        scheduler = RequestScheduler(http, workers=1)
+        try:
+            blocker = scheduler.submit(GetTripRequest("0"), Priority.BACKGROUND)
+            while http.active == 0:
+                time.sleep(0.001)
+            futures = [
+                scheduler.submit(GetTripRequest(str(i)), Priority.BACKGROUND)
+                for i in (1, 2)
+            ]
+            futures.append(scheduler.submit(GetTripRequest("9"), Priority.INTERACTIVE))
+            release.set()
+            for future in [blocker, *futures]:
+                future.result(timeout=5)
+        finally:
+            scheduler.close()
+
+        assert http.log == ["0", "9", "1", "2"]
+
+    def test_expired_request_is_not_sent(self):
+        """Test requests whose deadline passed while queued fail fast."""
+        release = threading.Event()
+        http = FakeHTTPClient(release)
+        scheduler = RequestScheduler(http, workers=1)
+        try:
+            blocker = scheduler.submit(GetTripRequest("0"))
+            late = scheduler.submit(GetTripRequest("1"), timeout=0.01)
+            time.sleep(0.05)
+            release.set()
+            blocker.result(timeout=5)
+            response = late.result(timeout=5)
+        finally:
+            scheduler.close()
+
+        assert response.status_code == 0
+        assert "Deadline exceeded" in response.data["error"]
+        assert http.log == ["0"]
+        assert scheduler.dropped[Priority.DEFAULT] == 1
+
+    def test_in_flight_cap_per_class(self):
+        """Test a class never exceeds its in-flight cap."""
+        http = FakeHTTPClient()
+        original = http.execute
+
+        def slow(request):
+            time.sleep(0.01)
+            return original(request)
+
+        http.execute = slow
+        scheduler = RequestScheduler(
+            http, workers=4, max_in_flight={Priority.BACKGROUND: 1}
+        )
+        try:
+            futures = [
+                scheduler.submit(GetTripRequest(str(i)), Priority.BACKGROUND)
+                for i in range(5)
+            ]
+            for future in futures:
+                future.result(timeout=5)
+        finally:
+            scheduler.close()
+
+        assert http.peak == 1
+        assert len(http.log) == 5
+
+    def test_default_caps_leave_room_for_interactive(self):
+        """Test a background backlog never occupies every worker by default."""
+        release = threading.Event()
+        http = FakeHTTPClient(release)
+        scheduler = RequestScheduler(http, workers=4)
+        try:
+            background = [
+                scheduler.submit(GetTripRequest(str(i)), Priority.BACKGROUND)
+                for i in range(8)
+            ]
+            defaults = [
+                scheduler.submit(GetTripRequest(str(i)), Priority.DEFAULT)
+                for i in range(10, 18)
+            ]
+            time.sleep(0.05)
+            assert http.active == 3
+            interactive = scheduler.submit(GetTripRequest("99"), Priority.INTERACTIVE)
+            deadline = time.monotonic() + 2
+            while http.active < 4 and time.monotonic() < deadline:
+                time.sleep(0.001)
+            # The reserved worker picked it up while the others were still busy
+            assert http.active == 4
+            release.set()
+            for future in [*background, *defaults, interactive]:
+                future.result(timeout=5)
+        finally:
+            scheduler.close()
+
+        assert scheduler.max_in_flight[Priority.BACKGROUND] == 1
+
+    def test_client_uses_context_priority(self):
+        """Test PolarstepsClient calls go through the scheduler."""
+
+        class Transport:
+            def request(self, method, url, **kwargs):
+                return RecordedResponse(200, {}, '{"id": 1, "uuid": "trip-1"}')
+
+        client = PolarstepsClient(remember_token="token", transport=Transport())
+        scheduler = RequestScheduler(client.http_client, workers=1)
+        client.http_client = scheduler
+        try:
+            with request_priority(Priority.INTERACTIVE, timeout=5):
+                response = client.get_trip("1")
+        finally:
+            scheduler.close()
+
+        assert response.status_code == 200
+        assert response.trip.id == 1
+        assert client.http_client.base_url == "https://api.polarsteps.com"
+
+    def test_closed_scheduler_rejects_requests(self):
+        """Test submitting after close raises."""
+        scheduler = RequestScheduler(FakeHTTPClient(), workers=1)
+        scheduler.close()
+        with pytest.raises(RuntimeError, match="closed"):
+            scheduler.submit(GetTripRequest("1"))
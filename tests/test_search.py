@@ -0,0 +1,116 @@
+"""Unit tests for the full-text search index."""
+
+import json
+
+from polarsteps_api.client import PolarstepsClient
+from polarsteps_api.models.trip import Trip
+from polarsteps_api.search import SearchIndex, tokenize
+from polarsteps_api.transport import RecordedResponse
+
+
+def make_trip(trip_id=1, summary="Backpacking through Portugal", steps=None):
+    return Trip(
+        id=trip_id,
+        uuid=f"t{trip_id}",
+        name=f"Trip {trip_id}",
+        summary=summary,
+        all_steps=steps
+        if steps is not None
+        else [
+            {
+                "id": 10,
+                "uuid": "s10",
+                "trip_id": trip_id,
+                "name": "Lisboa",
+                "description": "Pastéis de nata in Belém",
+            },
+            {
+                "id": 11,
+                "uuid": "s11",
+                "trip_id": trip_id,
+                "name": "Porto",
+                "description": "Port wine cellars and Lisbon day trip",
+            },
+        ],
+    )
+
+
+class TestTokenize:
+    """Test cases for tokenize."""
+
+    def test_case_and_accents(self):
+        """Test tokens are lower-cased and accent-free."""
+        assert tokenize("Pastéis de Nata, BELÉM!") == ["pasteis", "de", "nata", "belem"]
+        assert tokenize(None) == []
+
+
+class TestSearchIndex:
+    """Test cases for SearchIndex."""
+
+    def test_ranked_matches(self):
+        """Test name matches outrank description matches."""
+        index = SearchIndex()
+        index.add_trip(make_trip())
+
+        hits = index.search("lisboa")
+        assert [(hit.kind, hit.id) for hit in hits] == [("step", 10)]
+        hits = index.search("lisb")
+        assert [hit.id for hit in hits] == [10, 11]
+        assert hits[0].score > hits[1].score
+        assert hits[0].trip_id == 1
+
+    def test_all_terms_required(self):
+        """Test multi-word queries intersect their terms."""
+        index = SearchIndex()
+        index.add_trip(make_trip())
+
+        assert [hit.id for hit in index.search("port wine")] == [11]
+        assert index.search("port sushi") == []
+        assert [hit.id for hit in index.search("belem", kind="trip")] == []
+        assert [hit.kind for hit in index.search("portugal")] == ["trip"]
+        assert index.search("porto", prefix=False)[0].id == 11
+
+    def test_reindex_and_remove(self):
+        """Test re-adding a trip replaces its documents."""
+        index = SearchIndex()
+        index.add_trip(make_trip())
+        index.add_trip(
+            make_trip(
+                summary="Island hopping",
+                steps=[{"id": 12, "uuid": "s12", "trip_id": 1, "name": "Madeira"}],
+            )
+        )
+
+        assert index.search("lisboa") == []
+        assert index.search("portugal") == []
+        assert [hit.id for hit in index.search("madeira")] == [12]
+
+        index.remove_trip(1)
+        assert len(index) == 0
+        assert index.search("madeira") == []
+        assert index._vocabulary == []
+
+    def test_partial_trip_keeps_steps(self):
+        """Test trips without all_steps only update the trip document."""
+        index = SearchIndex()
+        index.add_trip(make_trip())
+        index.add_trip(Trip(id=1, uuid="t1", summary="Road trip"))
+
+        assert [hit.id for hit in index.search("porto")] == [11]
+        assert [hit.kind for hit in index.search("road")] == ["trip"]
+
+    def test_filled_through_client(self):
+        """Test trips parsed by the client are indexed."""
+        trip = make_trip().model_dump()
+
+        class Transport:
+            def request(self, method, url, **kwargs):
+                return RecordedResponse(200, {}, json.dumps(trip))
+
+        index = SearchIndex()
+        client = PolarstepsClient(
+            remember_token="token", transport=Transport(), observers=[index]
+        )
+        client.get_trip("1")
+
+        assert [hit.id for hit in index.search("porto")] == [11]
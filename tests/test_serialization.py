@@ -0,0 +1,132 @@
+"""Unit tests for the compact JSON serialisation helpers."""
+
+import io
+import json
+
+import pytest
+
+from polarsteps_api import serialization
+from polarsteps_api.models.trip import Location, Step, Trip
+from polarsteps_api.models.user import User
+from polarsteps_api.serialization import (
+    Preset,
+    dumps,
+    iter_json_array,
+    set_encoder,
+    write_json_array,
+)
+
+
+@pytest.fixture
+def user():
+    return User(
+        id=1,
+        uuid="user-1",
+        username="explorer",
+        first_name="Ada",
+        living_location=Location(
+            id=5, uuid="loc-5", name="Amsterdam", country_code="NL", precision=3.0
+        ),
+        followers=[User(id=2, uuid="user-2", username="fan")],
+        followees=[],
+    )
+
+
+@pytest.fixture
+def reset_encoder():
+    yield
+    set_encoder(None)
+
+
+class TestDumps:
+    """Test cases for dumps()."""
+
+    def test_model_is_compact_json(self):
+        """Test models serialise to compact bytes equal to model_dump_json."""
+        trip = Trip(id=1, uuid="trip-1", name="Road trip")
+        payload = dumps(trip)
+
+        assert isinstance(payload, bytes)
+        assert b" " not in payload.replace(b"Road trip", b"")
+        assert json.loads(payload) == json.loads(trip.model_dump_json())
+
+    def test_profile_preset(self, user):
+        """Test the user_profile preset keeps profile fields only."""
+        data = json.loads(dumps(user, preset="user_profile_fields"))
+
+        assert data["username"] == "explorer"
+        assert "followers" not in data
+        assert "uuid" not in data["living_location"]
+        assert "precision" not in data["living_location"]
+        assert data["living_location"]["country_code"] == "NL"
+
+    def test_social_preset(self, user):
+        """Test the user_social_fields preset reduces followers to usernames."""
+        data = json.loads(dumps(user, preset="user_social_fields"))
+
+        assert data == {"followers": [{"username": "fan"}], "followees": []}
+
+    def test_step_summary_preset(self):
+        """Test the step_summary preset drops media and location internals."""
+        step = Step(
+            id=1,
+            uuid="step-1",
+            trip_id=1,
+            name="Lisbon",
+            location=Location(uuid="loc", name="Lisbon", precision=1.0),
+        )
+        data = json.loads(dumps(step, preset="step_summary_fields"))
+
+        assert data["name"] == "Lisbon"
+        assert "media" not in data
+        assert "uuid" not in data["location"]
+
+    def test_explicit_include_overrides_preset(self, user):
+        """Test explicit include wins over the preset selection."""
+        data = json.loads(dumps(user, preset="user_profile_fields", include={"id"}))
+        assert data == {"id": 1}
+
+    def test_custom_preset(self, user):
+        """Test Preset instances can be passed directly."""
+        assert json.loads(dumps(user, preset=Preset(include={"username"}))) == {
+            "username": "explorer"
+        }
+
+    def test_unknown_preset(self, user):
+        """Test unknown preset names raise a ValueError."""
+        with pytest.raises(ValueError, match="Unknown preset"):
+            dumps(user, preset="nope")
+
+    def test_summary_dict(self):
+        """Test summary dicts go through the encoder."""
+        summary = Trip(id=3, uuid="trip-3", name="Été").to_summary()
+        assert json.loads(dumps(summary)) == summary
+
+    def test_pluggable_encoder(self, reset_encoder):
+        """Test set_encoder swaps the encoder used for plain objects."""
+        set_encoder(lambda obj: b"custom")
+        assert dumps({"a": 1}) == b"custom"
+
+        set_encoder(None)
+        assert serialization.get_encoder() is not None
+        assert json.loads(dumps({"a": 1})) == {"a": 1}
+
+
+class TestStreaming:
+    """Test cases for the streaming array writer."""
+
+    def test_write_json_array(self):
+        """Test a list of trips streams into a valid JSON array."""
+        trips = [Trip(id=i, uuid=f"trip-{i}") for i in range(3)]
+        buffer = io.BytesIO()
+
+        written = write_json_array(trips, buffer, preset="trip_summary_fields")
+
+        assert written == len(buffer.getvalue())
+        data = json.loads(buffer.getvalue())
+        assert [item["id"] for item in data] == [0, 1, 2]
+        assert "uuid" not in data[0]
+
+    def test_empty_array(self):
+        """Test an empty iterable yields an empty JSON array."""
+        assert b"".join(iter_json_array([])) == b"[]"
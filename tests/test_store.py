@@ -0,0 +1,165 @@
+"""Unit tests for the SQLite trip store."""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from polarsteps_api.geo import haversine_km
+from polarsteps_api.models.trip import Trip
+from polarsteps_api.models.user import User
+from polarsteps_api.store import TripStore
+
+
+def ts(year, month=1, day=1):
+    return datetime(year, month, day, tzinfo=timezone.utc).timestamp()
+
+
+def make_step(step_id, trip_id, when, country, lat, lon, media=0):
+    return {
+        "id": step_id,
+        "uuid": f"s{step_id}",
+        "trip_id": trip_id,
+        "name": f"Step {step_id}",
+        "start_time": when,
+        "location": {"lat": lat, "lon": lon, "country_code": country},
+        "media": [
+            {"id": step_id * 10 + i, "uuid": f"m{step_id}-{i}", "type": 0}
+            for i in range(media)
+        ],
+    }
+
+
+@pytest.fixture
+def store():
+    store = TripStore()
+    store.upsert_trips(
+        [
+            Trip(
+                id=1,
+                uuid="t1",
+                user_id=7,
+                name="Iberia",
+                start_date=ts(2024, 3),
+                end_date=ts(2024, 4),
+                total_km=6200,
+                all_steps=[
+                    make_step(10, 1, ts(2024, 3, 2), "PT", 38.72, -9.14, media=2),
+                    make_step(11, 1, ts(2024, 3, 9), "ES", 40.42, -3.70),
+                ],
+            ),
+            Trip(
+                id=2,
+                uuid="t2",
+                user_id=7,
+                name="Weekend",
+                start_date=ts(2023, 5),
+                end_date=ts(2023, 5, 3),
+                total_km=300,
+                all_steps=[make_step(20, 2, ts(2023, 5, 2), "ES", 41.39, 2.17)],
+            ),
+        ]
+    )
+    yield store
+    store.close()
+
+
+class TestTripStore:
+    """Test cases for TripStore."""
+
+    def test_round_trip(self, store):
+        """Test a stored trip comes back with its steps and media."""
+        trip = store.get_trip(1)
+
+        assert trip.name == "Iberia"
+        assert [step.id for step in trip.all_steps] == [10, 11]
+        assert [item.uuid for item in trip.all_steps[0].media] == ["m10-0", "m10-1"]
+        assert store.counts() == {"users": 0, "trips": 2, "steps": 3, "media": 2}
+        assert store.get_trip(99) is None
+
+    def test_step_queries(self, store):
+        """Test steps can be filtered by country and year."""
+        assert [s.id for s in store.steps(country_code="es")] == [20, 11]
+        assert [s.id for s in store.steps(country_code="ES", year=2024)] == [11]
+        assert [s.id for s in store.steps(trip_id="1")] == [10, 11]
+
+    def test_trip_queries(self, store):
+        """Test trips can be filtered by distance, country and year."""
+        assert [t.id for t in store.trips(min_km=5000)] == [1]
+        assert [t.id for t in store.trips(country_code="ES")] == [1, 2]
+        assert [t.id for t in store.trips(year=2023)] == [2]
+        assert store.trip_summaries(min_km=5000)[0]["name"] == "Iberia"
+
+    def test_steps_near(self, store):
+        """Test the grid lookup returns nearby steps only, nearest first."""
+        near_lisbon = store.steps_near(38.7, -9.1, radius_km=50)
+        assert [s.id for s in near_lisbon] == [10]
+
+        iberia = store.steps_near(39.5, -6.0, radius_km=600)
+        assert [s.id for s in iberia] == [11, 10]
+        assert haversine_km(38.72, -9.14, 40.42, -3.70) == pytest.approx(503, abs=5)
+
+    def test_steps_near_antimeridian(self, store):
+        """Test searches wrap around at 180 degrees of longitude."""
+        store.upsert_trip(
+            Trip(
+                id=3,
+                uuid="t3",
+                user_id=7,
+                all_steps=[
+                    make_step(30, 3, ts(2024, 5, 1), "FJ", -16.5, 179.9),
+                    make_step(31, 3, ts(2024, 5, 2), "FJ", -16.5, -179.9),
+                ],
+            )
+        )
+        assert [s.id for s in store.steps_near(-16.5, 179.95, radius_km=50)] == [
+            30,
+            31,
+        ]
+        assert [s.id for s in store.steps_near(-16.5, -179.8, radius_km=50)] == [
+            31,
+            30,
+        ]
+        assert [s.id for s in store.steps_near(-16.5, 540.1, radius_km=50)] == [
+            31,
+            30,
+        ]
+
+    def test_upsert_replaces_steps(self, store):
+        """Test re-upserting a trip replaces its steps and media."""
+        store.upsert_trip(
+            Trip(
+                id=1,
+                uuid="t1",
+                user_id=7,
+                all_steps=[make_step(12, 1, ts(2024, 3, 3), "FR", 48.85, 2.35)],
+            )
+        )
+        assert [s.id for s in store.get_trip(1).all_steps] == [12]
+        assert store.counts()["media"] == 0
+
+    def test_user_with_partial_trips(self, store):
+        """Test users are stored and embedded trips keep their stored steps."""
+        store.upsert_user(
+            User(
+                id=7,
+                uuid="u7",
+                username="alice",
+                alltrips=[{"id": 1, "uuid": "t1", "user_id": 7, "name": "Renamed"}],
+            )
+        )
+        user = store.get_user("alice")
+
+        assert user.id == 7
+        assert {t.id for t in user.alltrips} == {1, 2}
+        trip = store.get_trip(1)
+        assert trip.name == "Renamed"
+        assert [s.id for s in trip.all_steps] == [10, 11]
+        assert store.get_user("bob") is None
+
+    def test_persists_to_file(self, tmp_path):
+        """Test a file-backed store can be reopened."""
+        path = str(tmp_path / "trips.sqlite")
+        with TripStore(path) as store:
+            store.upsert_trip(Trip(id=5, uuid="t5", all_steps=[]))
+        with TripStore(path) as store:
+            assert store.get_trip(5).uuid == "t5"
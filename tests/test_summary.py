@@ -0,0 +1,201 @@
+"""Unit tests for the batch summary helpers."""
+
+import time
+
+import pytest
+
+from polarsteps_api.models.summary import (
+    STEP_SUMMARY_KEYS,
+    TRIP_SUMMARY_KEYS,
+    TimestampFormatter,
+    summarize_steps,
+    summarize_trips,
+)
+from polarsteps_api.models.trip import Location, MediaItem, Step, Trip, TripBuddy
+
+
+@pytest.fixture(autouse=True)
+def utc(monkeypatch):
+    """Pin local time so the formatted dates below are fixed"""
+    monkeypatch.setenv("TZ", "UTC")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+
+def trip_row(**values):
+    """A row in the original Trip.to_summary() shape"""
+    row = {
+        "id": None,
+        "name": None,
+        "summary": None,
+        "start_date": "1970/01/01",
+        "end_date": "1970/01/01",
+        "length_days": "1 day",
+        "total_km": 0.0,
+        "step_count": 0,
+        "country_count": 0,
+        "views": 0,
+        "like_count": 0,
+        "is_shared_trip": False,
+        "cover_photo_path": None,
+    }
+    row.update(values)
+    return row
+
+
+TRIP_ROWS = [
+    trip_row(
+        id=1,
+        name="Weekend",
+        start_date="2022/01/01",
+        end_date="2022/01/02",
+        length_days="2 days",
+        total_km=120.0,
+        is_shared_trip=True,
+    ),
+    # No end date formats as the epoch, as the original summary did
+    trip_row(id=2, name="Day trip", start_date="2022/01/01", length_days="-18992 days"),
+    trip_row(id=3),
+]
+
+STEP_ROWS = [
+    {
+        "name": "Paris",
+        "description": None,
+        "timestamp": "2022/01/01 00:00:00",
+        "location": {
+            "id": 10,
+            "name": "Paris",
+            "lat": 48.85,
+            "lon": 2.35,
+            "country": None,
+            "country_code": "FR",
+            "detail": None,
+            "locality": None,
+        },
+        "weather": {"condition": None, "temperature": None},
+        "medias": 1,
+        "views": 0,
+        "comments": 0,
+        "likes": 1,
+    },
+    {
+        "name": "Nowhere",
+        "description": None,
+        "timestamp": "1970/01/01 00:00:00",
+        "location": {},
+        "weather": {"condition": None, "temperature": None},
+        "medias": 0,
+        "views": 0,
+        "comments": 0,
+        "likes": 0,
+    },
+]
+
+
+def make_trips():
+    return [
+        Trip(
+            id=1,
+            uuid="trip-1",
+            name="Weekend",
+            start_date=1640995200.0,
+            end_date=1641081600.0,
+            total_km=120.0,
+            trip_buddies=[TripBuddy(buddy_user_id=7, uuid="buddy-7")],
+        ),
+        Trip(id=2, uuid="trip-2", name="Day trip", start_date=1640995200.0),
+        Trip(id=3, uuid="trip-3"),
+    ]
+
+
+def make_steps():
+    return [
+        Step(
+            id=1,
+            uuid="step-1",
+            trip_id=1,
+            name="Paris",
+            start_time=1640995200.0,
+            location=Location(
+                id=10,
+                uuid="loc-10",
+                name="Paris",
+                lat=48.85,
+                lon=2.35,
+                country_code="FR",
+                precision=10.0,
+                full_detail="Paris, France",
+            ),
+            media=[MediaItem(id=1, uuid="m-1", type=0)],
+            user_likes=[{"user_id": 1}],
+        ),
+        Step(id=2, uuid="step-2", trip_id=1, name="Nowhere"),
+    ]
+
+
+class TestSummarizeTrips:
+    """Test cases for summarize_trips()."""
+
+    def test_rows(self):
+        """Test batch rows keep the original Trip.to_summary() shape."""
+        rows = summarize_trips(make_trips(), formatter=TimestampFormatter())
+        assert rows == TRIP_ROWS
+        assert [list(row) for row in rows] == [list(TRIP_SUMMARY_KEYS)] * 3
+
+    def test_columnar_output(self):
+        """Test the columnar layout holds one list per summary key."""
+        columns = summarize_trips(
+            make_trips(), columnar=True, formatter=TimestampFormatter()
+        )
+
+        assert tuple(columns) == TRIP_SUMMARY_KEYS
+        assert columns == {
+            key: [row[key] for row in TRIP_ROWS] for key in TRIP_SUMMARY_KEYS
+        }
+
+    def test_empty_collection(self):
+        """Test empty inputs produce empty outputs in both layouts."""
+        assert summarize_trips([]) == []
+        assert summarize_trips([], columnar=True) == {
+            key: [] for key in TRIP_SUMMARY_KEYS
+        }
+
+
+class TestSummarizeSteps:
+    """Test cases for summarize_steps()."""
+
+    def test_rows(self):
+        """Test batch rows keep the original Step.to_summary() shape."""
+        rows = summarize_steps(make_steps(), formatter=TimestampFormatter())
+        assert rows == STEP_ROWS
+        assert [list(row) for row in rows] == [list(STEP_SUMMARY_KEYS)] * 2
+
+    def test_columnar_output(self):
+        """Test the columnar layout for steps."""
+        columns = summarize_steps(
+            make_steps(), columnar=True, formatter=TimestampFormatter()
+        )
+
+        assert tuple(columns) == STEP_SUMMARY_KEYS
+        assert columns == {
+            key: [row[key] for row in STEP_ROWS] for key in STEP_SUMMARY_KEYS
+        }
+
+
+class TestTimestampFormatter:
+    """Test cases for the memoised TimestampFormatter."""
+
+    def test_reuses_cached_values(self):
+        """Test repeated timestamps are served from the cache."""
+        formatter = TimestampFormatter()
+        summarize_trips(make_trips(), formatter=formatter)
+        summarize_trips(make_trips(), formatter=formatter)
+
+        assert formatter.format.cache_info().hits > 0
+        assert formatter.length_days(1640995200.0, 1640995200.0) == "1 day"
+
+        formatter.cache_clear()
+        assert formatter.format.cache_info().currsize == 0
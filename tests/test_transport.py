@@ -0,0 +1,104 @@
+"""Unit tests for the record/replay transports."""
+
+import json
+from unittest.mock import Mock
+
+from polarsteps_api.client import HTTPClient, PolarstepsClient
+from polarsteps_api.models.request import GetTripRequest
+from polarsteps_api.transport import RecordingTransport, ReplayTransport
+
+TRIP_URL = "https://api.polarsteps.com/trips/123"
+
+
+def make_record(url=TRIP_URL, status_code=200, body=None):
+    return {
+        "request": {"method": "GET", "url": url},
+        "response": {
+            "status_code": status_code,
+            "headers": {"Content-Type": "application/json"},
+            "body": json.dumps(body or {"id": 123, "uuid": "trip-uuid"}),
+        },
+    }
+
+
+class TestRecordingTransport:
+    """Test cases for RecordingTransport."""
+
+    def test_records_exchanges(self, tmp_path):
+        """Test each exchange is appended as a JSONL record without cookies."""
+        path = tmp_path / "recording.jsonl"
+        inner = Mock()
+        inner.request.return_value = Mock(
+            status_code=200,
+            headers={"Content-Type": "application/json", "Set-Cookie": "secret"},
+            text='{"id": 123}',
+        )
+        client = HTTPClient(
+            "https://api.polarsteps.com",
+            "test_token",
+            transport=RecordingTransport(str(path), transport=inner),
+        )
+
+        response = client.execute(GetTripRequest("123"))
+        client.execute(GetTripRequest("123"))
+
+        assert response.status_code == 200
+        records = [json.loads(line) for line in path.read_text().splitlines()]
+        assert len(records) == 2
+        assert records[0]["request"] == {"method": "GET", "url": TRIP_URL}
+        assert records[0]["response"]["body"] == '{"id": 123}'
+        assert "Set-Cookie" not in records[0]["response"]["headers"]
+        assert "test_token" not in path.read_text()
+
+
+class TestReplayTransport:
+    """Test cases for ReplayTransport."""
+
+    def test_replays_through_client(self, tmp_path):
+        """Test a recorded file is served through PolarstepsClient offline."""
+        path = tmp_path / "recording.jsonl"
+        path.write_text(json.dumps(make_record()) + "\n")
+
+        client = PolarstepsClient(
+            remember_token="test_token",
+            transport=ReplayTransport.from_file(str(path)),
+        )
+        response = client.get_trip("123")
+
+        assert response.status_code == 200
+        assert response.trip is not None
+        assert response.trip.uuid == "trip-uuid"
+
+    def test_sequence_then_last(self):
+        """Test repeated requests replay in order and then stick to the last."""
+        transport = ReplayTransport(
+            [make_record(status_code=500), make_record(status_code=200)]
+        )
+
+        codes = [transport.request("GET", TRIP_URL).status_code for _ in range(3)]
+
+        assert codes == [500, 200, 200]
+        assert len(transport) == 2
+
+    def test_missing_record_is_connection_error(self):
+        """Test unknown requests surface as status_code=0 error responses."""
+        client = HTTPClient(
+            "https://api.polarsteps.com", "test_token", transport=ReplayTransport([])
+        )
+
+        response = client.execute(GetTripRequest("404"))
+
+        assert response.status_code == 0
+        assert "No recorded response" in response.data["error"]
+
+    def test_non_json_body(self):
+        """Test non-JSON bodies fall back to text like real responses."""
+        record = make_record()
+        record["response"]["body"] = "plain text"
+        client = HTTPClient(
+            "https://api.polarsteps.com",
+            "test_token",
+            transport=ReplayTransport([record]),
+        )
+
+        assert client.execute(GetTripRequest("123")).data == "plain text"